@@ -0,0 +1,227 @@
+"""
+Statewide data extracts.
+
+An export reads a dataset a chunk at a time with keyset pagination on the
+primary key (`values_list` over the dataset's columns, EXPORT_CHUNK_SIZE
+rows per query) and hands each chunk to a writer that turns it into bytes
+straight away, so only one chunk is ever held in memory whatever the size
+of the table. Keyset queries rather than one `.iterator()` keep that true on
+MySQL, whose driver buffers a whole result set client-side.
+
+CSV is always available. Parquet needs pyarrow; each chunk becomes one row
+group, typed from the model fields.
+"""
+import csv
+import io
+from dataclasses import dataclass
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+
+from backend.schools.models import FundingSource, Invoice, Payment, Salary, School, SchoolExpense, Staff
+from backend.student.models import EnrollmentRecord
+
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_FORMATS = ('csv', 'parquet')
+CONTENT_TYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+
+@dataclass
+class Dataset:
+    model: type
+    columns: list          # [(column name, ORM lookup), ...]
+    school_lookup: str
+
+    @property
+    def names(self):
+        return [name for name, _ in self.columns]
+
+    def field(self, lookup):
+        """
+        The model field a lookup ends on.
+        """
+        model, field = self.model, None
+        for part in lookup.split('__'):
+            field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            model = field.related_model or model
+        if field.is_relation:
+            field = field.target_field
+        return field
+
+
+DATASETS = {
+    'schools': Dataset(School, [
+        ('id', 'id'), ('name', 'name'), ('registration_number', 'registration_number'),
+        ('school_type', 'school_type'), ('program', 'program'), ('is_vocational', 'is_vocational'),
+        ('lga', 'lga'), ('ward', 'ward'), ('city', 'city'), ('phone', 'phone'), ('email', 'email'),
+        ('latitude', 'latitude'), ('longitude', 'longitude'), ('established_date', 'established_date'),
+        ('created_at', 'created_at'),
+    ], 'pk'),
+    'enrollments': Dataset(EnrollmentRecord, [
+        ('id', 'id'), ('student_id', 'student_id'), ('reg_num', 'student__reg_num'),
+        ('first_name', 'student__first_name'), ('last_name', 'student__last_name'), ('gender', 'student__gender'),
+        ('date_of_birth', 'student__date_of_birth'), ('state_of_origin', 'student__state_of_origin'),
+        ('school_id', 'school_id'), ('school_name', 'school__name'), ('lga', 'school__lga'),
+        ('session', 'academic_session__session_name'), ('program', 'program'),
+        ('level', 'program_level__program_level_template__level'), ('stream', 'stream__name'),
+        ('enrollment_mode', 'enrollment_mode'), ('enrollment_date', 'enrollment_date'), ('is_active', 'is_active'),
+    ], 'school'),
+    'staff': Dataset(Staff, [
+        ('id', 'id'), ('school_id', 'school_id'), ('school_name', 'school__name'), ('full_name', 'full_name'),
+        ('position', 'position'), ('email', 'email'), ('phone_number', 'phone_number'), ('is_active', 'is_active'),
+        ('date_joined', 'date_joined'), ('salary_amount', 'salary_amount'),
+    ], 'school'),
+    'invoices': Dataset(Invoice, [
+        ('invoice_id', 'invoice_id'), ('school_id', 'school_id'), ('student_id', 'student_id'),
+        ('reg_num', 'student__reg_num'), ('term_id', 'term_id'), ('invoice_date', 'invoice_date'),
+        ('due_date', 'due_date'), ('total_amount', 'total_amount'), ('amount_paid', 'amount_paid'),
+        ('balance', 'balance'), ('status', 'status'),
+    ], 'school'),
+    'payments': Dataset(Payment, [
+        ('id', 'id'), ('school_id', 'school_id'), ('invoice_id', 'invoice_id'), ('amount', 'amount'),
+        ('payment_date', 'payment_date'), ('payment_method', 'payment_method'), ('receipt_number', 'receipt_number'),
+    ], 'school'),
+    'expenses': Dataset(SchoolExpense, [
+        ('id', 'id'), ('school_id', 'school_id'), ('category', 'category__name'), ('amount', 'amount'),
+        ('date_incurred', 'date_incurred'), ('receipt_number', 'receipt_number'), ('description', 'description'),
+    ], 'school'),
+    'salaries': Dataset(Salary, [
+        ('id', 'id'), ('school_id', 'staff__school_id'), ('staff_id', 'staff_id'), ('staff_name', 'staff__full_name'),
+        ('amount', 'amount'), ('pay_date', 'pay_date'),
+    ], 'staff__school'),
+    'funding': Dataset(FundingSource, [
+        ('id', 'id'), ('school_id', 'school_id'), ('source_name', 'source_name'), ('funding_type', 'funding_type'),
+        ('amount', 'amount'), ('date_received', 'date_received'),
+    ], 'school'),
+}
+
+
+def read_chunks(dataset, school=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lists of at most `chunk_size` rows of `dataset`, in primary key order.
+    """
+    queryset = dataset.model._default_manager.order_by('pk')
+    if school is not None:
+        queryset = queryset.filter(**{dataset.school_lookup: school})
+    lookups = [lookup for _, lookup in dataset.columns]
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        rows = list(page.values_list('pk', *lookups)[:chunk_size])
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield [row[1:] for row in rows]
+        if len(rows) < chunk_size:
+            return
+
+
+class ExportBuffer:
+    """
+    A write-only file that hands its contents over on `drain`.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def write_csv(dataset, chunks):
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(dataset.names)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield text.getvalue().encode()
+        text.seek(0)
+        text.truncate()
+    yield text.getvalue().encode()
+
+
+def arrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImproperlyConfigured("Parquet exports need pyarrow; install it or export CSV.")
+    return pyarrow
+
+
+def arrow_type(pa, field):
+    internal = field.get_internal_type()
+    if internal in ('BooleanField', 'NullBooleanField'):
+        return pa.bool_()
+    if internal in ('AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField',
+                    'SmallIntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField',
+                    'PositiveBigIntegerField'):
+        return pa.int64()
+    if internal == 'FloatField':
+        return pa.float64()
+    if internal == 'DecimalField':
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if internal == 'DateField':
+        return pa.date32()
+    if internal == 'DateTimeField':
+        return pa.timestamp('us', tz='UTC')
+    return pa.string()
+
+
+def write_parquet(dataset, chunks):
+    pa = arrow()
+    schema = pa.schema([
+        (name, arrow_type(pa, dataset.field(lookup))) for name, lookup in dataset.columns
+    ])
+    strings = [index for index, column in enumerate(schema) if column.type == pa.string()]
+    buffer = ExportBuffer()
+    writer = pa.parquet.ParquetWriter(pa.PythonFile(buffer, mode='w'), schema)
+    for rows in chunks:
+        columns = [list(column) for column in zip(*rows)]
+        for index in strings:
+            columns[index] = [None if value is None else str(value) for value in columns[index]]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        yield buffer.drain()
+    writer.close()
+    yield buffer.drain()
+
+
+def export(name, output_format='csv', school=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Byte chunks of the dataset `name` as CSV or Parquet.
+
+    pyarrow and the `school` id are checked before anything is read, so a
+    missing dependency or a malformed id fails before a response starts.
+    """
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset {name!r}; use one of {', '.join(DATASETS)}.")
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {output_format!r}; use one of {EXPORT_FORMATS}.")
+    if output_format == 'parquet':
+        arrow()
+    dataset = DATASETS[name]
+    if school is not None:
+        try:
+            school = dataset.field(dataset.school_lookup).to_python(school)
+        except (ValidationError, ValueError, TypeError):
+            raise ValidationError(f"Invalid school: {school}.")
+    chunks = read_chunks(dataset, school, chunk_size)
+    return write_csv(dataset, chunks) if output_format == 'csv' else write_parquet(dataset, chunks)
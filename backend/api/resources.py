@@ -0,0 +1,206 @@
+"""
+Resources of the read-only JSON API.
+
+A Resource maps the names of its JSON fields to ORM lookups. A request asks
+for some of them (`fields`, default all); the page is read with one
+`values_list` over just those lookups, so a related field such as
+`school_name` costs a join only when it is asked for and no model instances
+are built.
+
+Pages are keyset-paginated on the primary key, so a full sync walks the
+table in index order and can resume from its last cursor. Resources with an
+`updated_field` also accept `updated_since`, and are then paginated on
+(updated field, primary key) so a sync can pick up only what changed.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from backend.schools.models import AcademicSession, School
+from backend.student.models import EnrollmentRecord, Student
+from backend.student.search import decode_cursor, encode_cursor
+
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+
+class Resource:
+    model = None
+    fields = {}           # JSON field name -> ORM lookup
+    filters = {}          # query parameter -> ORM lookup
+    updated_field = None  # set to allow `updated_since`
+
+    def queryset(self):
+        return self.model._default_manager.order_by()
+
+    def select(self, requested=None):
+        """
+        The JSON field names to return, in declaration order.
+        """
+        if not requested:
+            return list(self.fields)
+        unknown = set(requested) - set(self.fields)
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        return [name for name in self.fields if name in requested]
+
+    def page(self, params):
+        """
+        (rows, next cursor) for the query parameters `params`.
+        """
+        names = self.select([name for name in params.get('fields', '').split(',') if name])
+        limit = self.limit(params.get('limit'))
+        rows = self.queryset()
+        for parameter, lookup in self.filters.items():
+            if params.get(parameter) not in (None, ''):
+                rows = rows.filter(**{lookup: self.to_python(lookup, params[parameter], parameter)})
+
+        since = params.get('updated_since')
+        if since:
+            if not self.updated_field:
+                raise ValidationError("This resource does not support updated_since.")
+            rows = rows.filter(**{f'{self.updated_field}__gte': self.parse_datetime(since)})
+            order = [self.updated_field, 'pk']
+        else:
+            order = ['pk']
+        after = decode_cursor(params.get('cursor'), len(order))
+        if params.get('cursor') and after is None:
+            raise ValidationError("Invalid cursor.")
+        if after and since:
+            moment, pk = self.parse_datetime(after[0]), self.to_python('pk', after[1], 'cursor')
+            rows = rows.filter(Q(**{f'{self.updated_field}__gt': moment}) | Q(**{self.updated_field: moment, 'pk__gt': pk}))
+        elif after:
+            rows = rows.filter(pk__gt=self.to_python('pk', after[0], 'cursor'))
+
+        lookups = [self.fields[name] for name in names]
+        values = list(rows.order_by(*order).values_list(*order, *lookups)[:limit])
+        next_cursor = None
+        if len(values) == limit:
+            last = values[-1]
+            next_cursor = encode_cursor(last[0].isoformat(), last[1]) if since else encode_cursor(last[0])
+        return [dict(zip(names, row[len(order):])) for row in values], next_cursor
+
+    def to_python(self, lookup, value, parameter):
+        """
+        `value` converted to the type of the field `lookup` ends on, so a
+        malformed parameter is a ValidationError rather than a database error.
+        """
+        model, field = self.model, None
+        for part in lookup.split('__'):
+            field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            model = field.related_model or model
+        try:
+            return field.to_python(value)
+        except (ValidationError, ValueError, TypeError):
+            raise ValidationError(f"Invalid {parameter}: {value}.")
+
+    def limit(self, value):
+        if value in (None, ''):
+            return API_PAGE_SIZE
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError("limit must be a number.")
+        return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+    def parse_datetime(self, value):
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValidationError(f"Invalid date and time: {value}.")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, timezone.get_default_timezone())
+        return moment
+
+
+class SchoolResource(Resource):
+    model = School
+    updated_field = 'updated_at'
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'abbreviation': 'abbreviation',
+        'registration_number': 'registration_number',
+        'school_type': 'school_type',
+        'program': 'program',
+        'is_vocational': 'is_vocational',
+        'lga': 'lga',
+        'ward': 'ward',
+        'city': 'city',
+        'street_address': 'street_address',
+        'phone': 'phone',
+        'email': 'email',
+        'website': 'website',
+        'latitude': 'latitude',
+        'longitude': 'longitude',
+        'established_date': 'established_date',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    filters = {'school_type': 'school_type', 'program': 'program', 'lga': 'lga'}
+
+
+class StudentResource(Resource):
+    model = Student
+    updated_field = 'updated_at'
+    fields = {
+        'id': 'id',
+        'reg_num': 'reg_num',
+        'first_name': 'first_name',
+        'middle_name': 'middle_name',
+        'last_name': 'last_name',
+        'gender': 'gender',
+        'date_of_birth': 'date_of_birth',
+        'state_of_origin': 'state_of_origin',
+        'is_active': 'is_active',
+        'school': 'school_id',
+        'school_name': 'school__name',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    filters = {'school': 'school_id', 'is_active': 'is_active'}
+
+
+class EnrollmentResource(Resource):
+    model = EnrollmentRecord
+    fields = {
+        'id': 'id',
+        'student': 'student_id',
+        'student_reg_num': 'student__reg_num',
+        'school': 'school_id',
+        'school_name': 'school__name',
+        'academic_session': 'academic_session_id',
+        'session_name': 'academic_session__session_name',
+        'program': 'program',
+        'program_level': 'program_level_id',
+        'level_name': 'program_level__program_level_template__level',
+        'stream': 'stream_id',
+        'enrollment_mode': 'enrollment_mode',
+        'enrollment_date': 'enrollment_date',
+        'is_active': 'is_active',
+    }
+    filters = {'school': 'school_id', 'academic_session': 'academic_session_id', 'is_active': 'is_active'}
+
+
+class AcademicSessionResource(Resource):
+    model = AcademicSession
+    fields = {
+        'id': 'id',
+        'session_name': 'session_name',
+        'status': 'status',
+        'school_type': 'school_type',
+        'program': 'program',
+        'school': 'school_id',
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+    }
+    filters = {'status': 'status', 'school': 'school_id'}
+
+
+RESOURCES = {
+    'schools': SchoolResource(),
+    'students': StudentResource(),
+    'enrollments': EnrollmentResource(),
+    'academic-sessions': AcademicSessionResource(),
+}
@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+import csv
+import io
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from backend.api.exports import DATASETS, export, read_chunks
+from backend.schools.models import AcademicSession, LevelClasses, ProgramLevelTemplate, School, Staff
+from backend.schools.session_resolver import academic_session_resolver
+from backend.student.enrollment import enroll_many
+from backend.student.models import Student
+
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ApiFixtureMixin:
+
+    def setUp(self):
+        academic_session_resolver.invalidate()
+        self.schools = [
+            School.objects.create(
+                name=f'Test School {letter}', school_type='public', program='jss', lga='Test LGA',
+                ward='Test Ward', street_address='123 Test Street', registration_number=f'TS/{letter}',
+            )
+            for letter in 'abc'
+        ]
+        self.session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        template = ProgramLevelTemplate.objects.create(program='jss', level='JSS 1')
+        level_class = LevelClasses.objects.create(
+            school=self.schools[0], program_level_template=template, class_section_name='A',
+        )
+        self.students = [
+            Student.objects.create(
+                first_name='Amina', last_name=f'Test{"abcdefghij"[i]}', date_of_birth=date(2012, 1, 1),
+                gender='F', country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North',
+                passport_photograph=f'students/passport/api{i}.jpg',
+            )
+            for i in range(7)
+        ]
+        enroll_many(self.students[:4], self.schools[0], level_class)
+        self.client.force_login(User.objects.create_user('integration', password='secret'))
+
+
+class ResourceApiTest(ApiFixtureMixin, TestCase):
+
+    def get(self, resource, **params):
+        return self.client.get(reverse('api:list', args=[resource]), params)
+
+    def test_keyset_pages_cover_the_table(self):
+        seen, params = [], {'limit': 3, 'fields': 'id,reg_num'}
+        while True:
+            with self.assertNumQueries(3):  # session, user, page
+                body = self.get('students', **params).json()
+            seen.extend(body['results'])
+            if not body['cursor']:
+                break
+            params['cursor'] = body['cursor']
+        self.assertEqual([row['id'] for row in seen], sorted(str(student.pk) for student in self.students))
+        self.assertEqual(set(seen[0]), {'id', 'reg_num'})
+        self.assertIsNone(body['next'])
+        self.assertIn('cursor=', self.get('students', limit=3).json()['next'])
+
+    def test_related_fields_and_filters(self):
+        body = self.get('enrollments', fields='student_reg_num,school_name,session_name,level_name').json()
+        self.assertEqual(len(body['results']), 4)
+        self.assertEqual(body['results'][0]['school_name'], 'Test School a')
+        self.assertEqual(body['results'][0]['session_name'], '2024/2025')
+        self.assertEqual(body['results'][0]['level_name'], 'JSS 1')
+
+        body = self.get('students', school=str(self.schools[0].pk), fields='id').json()
+        self.assertEqual(len(body['results']), 4)
+        self.assertEqual(len(self.get('schools').json()['results']), 3)
+        self.assertEqual(self.get('academic-sessions').json()['results'][0]['status'], 'ongoing')
+
+    def test_updated_since(self):
+        Student.objects.filter(pk__in=[student.pk for student in self.students[:5]]).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        first = self.get('students', updated_since=since, limit=1, fields='id').json()
+        second = self.get('students', updated_since=since, limit=1, fields='id', cursor=first['cursor']).json()
+        changed = {first['results'][0]['id'], second['results'][0]['id']}
+        self.assertEqual(changed, {str(student.pk) for student in self.students[5:]})
+        self.assertEqual(self.get('enrollments', updated_since=since).status_code, 400)
+
+    def test_etag(self):
+        response = self.get('schools', fields='id,name')
+        etag = response['ETag']
+        response = self.client.get(reverse('api:list', args=['schools']), {'fields': 'id,name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        School.objects.filter(pk=self.schools[0].pk).update(name='Renamed School')
+        response = self.client.get(reverse('api:list', args=['schools']), {'fields': 'id,name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_errors(self):
+        self.assertEqual(self.get('students', fields='nin_number').status_code, 400)
+        self.assertEqual(self.get('students', cursor='not a cursor').status_code, 400)
+        # Well-formed cursors and filters whose values are not of the field's type.
+        self.assertEqual(self.get('enrollments', cursor='YWJj').status_code, 400)
+        self.assertEqual(self.get('students', cursor='YWJj').status_code, 400)
+        self.assertEqual(self.get('enrollments', academic_session='abc').status_code, 400)
+        self.assertEqual(self.get('students', school='abc').status_code, 400)
+        self.assertEqual(self.get('students', is_active='maybe').status_code, 400)
+        self.assertEqual(len(self.get('enrollments', academic_session=self.session.pk).json()['results']), 4)
+        self.assertEqual(self.get('guardians').status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.get('students').status_code, 401)
+
+
+class ExportTest(ApiFixtureMixin, TestCase):
+
+    def read_csv(self, chunks):
+        return list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+
+    def test_chunks_are_read_by_keyset(self):
+        dataset = DATASETS['enrollments']
+        chunks = read_chunks(dataset, chunk_size=3)
+        with self.assertNumQueries(1):
+            first = next(chunks)
+        with self.assertNumQueries(1):
+            second = next(chunks)
+        self.assertEqual((len(first), len(second)), (3, 1))
+        self.assertEqual(list(chunks), [])
+        self.assertEqual(len(list(read_chunks(DATASETS['schools'], school=self.schools[1].pk))), 1)
+
+    def test_csv(self):
+        rows = self.read_csv(export('enrollments', chunk_size=3))
+        self.assertEqual(rows[0], DATASETS['enrollments'].names)
+        self.assertEqual(len(rows), 5)
+        record = dict(zip(rows[0], rows[1]))
+        self.assertEqual((record['school_name'], record['session'], record['level']), ('Test School a', '2024/2025', 'JSS 1'))
+
+        Staff.objects.create(school=self.schools[1], full_name='Musa Ali', position='Teacher', date_joined=date(2020, 1, 6))
+        rows = self.read_csv(export('staff', school=self.schools[1].pk))
+        self.assertEqual([row[3] for row in rows[1:]], ['Musa Ali'])
+        for name, dataset in DATASETS.items():
+            rows = self.read_csv(export(name, school=self.schools[2].pk))
+            self.assertEqual(rows[0], dataset.names)
+            self.assertEqual(len(rows), 2 if name == 'schools' else 1)
+            self.assertTrue(all(dataset.field(lookup) for _, lookup in dataset.columns))
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('api:export', args=['schools', 'csv']))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="schools.csv"')
+        self.assertEqual(len(self.read_csv(response.streaming_content)), 4)
+        self.assertEqual(self.client.get(reverse('api:export', args=['guardians', 'csv'])).status_code, 404)
+        for name in ('schools', 'enrollments', 'salaries'):
+            response = self.client.get(reverse('api:export', args=[name, 'csv']), {'school': 'abc'})
+            self.assertEqual(response.status_code, 400)
+        if pyarrow is None:
+            self.assertEqual(self.client.get(reverse('api:export', args=['schools', 'parquet'])).status_code, 503)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'enrollments.csv')
+            call_command('export', 'enrollments', '--output', path, '--chunk-size', '2', stdout=io.StringIO())
+            with open(path, newline='') as file:
+                self.assertEqual(len(list(csv.reader(file))), 5)
+
+            path = os.path.join(directory, 'staff.csv')
+            with self.assertRaisesMessage(CommandError, 'Invalid school: abc.'):
+                call_command('export', 'staff', '--school', 'abc', '--output', path, stdout=io.StringIO())
+            self.assertFalse(os.path.exists(path))
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_parquet(self):
+        table = pyarrow.parquet.read_table(io.BytesIO(b''.join(export('enrollments', 'parquet', chunk_size=3))))
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(table.num_columns, len(DATASETS['enrollments'].columns))
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from backend.api import views
+
+app_name = 'api'
+urlpatterns = [
+    path('export/<str:dataset>.<str:output_format>', views.export_view, name='export'),
+    path('<str:resource>/', views.resource_list, name='list'),
+]
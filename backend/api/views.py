@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from backend.api.exports import CONTENT_TYPES, DATASETS, EXPORT_FORMATS, export
+from backend.api.resources import RESOURCES
+
+
+def api_error(status, message):
+    return JsonResponse({'error': message}, status=status)
+
+
+@require_GET
+def resource_list(request, resource):
+    """
+    One page of a resource as JSON: {"results": [...], "next": url or null,
+    "cursor": cursor of the next page or null}. The ETag is a hash of the
+    body, so a client polling with If-None-Match gets a 304 while nothing
+    in the page has changed.
+    """
+    if resource not in RESOURCES:
+        raise Http404("Unknown resource.")
+    if not request.user.is_authenticated:
+        return api_error(401, "Authentication required.")
+    try:
+        rows, cursor = RESOURCES[resource].page(request.GET)
+    except ValidationError as error:
+        return api_error(400, ' '.join(error.messages))
+
+    next_url = None
+    if cursor:
+        params = request.GET.copy()
+        params['cursor'] = cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    content = json.dumps({'results': rows, 'next': next_url, 'cursor': cursor}, cls=DjangoJSONEncoder).encode()
+
+    etag = quote_etag(hashlib.md5(content).hexdigest())
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Cookie'])
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+@require_GET
+def export_view(request, dataset, output_format):
+    """
+    Stream a whole dataset as CSV or Parquet, optionally for one `school`.
+    """
+    if dataset not in DATASETS or output_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export.")
+    if not request.user.is_authenticated:
+        return api_error(401, "Authentication required.")
+    try:
+        chunks = export(dataset, output_format, school=request.GET.get('school') or None)
+    except ValidationError as error:
+        return api_error(400, ' '.join(error.messages))
+    except ImproperlyConfigured as error:
+        return api_error(503, str(error))
+
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[output_format])
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{output_format}"'
+    return response
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Flow
+
+class FlowAdmin(admin.ModelAdmin):
+    list_display = ('header_hash', 'student', 'school', 'term', 'sequence', 'timestamp')
+    list_filter = ('school', 'term')
+    search_fields = ('header_hash', 'student__reg_num')
+    readonly_fields = [field.name for field in Flow._meta.fields]
+
+admin.site.register(Flow, FlowAdmin)
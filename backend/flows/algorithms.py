@@ -0,0 +1,83 @@
+"""
+Hashing for the Flows Algorithm.
+
+A flow's term record is serialized canonically as a fixed sequence of values
+joined by the ASCII unit separator, so no per-field dict or JSON is built.
+Values shared by a whole cohort are serialized and fed to the hash once; each
+student's hash continues from a copy of that state.
+
+    payload_digest = SHA-256(cohort values | student values)
+    header_hash    = SHA-256(school key | cohort size | timestamp | previous hash | payload digest)
+"""
+import calendar
+import hashlib
+
+from django.utils.crypto import salted_hmac
+
+GENESIS_HASH = '0' * 64
+FIELD_SEPARATOR = b'\x1f'
+SCHOOL_KEY_SALT = 'backend.flows.school_key'
+
+
+def encode_value(value):
+    if value is None:
+        return b''
+    if isinstance(value, bytes):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat().encode()
+    return str(value).encode()
+
+
+def canonical_record(values):
+    """
+    Serialize a sequence of values in their given order.
+    """
+    return FIELD_SEPARATOR.join([encode_value(value) for value in values])
+
+
+def school_key(school_id):
+    """
+    The secret key of a school, derived from SECRET_KEY so it never has to be stored.
+    """
+    return salted_hmac(SCHOOL_KEY_SALT, str(school_id)).digest()
+
+
+def timestamp_seconds(timestamp):
+    return calendar.timegm(timestamp.utctimetuple())
+
+
+def payload_hasher(cohort_values):
+    """
+    A SHA-256 state primed with the cohort's shared values; `.copy()` it per student.
+    """
+    return hashlib.sha256(canonical_record(cohort_values) + FIELD_SEPARATOR)
+
+
+def payload_digest(cohort_hasher, student_values):
+    hasher = cohort_hasher.copy()
+    hasher.update(canonical_record(student_values))
+    return hasher.hexdigest()
+
+
+def header_hasher(key, cohort_size, timestamp):
+    """
+    A SHA-256 state primed with the header fields shared by a cohort.
+    """
+    return hashlib.sha256(canonical_record((key, cohort_size, timestamp_seconds(timestamp))) + FIELD_SEPARATOR)
+
+
+def header_hash(cohort_header_hasher, previous_hash, digest):
+    hasher = cohort_header_hasher.copy()
+    hasher.update(previous_hash.encode())
+    hasher.update(FIELD_SEPARATOR)
+    hasher.update(digest.encode())
+    return hasher.hexdigest()
+
+
+def compute_header(flow, key=None):
+    """
+    Recompute the header hash of a stored flow.
+    """
+    key = key if key is not None else school_key(flow.school_id)
+    return header_hash(header_hasher(key, flow.cohort_size, flow.timestamp), flow.previous_hash, flow.payload_digest)
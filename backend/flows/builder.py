@@ -0,0 +1,155 @@
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.timezone import now
+
+from backend.flows.algorithms import (
+    GENESIS_HASH,
+    header_hash,
+    header_hasher,
+    payload_digest,
+    payload_hasher,
+    school_key,
+)
+from backend.flows.checkpoints import commit_checkpoint
+from backend.flows.models import Flow
+from backend.student.models import EnrollmentRecord
+
+FLOW_BATCH_SIZE = 1000
+
+
+class FlowBuilder:
+    """
+    Builds the flows of every active student of a LevelClasses cohort for a term,
+    in one transaction and with a fixed number of queries.
+
+    Students who already have a flow for the term are skipped, so building a
+    cohort twice is harmless.
+    """
+
+    def __init__(self, level_class, term):
+        self.level_class = level_class
+        self.term = term
+
+    def cohort_values(self, cohort_size):
+        """
+        Values of the term record shared by every student of the cohort, in canonical order.
+        """
+        level_class = self.level_class
+        template = level_class.program_level_template
+        session = self.term.academic_session
+        return (
+            level_class.school_id,
+            level_class.pk,
+            template.program,
+            template.level,
+            level_class.class_section_name,
+            session.pk,
+            session.session_name,
+            self.term.pk,
+            self.term.term_name,
+            cohort_size,
+        )
+
+    def student_values(self, student_id, reg_num, stream_id, total_score=None, average=None, grade=None,
+                       position=None):
+        """
+        Values of the term record specific to one student, in canonical order.
+        The results come from the student's TermResult, when computed.
+        """
+        return (student_id, reg_num, stream_id, total_score, average, grade, position)
+
+    def cohort(self):
+        return list(
+            EnrollmentRecord.objects.filter(program_level=self.level_class, is_active=True)
+            .annotate(result=FilteredRelation(
+                'student__term_results', condition=Q(student__term_results__term=self.term),
+            ))
+            .order_by('student_id')
+            .values_list(
+                'student_id', 'student__reg_num', 'stream_id',
+                'result__total_score', 'result__average', 'result__grade', 'result__position',
+            )
+        )
+
+    def chain_heads(self, student_ids):
+        """
+        The sequence and header hash of each student's latest flow.
+        """
+        heads = Flow.objects.filter(student_id__in=student_ids).annotate(
+            position=Window(
+                expression=RowNumber(),
+                partition_by=F('student_id'),
+                order_by=F('sequence').desc(),
+            )
+        ).filter(position=1).values_list('student_id', 'sequence', 'header_hash', 'term_id')
+        return {student_id: (sequence, header, term_id) for student_id, sequence, header, term_id in heads}
+
+    def built_students(self, student_ids):
+        """
+        Ids of the students who already have a flow for the term, wherever it sits in their chain.
+        """
+        return set(
+            Flow.objects.filter(student_id__in=student_ids, term=self.term).values_list('student_id', flat=True)
+        )
+
+    def prepare(self, cohort, heads, timestamp, built=()):
+        """
+        Build the unsaved flows of a cohort, skipping the students in `built`.
+        No queries are made here.
+        """
+        cohort_size = len(cohort)
+        school_id = self.level_class.school_id
+        payload_state = payload_hasher(self.cohort_values(cohort_size))
+        header_state = header_hasher(school_key(school_id), cohort_size, timestamp)
+
+        flows = []
+        for student_id, *values in cohort:
+            if student_id in built:
+                continue
+            sequence, previous_hash, _ = heads.get(student_id, (0, GENESIS_HASH, None))
+            digest = payload_digest(payload_state, self.student_values(student_id, *values))
+            flows.append(Flow(
+                student_id=student_id,
+                school_id=school_id,
+                term=self.term,
+                level_class=self.level_class,
+                sequence=sequence + 1,
+                cohort_size=cohort_size,
+                previous_hash=previous_hash,
+                payload_digest=digest,
+                header_hash=header_hash(header_state, previous_hash, digest),
+                timestamp=timestamp,
+            ))
+        return flows
+
+    def build(self):
+        """
+        Create and return the new flows of the cohort.
+        """
+        with transaction.atomic():
+            cohort = self.cohort()
+            if not cohort:
+                return []
+            student_ids = [row[0] for row in cohort]
+            heads = self.chain_heads(student_ids)
+            built = self.built_students(student_ids)
+            # Whole seconds, so the hashed value survives any database's datetime precision.
+            flows = self.prepare(cohort, heads, now().replace(microsecond=0), built)
+            return Flow.objects.bulk_create(flows, batch_size=FLOW_BATCH_SIZE)
+
+
+def build_cohort_flows(level_class, term):
+    return FlowBuilder(level_class, term).build()
+
+
+def build_school_flows(school, term):
+    """
+    Build the flows of every class of a school for a term, then commit the
+    school's Merkle checkpoint for the term.
+    """
+    flows = []
+    for level_class in school.classes.select_related('program_level_template').all():
+        flows.extend(FlowBuilder(level_class, term).build())
+    commit_checkpoint(school.pk, term.pk)
+    return flows
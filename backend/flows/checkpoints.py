@@ -0,0 +1,56 @@
+from backend.flows.merkle import merkle_root, pack_tree, packed_proof, verify_proof
+from backend.flows.models import Flow, FlowCheckpoint
+
+
+def school_term_headers(school_id, term_id):
+    """
+    Header hashes of the flows of a school for a term, sorted (the Merkle leaf order).
+    """
+    return list(
+        Flow.objects.filter(school_id=school_id, term_id=term_id)
+        .order_by('header_hash')
+        .values_list('header_hash', flat=True)
+    )
+
+
+def commit_checkpoint(school_id, term_id):
+    """
+    Compute and store the Merkle root of a school's flows for a term.
+    Committing again after more flows were built replaces the root.
+    """
+    headers = school_term_headers(school_id, term_id)
+    if not headers:
+        return None
+    checkpoint, _ = FlowCheckpoint.objects.update_or_create(
+        school_id=school_id,
+        term_id=term_id,
+        defaults={'merkle_root': merkle_root(headers), 'leaf_count': len(headers), 'tree': pack_tree(headers)},
+    )
+    return checkpoint
+
+
+def flow_proof(flow, checkpoint=None):
+    """
+    The Merkle proof of a flow within its school/term checkpoint, read from the
+    checkpoint's stored tree; None when the flow was not committed.
+    """
+    if checkpoint is None:
+        checkpoint = FlowCheckpoint.objects.filter(school_id=flow.school_id, term_id=flow.term_id).first()
+        if checkpoint is None:
+            return None
+    return packed_proof(checkpoint.tree, checkpoint.leaf_count, flow.header_hash)
+
+
+def verify_flow(flow, proof=None):
+    """
+    Check a flow against its school/term checkpoint. Only the proof is hashed,
+    so this costs O(log n) hashes once the proof is known.
+    """
+    checkpoint = FlowCheckpoint.objects.filter(school_id=flow.school_id, term_id=flow.term_id).first()
+    if checkpoint is None:
+        return False
+    if proof is None:
+        proof = flow_proof(flow, checkpoint)
+        if proof is None:
+            return False
+    return verify_proof(flow.header_hash, proof, checkpoint.merkle_root)
@@ -0,0 +1,49 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from backend.flows.builder import FlowBuilder
+from backend.schools.models import AcademicSession, LevelClasses, ProgramLevelTemplate, Term
+
+
+class Command(BaseCommand):
+    help = 'Benchmark building flows (serialization, hashing and Flow instances) for synthetic cohorts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000, help='Number of flows to build.')
+        parser.add_argument('--cohort-size', type=int, default=40, help='Students per class cohort.')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        cohort_size = options['cohort_size']
+
+        # Unsaved objects: the benchmark touches no database.
+        template = ProgramLevelTemplate(pk=1, program='jss', level='JSS 1')
+        session = AcademicSession(pk=1, session_name='2024/2025')
+        term = Term(pk=1, term_name=1, academic_session=session)
+        timestamp = now().replace(microsecond=0)
+
+        cohorts = []
+        for start in range(0, count, cohort_size):
+            size = min(cohort_size, count - start)
+            level_class = LevelClasses(
+                pk=start // cohort_size + 1,
+                school_id=uuid.uuid4(),
+                program_level_template=template,
+                class_section_name='A',
+            )
+            students = [(uuid.uuid4(), f'{start + i:011d}', None) for i in range(size)]
+            cohorts.append((level_class, students))
+
+        started = time.perf_counter()
+        built = 0
+        for level_class, students in cohorts:
+            built += len(FlowBuilder(level_class, term).prepare(students, {}, timestamp))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Built {built} flows in {len(cohorts)} cohorts in {elapsed:.2f}s "
+            f"({built / elapsed:,.0f} flows/s)."
+        )
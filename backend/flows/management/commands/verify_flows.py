@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from backend.flows.models import FlowCheckpoint
+from backend.flows.verification import (
+    VERIFY_CHUNK_SIZE,
+    init_worker,
+    student_ranges,
+    verify_checkpoint,
+    verify_student_range,
+)
+
+
+class Command(BaseCommand):
+    help = 'Re-verify every flow chain and Merkle checkpoint, printing mismatches as they are found.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes; 0 verifies in this process.')
+        parser.add_argument('--chunk-size', type=int, default=VERIFY_CHUNK_SIZE, help='Students per task.')
+        parser.add_argument('--skip-checkpoints', action='store_true', help='Do not recompute Merkle roots.')
+
+    def handle(self, *args, **options):
+        ranges = student_ranges(options['chunk_size'])
+        checkpoint_ids = [] if options['skip_checkpoints'] else list(FlowCheckpoint.objects.values_list('pk', flat=True))
+
+        if options['workers'] == 0:
+            mismatches = sum(self.report_chains(verify_student_range(*bounds)) for bounds in ranges)
+            mismatches += sum(self.report_checkpoint(pk, verify_checkpoint(pk)) for pk in checkpoint_ids)
+        else:
+            # Workers must not share the parent's database connections.
+            connections.close_all()
+            mismatches = 0
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as executor:
+                chains = [executor.submit(verify_student_range, *bounds) for bounds in ranges]
+                checkpoints = {executor.submit(verify_checkpoint, pk): pk for pk in checkpoint_ids}
+                for future in as_completed(chains):
+                    mismatches += self.report_chains(future.result())
+                for future in as_completed(checkpoints):
+                    mismatches += self.report_checkpoint(checkpoints[future], future.result())
+
+        if mismatches:
+            self.stderr.write(self.style.ERROR(f"{mismatches} mismatches found."))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Verified the flows of {len(ranges)} student ranges and {len(checkpoint_ids)} checkpoints."
+            ))
+
+    def report_chains(self, mismatches):
+        for pk, student_id, sequence, reason in mismatches:
+            self.stdout.write(f"flow {pk} student {student_id} sequence {sequence}: {reason}")
+        self.stdout.flush()
+        return len(mismatches)
+
+    def report_checkpoint(self, pk, reason):
+        if reason is None:
+            return 0
+        self.stdout.write(f"checkpoint {pk}: {reason}")
+        self.stdout.flush()
+        return 1
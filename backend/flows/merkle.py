@@ -0,0 +1,133 @@
+"""
+Merkle trees over flow header hashes.
+
+Leaves and inner nodes are hashed with different prefixes so a leaf can never be
+passed off as an inner node. An odd node at the end of a level is carried up
+unchanged rather than paired with itself.
+
+A proof is a list of (sibling hash, side) pairs from the leaf up to the root,
+where side is 'L' when the sibling is on the left.
+
+A packed tree is one bytes value: the sorted header hashes, then every level
+of their tree from the leaves up, NODE_SIZE bytes per hash. The level sizes
+follow from the leaf count, so a proof is read from it by a binary search for
+the header and one sibling per level, without rehashing the tree.
+"""
+import hashlib
+from bisect import bisect_left
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+NODE_SIZE = 32
+
+
+def hash_leaf(header_hash):
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(header_hash)).digest()
+
+
+def hash_node(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def next_level(level):
+    parents = [hash_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_levels(header_hashes):
+    """
+    Every level of the tree over a list of header hashes, leaves first.
+    """
+    levels = [[hash_leaf(header) for header in header_hashes]]
+    while len(levels[-1]) > 1:
+        levels.append(next_level(levels[-1]))
+    return levels
+
+
+def level_sizes(leaf_count):
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def merkle_root(header_hashes):
+    """
+    The hex Merkle root of a list of header hashes (in the given order).
+    """
+    if not header_hashes:
+        return None
+    return merkle_levels(header_hashes)[-1][0].hex()
+
+
+def levels_proof(levels, index):
+    """
+    The proof of leaf `index` from the tree's levels, leaves first.
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((bytes(level[sibling]).hex(), 'L' if sibling < index else 'R'))
+        index //= 2
+    return proof
+
+
+def merkle_proof(header_hashes, index):
+    """
+    The proof that header_hashes[index] is part of the tree.
+    """
+    return levels_proof(merkle_levels(header_hashes), index)
+
+
+def pack_tree(header_hashes):
+    """
+    The packed tree of a sorted list of header hashes.
+    """
+    levels = merkle_levels(header_hashes)
+    return b''.join(bytes.fromhex(header) for header in header_hashes) + b''.join(b''.join(level) for level in levels)
+
+
+class PackedLevel:
+    """
+    One level of a packed tree, as a read-only sequence of NODE_SIZE-byte hashes.
+    """
+
+    def __init__(self, tree, offset, size):
+        self.tree, self.offset, self.size = tree, offset, size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        start = (self.offset + index) * NODE_SIZE
+        return self.tree[start:start + NODE_SIZE]
+
+
+def packed_proof(tree, leaf_count, header_hash):
+    """
+    The proof of `header_hash` read from a packed tree of `leaf_count` leaves,
+    or None when it is not one of the tree's headers.
+    """
+    tree = memoryview(tree)
+    headers = PackedLevel(tree, 0, leaf_count)
+    target = bytes.fromhex(header_hash)
+    index = bisect_left(headers, target, key=bytes)
+    if index == leaf_count or headers[index] != target:
+        return None
+
+    levels, offset = [], leaf_count
+    for size in level_sizes(leaf_count):
+        levels.append(PackedLevel(tree, offset, size))
+        offset += size
+    return levels_proof(levels, index)
+
+
+def verify_proof(header_hash, proof, root):
+    node = hash_leaf(header_hash)
+    for sibling, side in proof:
+        sibling = bytes.fromhex(sibling)
+        node = hash_node(sibling, node) if side == 'L' else hash_node(node, sibling)
+    return node.hex() == root
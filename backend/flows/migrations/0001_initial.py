@@ -0,0 +1,116 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("schools", "0001_initial"),
+        ("student", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Flow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sequence",
+                    models.PositiveIntegerField(
+                        help_text="Position of this flow in the student's chain, starting at 1."
+                    ),
+                ),
+                (
+                    "cohort_size",
+                    models.PositiveIntegerField(
+                        help_text="Number of students whose flows were built together with this one."
+                    ),
+                ),
+                (
+                    "previous_hash",
+                    models.CharField(
+                        help_text="Header hash of the student's previous flow.",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "payload_digest",
+                    models.CharField(
+                        help_text="SHA-256 of the canonical term record.", max_length=64
+                    ),
+                ),
+                (
+                    "header_hash",
+                    models.CharField(
+                        help_text="SHA-256 header of this flow.",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "timestamp",
+                    models.DateTimeField(
+                        help_text="When the flow was built; part of the header hash."
+                    ),
+                ),
+                (
+                    "level_class",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="The class section the student was in for the term.",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="flows",
+                        to="schools.levelclasses",
+                    ),
+                ),
+                (
+                    "school",
+                    models.ForeignKey(
+                        help_text="The school that issued this flow.",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="flows",
+                        to="schools.school",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        help_text="The student this flow belongs to.",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="flows",
+                        to="student.student",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        help_text="The term this flow records.",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="flows",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["school", "term"], name="flows_flow_school__1f5df8_idx"
+                    )
+                ],
+                "unique_together": {("student", "sequence"), ("student", "term")},
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flows", "0001_initial"),
+        ("schools", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlowCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "merkle_root",
+                    models.CharField(
+                        help_text="Merkle root of the flows' header hashes, sorted.",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "leaf_count",
+                    models.PositiveIntegerField(help_text="Number of flows committed."),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "school",
+                    models.ForeignKey(
+                        help_text="The school whose flows are committed.",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="flow_checkpoints",
+                        to="schools.school",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        help_text="The term whose flows are committed.",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="flow_checkpoints",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("school", "term")},
+            },
+        ),
+    ]
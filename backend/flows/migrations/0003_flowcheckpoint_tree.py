@@ -0,0 +1,40 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+from backend.flows.merkle import pack_tree
+
+
+def pack_checkpoint_trees(apps, schema_editor):
+    Flow = apps.get_model("flows", "Flow")
+    FlowCheckpoint = apps.get_model("flows", "FlowCheckpoint")
+    for checkpoint in FlowCheckpoint.objects.iterator():
+        headers = list(
+            Flow.objects.filter(
+                school_id=checkpoint.school_id, term_id=checkpoint.term_id
+            )
+            .order_by("header_hash")
+            .values_list("header_hash", flat=True)
+        )
+        checkpoint.tree = pack_tree(headers)
+        checkpoint.save(update_fields=["tree"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("flows", "0002_flowcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flowcheckpoint",
+            name="tree",
+            field=models.BinaryField(
+                default=b"",
+                help_text="The sorted header hashes and every level of their Merkle tree (see backend.flows.merkle).",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(pack_checkpoint_trees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,2 @@
+from .flow import Flow
+from .checkpoint import FlowCheckpoint
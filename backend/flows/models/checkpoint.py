@@ -0,0 +1,37 @@
+from django.db import models
+
+from backend.schools.models import School, Term
+
+class FlowCheckpoint(models.Model):
+    """
+    The Merkle root over the header hashes of every flow a school issued for a term.
+
+    A single student's flow can then be checked against the root with a
+    log-sized proof (see backend.flows.checkpoints) instead of re-hashing chains;
+    the proof is read from the stored tree.
+    """
+    school = models.ForeignKey(
+        School,
+        on_delete=models.PROTECT,
+        related_name='flow_checkpoints',
+        help_text="The school whose flows are committed."
+    )
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.PROTECT,
+        related_name='flow_checkpoints',
+        help_text="The term whose flows are committed."
+    )
+    merkle_root = models.CharField(max_length=64, help_text="Merkle root of the flows' header hashes, sorted.")
+    leaf_count = models.PositiveIntegerField(help_text="Number of flows committed.")
+    tree = models.BinaryField(
+        help_text="The sorted header hashes and every level of their Merkle tree (see backend.flows.merkle)."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('school', 'term')
+
+    def __str__(self):
+        return f"Checkpoint {self.merkle_root[:12]} ({self.leaf_count} flows)"
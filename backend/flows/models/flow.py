@@ -0,0 +1,55 @@
+from django.db import models
+
+from backend.schools.models import School, LevelClasses, Term
+from backend.student.models import Student
+
+class Flow(models.Model):
+    """
+    One block of a student's Flows chain: the record of a student for a term.
+
+    Only hashes are stored. `payload_digest` is the SHA-256 of the canonical
+    term record (see backend.flows.algorithms), and `header_hash` chains it to
+    the student's previous flow together with the school key, the size of the
+    cohort the flow was built with and the timestamp.
+    """
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.PROTECT,
+        related_name='flows',
+        help_text="The student this flow belongs to."
+    )
+    school = models.ForeignKey(
+        School,
+        on_delete=models.PROTECT,
+        related_name='flows',
+        help_text="The school that issued this flow."
+    )
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.PROTECT,
+        related_name='flows',
+        help_text="The term this flow records."
+    )
+    level_class = models.ForeignKey(
+        LevelClasses,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='flows',
+        help_text="The class section the student was in for the term."
+    )
+    sequence = models.PositiveIntegerField(help_text="Position of this flow in the student's chain, starting at 1.")
+    cohort_size = models.PositiveIntegerField(help_text="Number of students whose flows were built together with this one.")
+    previous_hash = models.CharField(max_length=64, help_text="Header hash of the student's previous flow.")
+    payload_digest = models.CharField(max_length=64, help_text="SHA-256 of the canonical term record.")
+    header_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 header of this flow.")
+    timestamp = models.DateTimeField(help_text="When the flow was built; part of the header hash.")
+
+    class Meta:
+        unique_together = (('student', 'term'), ('student', 'sequence'))
+        indexes = [
+            models.Index(fields=['school', 'term']),
+        ]
+
+    def __str__(self):
+        return f"Flow {self.sequence} of {self.student_id} ({self.header_hash[:12]})"
@@ -0,0 +1,199 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from backend.flows.algorithms import GENESIS_HASH, compute_header
+from backend.flows.builder import FlowBuilder, build_school_flows
+from backend.flows.checkpoints import flow_proof, verify_flow
+from backend.flows.merkle import merkle_proof, merkle_root, pack_tree, packed_proof, verify_proof
+from backend.flows.models import Flow, FlowCheckpoint
+from backend.schools.models import School, AcademicSession, Term, ProgramLevelTemplate, LevelClasses
+from backend.student.models import Student, EnrollmentRecord
+
+
+class FlowTestMixin:
+
+    def create_cohort(self, size=5):
+        self.school = School.objects.create(
+            name='Test Public School', school_type='public', program='jss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        self.session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        self.first_term = Term.objects.create(
+            academic_session=self.session, term_name=1, start_date=date(2024, 9, 1), end_date=date(2024, 12, 15),
+        )
+        self.second_term = Term.objects.create(
+            academic_session=self.session, term_name=2, start_date=date(2025, 1, 6), end_date=date(2025, 4, 4),
+        )
+        template = ProgramLevelTemplate.objects.create(program='jss', level='JSS 1')
+        self.level_class = LevelClasses.objects.create(
+            school=self.school, program_level_template=template, class_section_name='A',
+        )
+        self.students = []
+        for i in range(size):
+            student = Student.objects.create(
+                first_name='Amina', last_name=f'Test{"abcdefghij"[i]}', date_of_birth=date(2012, 1, 1),
+                gender='F', country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North',
+                school=self.school, passport_photograph=f'students/passport/test{i}.jpg',
+            )
+            EnrollmentRecord.objects.create(
+                student=student, school=self.school, program='jss',
+                academic_session=self.session, program_level=self.level_class,
+            )
+            self.students.append(student)
+
+
+class FlowBuilderTest(FlowTestMixin, TestCase):
+
+    def setUp(self):
+        self.create_cohort()
+
+    def test_build_cohort_in_fixed_queries(self):
+        """
+        Test that a cohort's flows are built with a fixed number of queries.
+        """
+        level_class = LevelClasses.objects.get(pk=self.level_class.pk)
+        term = Term.objects.get(pk=self.first_term.pk)
+        builder = FlowBuilder(level_class, term)
+        # Savepoint, cohort, chain heads, built students, insert, release, plus the class level and session.
+        with self.assertNumQueries(8):
+            flows = builder.build()
+        self.assertEqual(len(flows), len(self.students))
+        self.assertEqual(Flow.objects.filter(term=self.first_term).count(), len(self.students))
+
+    def test_chain_links_terms(self):
+        """
+        Test that each term's flow is chained to the student's previous flow.
+        """
+        FlowBuilder(self.level_class, self.first_term).build()
+        FlowBuilder(self.level_class, self.second_term).build()
+
+        for student in self.students:
+            first, second = Flow.objects.filter(student=student).order_by('sequence')
+            self.assertEqual(first.previous_hash, GENESIS_HASH)
+            self.assertEqual(second.previous_hash, first.header_hash)
+            self.assertEqual(second.sequence, 2)
+            self.assertEqual(compute_header(first), first.header_hash)
+            self.assertEqual(compute_header(second), second.header_hash)
+
+    def test_build_is_idempotent(self):
+        """
+        Test that building a cohort twice for the same term adds no flows.
+        """
+        FlowBuilder(self.level_class, self.first_term).build()
+        self.assertEqual(FlowBuilder(self.level_class, self.first_term).build(), [])
+        self.assertEqual(Flow.objects.count(), len(self.students))
+
+    def test_rebuilding_an_earlier_term_adds_no_flows(self):
+        """
+        Test that rebuilding a term after a later one was built skips every student.
+        """
+        FlowBuilder(self.level_class, self.first_term).build()
+        FlowBuilder(self.level_class, self.second_term).build()
+        self.assertEqual(FlowBuilder(self.level_class, self.first_term).build(), [])
+        self.assertEqual(Flow.objects.count(), 2 * len(self.students))
+
+    def test_tampered_flow_is_detected(self):
+        """
+        Test that changing a stored digest no longer matches the header.
+        """
+        flow = FlowBuilder(self.level_class, self.first_term).build()[0]
+        flow.payload_digest = '1' * 64
+        self.assertNotEqual(compute_header(flow), flow.header_hash)
+
+
+class MerkleTest(TestCase):
+
+    def test_proofs_verify_for_every_leaf(self):
+        """
+        Test that every leaf's proof verifies against the root, for odd and even sizes.
+        """
+        for size in (1, 2, 5, 8, 13):
+            headers = [f'{i:064x}' for i in range(size)]
+            root = merkle_root(headers)
+            for index, header in enumerate(headers):
+                proof = merkle_proof(headers, index)
+                self.assertLessEqual(len(proof), max(size - 1, 0).bit_length())
+                self.assertTrue(verify_proof(header, proof, root))
+            self.assertFalse(verify_proof('f' * 64, merkle_proof(headers, 0), root))
+
+    def test_packed_tree_gives_the_same_proofs(self):
+        for size in (1, 2, 5, 8, 13):
+            headers = [f'{2 * i + 1:064x}' for i in range(size)]
+            tree = pack_tree(headers)
+            for index, header in enumerate(headers):
+                self.assertEqual(packed_proof(tree, size, header), merkle_proof(headers, index))
+            for missing in (0, 2 * size):
+                self.assertIsNone(packed_proof(tree, size, f'{missing:064x}'))
+
+
+class FlowCheckpointTest(FlowTestMixin, TestCase):
+
+    def setUp(self):
+        self.create_cohort()
+        build_school_flows(self.school, self.first_term)
+        build_school_flows(self.school, self.second_term)
+
+    def test_checkpoint_commits_school_term(self):
+        """
+        Test that building a school's flows commits a checkpoint each flow can be proven against.
+        """
+        checkpoint = FlowCheckpoint.objects.get(school=self.school, term=self.first_term)
+        self.assertEqual(checkpoint.leaf_count, len(self.students))
+        for flow in Flow.objects.filter(term=self.first_term):
+            self.assertTrue(verify_flow(flow, flow_proof(flow)))
+            # The checkpoint only: the proof is read from its tree, not from the flows.
+            with self.assertNumQueries(1):
+                self.assertTrue(verify_flow(flow))
+
+    def test_verify_flows_reports_nothing_for_intact_chains(self):
+        out = StringIO()
+        call_command('verify_flows', workers=0, chunk_size=2, stdout=out)
+        self.assertIn('Verified the flows of 3 student ranges and 2 checkpoints.', out.getvalue())
+
+    def test_verify_flows_streams_mismatches(self):
+        """
+        Test that a tampered flow breaks its header, the next link and its checkpoint.
+        """
+        flow = Flow.objects.get(student=self.students[0], sequence=1)
+        Flow.objects.filter(pk=flow.pk).update(payload_digest='1' * 64)
+
+        out, err = StringIO(), StringIO()
+        call_command('verify_flows', workers=0, stdout=out, stderr=err)
+        self.assertIn(f'flow {flow.pk} student {flow.student_id} sequence 1: header hash does not match the flow', out.getvalue())
+        self.assertNotIn('checkpoint', out.getvalue())
+        self.assertIn('1 mismatches found.', err.getvalue())
+
+        Flow.objects.filter(pk=flow.pk).update(header_hash='2' * 64)
+        out = StringIO()
+        call_command('verify_flows', workers=0, stdout=out, stderr=StringIO())
+        self.assertIn('sequence 2: previous hash does not match the previous flow', out.getvalue())
+        self.assertIn('merkle root does not match the flows', out.getvalue())
+
+    def test_verify_flows_reports_a_tampered_tree(self):
+        checkpoint = FlowCheckpoint.objects.get(school=self.school, term=self.first_term)
+        FlowCheckpoint.objects.filter(pk=checkpoint.pk).update(tree=bytes(checkpoint.tree)[:-1] + b'\x00')
+        out = StringIO()
+        call_command('verify_flows', workers=0, stdout=out, stderr=StringIO())
+        self.assertIn(f'checkpoint {checkpoint.pk}: stored tree does not match the flows', out.getvalue())
+
+
+class ParallelVerificationTest(FlowTestMixin, TransactionTestCase):
+    """
+    Worker processes open their own connections, so the flows must be committed.
+    """
+
+    def test_verify_flows_with_workers(self):
+        self.create_cohort()
+        build_school_flows(self.school, self.first_term)
+        flow = Flow.objects.get(student=self.students[0])
+        Flow.objects.filter(pk=flow.pk).update(payload_digest='1' * 64)
+
+        out, err = StringIO(), StringIO()
+        call_command('verify_flows', workers=2, chunk_size=2, stdout=out, stderr=err)
+        self.assertIn(f'flow {flow.pk} student {flow.student_id} sequence 1: header hash does not match the flow', out.getvalue())
+        self.assertIn('1 mismatches found.', err.getvalue())
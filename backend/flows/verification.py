@@ -0,0 +1,99 @@
+"""
+Re-verification of stored flows.
+
+Chains are verified from plain value rows ordered by (student, sequence), so a
+range of students can be checked by any process with one streamed query.
+"""
+from itertools import groupby
+
+import django
+
+from backend.flows.algorithms import GENESIS_HASH, header_hash, header_hasher, school_key
+from backend.flows.checkpoints import school_term_headers
+from backend.flows.merkle import merkle_root, pack_tree
+from backend.flows.models import Flow, FlowCheckpoint
+
+VERIFY_CHUNK_SIZE = 2000
+
+FLOW_ROW_FIELDS = (
+    'pk', 'student_id', 'school_id', 'sequence', 'cohort_size',
+    'previous_hash', 'payload_digest', 'header_hash', 'timestamp',
+)
+
+
+def verify_rows(rows, keys=None):
+    """
+    Verify flow rows (FLOW_ROW_FIELDS, ordered by student and sequence).
+    Yields (flow pk, student id, sequence, reason) for each mismatch.
+    """
+    keys = {} if keys is None else keys
+    for student_id, chain in groupby(rows, key=lambda row: row[1]):
+        previous, expected_sequence = GENESIS_HASH, 1
+        for pk, _, school_id, sequence, cohort_size, previous_hash, digest, header, timestamp in chain:
+            if sequence != expected_sequence:
+                yield pk, student_id, sequence, f'expected sequence {expected_sequence}'
+            if previous_hash != previous:
+                yield pk, student_id, sequence, 'previous hash does not match the previous flow'
+            key = keys.get(school_id)
+            if key is None:
+                key = keys[school_id] = school_key(school_id)
+            if header_hash(header_hasher(key, cohort_size, timestamp), previous_hash, digest) != header:
+                yield pk, student_id, sequence, 'header hash does not match the flow'
+            previous, expected_sequence = header, sequence + 1
+
+
+def student_ranges(chunk_size=VERIFY_CHUNK_SIZE):
+    """
+    Split the students with flows into (first, last) student id ranges of
+    `chunk_size` students each.
+    """
+    student_ids = (
+        Flow.objects.order_by('student_id').values_list('student_id', flat=True).distinct().iterator(chunk_size=chunk_size)
+    )
+    ranges, first, last, count = [], None, None, 0
+    for student_id in student_ids:
+        if first is None:
+            first = student_id
+        last, count = student_id, count + 1
+        if count == chunk_size:
+            ranges.append((first, last))
+            first, count = None, 0
+    if first is not None:
+        ranges.append((first, last))
+    return ranges
+
+
+def verify_student_range(first, last):
+    """
+    Verify the chains of the students between `first` and `last` (inclusive).
+    """
+    rows = (
+        Flow.objects.filter(student_id__gte=first, student_id__lte=last)
+        .order_by('student_id', 'sequence')
+        .values_list(*FLOW_ROW_FIELDS)
+        .iterator(chunk_size=VERIFY_CHUNK_SIZE)
+    )
+    return list(verify_rows(rows))
+
+
+def verify_checkpoint(checkpoint_id):
+    """
+    Recompute a checkpoint's Merkle root and tree. Returns a reason, or None when they match.
+    """
+    checkpoint = FlowCheckpoint.objects.get(pk=checkpoint_id)
+    headers = school_term_headers(checkpoint.school_id, checkpoint.term_id)
+    if len(headers) != checkpoint.leaf_count:
+        return f'{len(headers)} flows, {checkpoint.leaf_count} committed'
+    if merkle_root(headers) != checkpoint.merkle_root:
+        return 'merkle root does not match the flows'
+    if bytes(checkpoint.tree) != pack_tree(headers):
+        return 'stored tree does not match the flows'
+    return None
+
+
+def init_worker():
+    """
+    Process pool initializer. The parent closes its connections before the pool
+    starts, so each worker opens its own; setup() is needed under spawn.
+    """
+    django.setup()
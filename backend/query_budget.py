@@ -0,0 +1,199 @@
+"""
+Per-request query budgets.
+
+QueryBudgetMiddleware wraps every database connection with
+`connection.execute_wrapper` for the length of a request (and of a streamed
+response) and records the number of queries, the time spent in the database
+and how often each SQL shape ran. A shape is the SQL text with its IN lists
+collapsed, so the same query issued once per row of a page, the N+1
+pattern, counts as repeats of one shape whatever the parameters.
+
+A request over the budget of its URL name logs a warning to the 'samses'
+logger, with the figures in `extra['query_budget']` for structured log
+handlers. Budgets come from the QUERY_BUDGETS setting:
+
+    QUERY_BUDGETS = {
+        'default': {'queries': 50, 'db_time': 0.5, 'repeats': 10},
+        'student:list': {'queries': 10},
+    }
+
+where `db_time` is in seconds and `repeats` is how often one shape may run.
+Every request is also added to `query_stats`, totals by URL name, which staff
+can read at /query-stats/. The totals are kept per worker process, not shared:
+the page shows the figures of whichever worker served it, labelled with its
+host and process id, so collect them from each worker to see the whole site.
+Set QUERY_BUDGET_ENABLED to False to leave the middleware out.
+"""
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('samses')
+
+DEFAULT_BUDGET = {'queries': 50, 'db_time': 0.5, 'repeats': 10}
+REPORTED_SHAPES = 3
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def sql_shape(sql):
+    """
+    `sql` with its IN lists collapsed and whitespace normalized.
+    """
+    return WHITESPACE.sub(' ', IN_LIST.sub('IN (...)', sql)).strip()
+
+
+def budget_for(url_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return {**DEFAULT_BUDGET, **budgets.get('default', {}), **budgets.get(url_name, {})}
+
+
+class QueryRecorder:
+    """
+    An execute wrapper counting the queries it sees, their time and their shapes.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+
+    def wrap(self):
+        """
+        A context manager installing this recorder on every connection.
+        """
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+    def repeats(self, limit):
+        """
+        [(shape, count), ...] of the shapes run more than `limit` times, most repeated first.
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > limit]
+
+
+class QueryStats:
+    """
+    Query totals by URL name of this worker process only; nothing is shared
+    between processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def worker(self):
+        """
+        host:pid of this process, read on each call so a forked worker reports its own pid.
+        """
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    def reset(self):
+        with self._lock:
+            self.since = time.time()
+            self._stats = defaultdict(lambda: {
+                'requests': 0, 'queries': 0, 'db_time': 0.0, 'max_queries': 0, 'over_budget': 0, 'n_plus_one': 0,
+            })
+
+    def add(self, url_name, recorder, over_budget, n_plus_one):
+        with self._lock:
+            stats = self._stats[url_name]
+            stats['requests'] += 1
+            stats['queries'] += recorder.queries
+            stats['db_time'] += recorder.db_time
+            stats['max_queries'] = max(stats['max_queries'], recorder.queries)
+            stats['over_budget'] += over_budget
+            stats['n_plus_one'] += n_plus_one
+
+    def snapshot(self):
+        """
+        {url_name: totals, with mean queries and DB time per request}.
+        """
+        with self._lock:
+            return {
+                url_name: {
+                    **stats,
+                    'db_time': round(stats['db_time'], 4),
+                    'mean_queries': round(stats['queries'] / stats['requests'], 2),
+                    'mean_db_time': round(stats['db_time'] / stats['requests'], 4),
+                }
+                for url_name, stats in self._stats.items()
+            }
+
+
+query_stats = QueryStats()
+
+
+def report(request, response, recorder):
+    url_name = request.resolver_match.view_name if request.resolver_match else None
+    budget = budget_for(url_name)
+    repeats = recorder.repeats(budget['repeats'])
+    over = recorder.queries > budget['queries'] or recorder.db_time > budget['db_time'] or bool(repeats)
+    query_stats.add(url_name, recorder, over, bool(repeats))
+    if not over:
+        return
+    details = {
+        'url_name': url_name,
+        'path': request.path,
+        'method': request.method,
+        'status': response.status_code,
+        'queries': recorder.queries,
+        'db_time': round(recorder.db_time, 4),
+        'repeated': [{'sql': shape, 'count': count} for shape, count in repeats[:REPORTED_SHAPES]],
+        'budget': budget,
+    }
+    logger.warning(
+        "Query budget exceeded on %s: %d queries, %.0f ms in the database%s",
+        url_name or request.path, recorder.queries, recorder.db_time * 1000,
+        f", {repeats[0][1]} runs of one query (N+1?)" if repeats else "",
+        extra={'query_budget': details},
+    )
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.wrap():
+            response = self.get_response(request)
+        if response.streaming and not getattr(response, 'is_async', False):
+            response.streaming_content = self.streamed(response.streaming_content, request, response, recorder)
+        else:
+            report(request, response, recorder)
+        return response
+
+    def streamed(self, chunks, request, response, recorder):
+        # A streamed body runs its queries after the view has returned.
+        try:
+            with recorder.wrap():
+                yield from chunks
+        finally:
+            report(request, response, recorder)
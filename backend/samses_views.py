@@ -1,9 +1,22 @@
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 
+from backend.query_budget import query_stats
+
 def home_view(request):
     return render(request, 'home.html')
 
 @login_required
 def dashboard(request):
-    return render(request, 'dashboard.html')
\ No newline at end of file
+    return render(request, 'dashboard.html')
+
+@staff_member_required
+def query_stats_view(request):
+    """
+    Query totals by URL name of the worker process serving the request, as
+    JSON, with the worker's host:pid and the time (epoch seconds) its totals
+    start from.
+    """
+    return JsonResponse({'worker': query_stats.worker, 'since': query_stats.since, 'stats': query_stats.snapshot()})
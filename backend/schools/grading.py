@@ -0,0 +1,160 @@
+"""
+Vectorized grading.
+
+GradingEngine reads the grade boundaries of the grading scales and the
+subject grading configurations once, keeps every scale as sorted NumPy
+arrays, and grades whole columns of scores with `searchsorted`. Input and
+output are columns (dicts of equal-length sequences), so a class list, a
+school or a state's results go through in one call.
+
+A score gets the grade of the boundary with the highest lower bound at or
+below it, as long as it does not pass that boundary's upper bound (fractions
+up to the next boundary's lower bound are allowed, so 69.5 is still a B when B
+is 60-69 and A starts at 70). Scores below every boundary, above the top one,
+in a gap between boundaries or missing (NaN) get an empty grade.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from backend.schools.models import GradeBoundary, SubjectGradingConfiguration
+
+UNGRADED = ''
+
+
+@dataclass
+class ScaleArrays:
+    lower: np.ndarray
+    upper: np.ndarray
+    # Fractional scores past upper[i] still belong to boundary i while they are
+    # below both upper[i] + 1 and next_lower[i]; -inf for the top boundary.
+    next_lower: np.ndarray
+    grades: np.ndarray
+
+    @classmethod
+    def from_boundaries(cls, boundaries):
+        boundaries = sorted(boundaries, key=lambda boundary: boundary[1])
+        lower = np.array([boundary[1] for boundary in boundaries], dtype=float)
+        upper = np.array([boundary[2] for boundary in boundaries], dtype=float)
+        next_lower = np.append(lower[1:], -np.inf)
+        grades = np.array([boundary[0] for boundary in boundaries] + [UNGRADED], dtype=object)
+        return cls(lower, upper, next_lower, grades)
+
+    def grade(self, scores):
+        """
+        Grades of a float array of scores, as an object array.
+        """
+        if not len(self.lower):
+            return np.full(len(scores), UNGRADED, dtype=object)
+        index = np.searchsorted(self.lower, scores, side='right') - 1
+        safe = np.clip(index, 0, None)
+        upper = self.upper[safe]
+        valid = (index >= 0) & ((scores <= upper) | ((scores < upper + 1) & (scores < self.next_lower[safe])))
+        # The extra last label is the empty grade.
+        return self.grades[np.where(valid, safe, len(self.lower))]
+
+
+def as_array(values, dtype=None):
+    return values if isinstance(values, np.ndarray) and dtype is None else np.asarray(values, dtype=dtype)
+
+
+class GradingEngine:
+    """
+    Grades scores against the GradeBoundary tables.
+
+    `scales` limits loading to some GradingScale ids. `default_scale` grades
+    subjects that have no SubjectGradingConfiguration, with a weightage of
+    `default_weightage`.
+    """
+
+    def __init__(self, scales=None, default_scale=None, default_weightage=100):
+        boundaries = GradeBoundary.objects.order_by()
+        configurations = SubjectGradingConfiguration.objects.order_by('pk')
+        if scales is not None:
+            boundaries = boundaries.filter(grading_scale__in=scales)
+            configurations = configurations.filter(grading_scale__in=scales)
+
+        by_scale = {}
+        for scale_id, grade, lower, upper in boundaries.values_list('grading_scale_id', 'grade', 'lower_bound', 'upper_bound'):
+            by_scale.setdefault(scale_id, []).append((grade, lower, upper))
+        self.scales = {scale_id: ScaleArrays.from_boundaries(rows) for scale_id, rows in by_scale.items()}
+
+        # The latest configuration of a subject wins.
+        self.subject_scale, self.subject_weight = {}, {}
+        for subject_id, scale_id, weightage in configurations.values_list('subject_id', 'grading_scale_id', 'weightage'):
+            self.subject_scale[subject_id] = scale_id
+            self.subject_weight[subject_id] = float(weightage)
+        self.default_scale = getattr(default_scale, 'pk', default_scale)
+        self.default_weightage = float(default_weightage)
+
+    def scale(self, scale_id):
+        return self.scales.get(scale_id) or ScaleArrays.from_boundaries([])
+
+    def grade(self, scores, scale):
+        """
+        Grade a sequence of scores on one grading scale (an instance or its id).
+        """
+        return self.scale(getattr(scale, 'pk', scale)).grade(as_array(scores, dtype=float))
+
+    def subject_lookup(self, subjects):
+        """
+        (inverse, scale ids, weights): the unique subjects' scales and weights,
+        with `inverse` mapping every row to its unique subject.
+        """
+        unique, inverse = np.unique(as_array(subjects), return_inverse=True)
+        scale_ids = [self.subject_scale.get(subject, self.default_scale) for subject in unique.tolist()]
+        weights = np.array(
+            [self.subject_weight.get(subject, self.default_weightage) for subject in unique.tolist()], dtype=float,
+        )
+        return inverse, scale_ids, weights
+
+    def grade_subjects(self, columns):
+        """
+        Grade rows of subject scores.
+
+        `columns` holds 'subject' (SubjectRepository ids) and 'score', plus any
+        other columns, which are passed through. Returns the columns with
+        'grade', 'weight' and 'weighted_score' (score times weight) added.
+        """
+        scores = as_array(columns['score'], dtype=float)
+        inverse, scale_ids, weights = self.subject_lookup(columns['subject'])
+        codes = {scale_id: code for code, scale_id in enumerate(dict.fromkeys(scale_ids))}
+        row_codes = np.array([codes[scale_id] for scale_id in scale_ids], dtype=int)[inverse]
+
+        grades = np.full(len(scores), UNGRADED, dtype=object)
+        for scale_id, code in codes.items():
+            if scale_id is not None:
+                rows = np.flatnonzero(row_codes == code)
+                grades[rows] = self.scale(scale_id).grade(scores[rows])
+
+        row_weights = weights[inverse]
+        return {**columns, 'grade': grades, 'weight': row_weights, 'weighted_score': scores * row_weights}
+
+    def aggregate(self, columns, scale=None):
+        """
+        Weighted average score per student.
+
+        `columns` holds 'student', 'subject' and 'score'. Missing scores are
+        left out of both sides of the average. Returns 'student',
+        'total_weight', 'weighted_total' and 'weighted_average' columns, plus
+        'grade' when an overall grading `scale` is given.
+        """
+        scores = as_array(columns['score'], dtype=float)
+        students, student_index = np.unique(as_array(columns['student']), return_inverse=True)
+        inverse, _, weights = self.subject_lookup(columns['subject'])
+        row_weights = np.where(np.isnan(scores), 0.0, weights[inverse])
+
+        total_weight = np.bincount(student_index, weights=row_weights, minlength=len(students))
+        weighted_total = np.bincount(student_index, weights=np.nan_to_num(scores) * row_weights, minlength=len(students))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = np.where(total_weight > 0, weighted_total / total_weight, np.nan)
+
+        result = {
+            'student': students,
+            'total_weight': total_weight,
+            'weighted_total': weighted_total,
+            'weighted_average': average,
+        }
+        if scale is not None:
+            result['grade'] = self.grade(average, scale)
+        return result
@@ -0,0 +1,170 @@
+"""
+Sequence-backed identifiers for invoices, receipts, expenses, accreditation
+and school registration numbers.
+
+Every kind of identifier has an IdAllocator. An allocator turns its context
+(the day, the school type, ...) into a prefix, and each prefix has its own
+IdSequence row. Values are reserved in blocks by advancing that row under a
+lock, so concurrent processes always get disjoint blocks. Whatever a process
+does not use of a block is kept in memory for its next call, but only once the
+reservation has been committed: a rolled back reservation is handed out again
+by the database and must not be used twice.
+"""
+import threading
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+ID_BLOCK_SIZE = 100
+ID_LOOKUP_BATCH_SIZE = 5000
+SCHOOL_TYPE_CODES = {'public': '1', 'private': '2', 'community': '3'}
+
+
+class IdAllocator:
+    """
+    Hands out `model.field` values of `width` digit numbers per prefix.
+
+    Subclasses decide the prefix and the layout of an ID by overriding
+    `prefix` and `format`.
+    """
+
+    def __init__(self, name, model, field, width, block_size=ID_BLOCK_SIZE):
+        self.name = name
+        self.model_label = model
+        self.field = field
+        self.width = width
+        self.block_size = block_size
+        self.spare = {}
+        self.lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def prefix(self, **context):
+        raise NotImplementedError
+
+    def format(self, prefix, value):
+        return f"{prefix}-{value:0{self.width}d}"
+
+    def reserve(self, prefix, count):
+        """
+        Reserve at least `count` values for `prefix` and return the first `count`.
+        """
+        from backend.schools.models import IdSequence
+
+        size = max(count, self.block_size)
+        with transaction.atomic():
+            sequence, _ = IdSequence.objects.select_for_update().get_or_create(key=f"{self.name}:{prefix}")
+            if sequence.last_value + size >= 10 ** self.width:
+                size = 10 ** self.width - 1 - sequence.last_value
+                if size < count:
+                    raise ValidationError(f"The {self.name} numbers of {prefix} are exhausted.")
+            IdSequence.objects.filter(pk=sequence.pk).update(last_value=F('last_value') + size)
+            block = range(sequence.last_value + 1, sequence.last_value + size + 1)
+            if len(block) > count:
+                transaction.on_commit(lambda: self.keep(prefix, block[count:]))
+        return block[:count]
+
+    def keep(self, prefix, values):
+        with self.lock:
+            if not self.spare.get(prefix):
+                self.spare[prefix] = values
+
+    def take_spare(self, prefix, count):
+        with self.lock:
+            values = self.spare.pop(prefix, range(0))
+            if len(values) > count:
+                self.spare[prefix] = values[count:]
+            return values[:count]
+
+    def allocate(self, count, **context):
+        """
+        Return `count` unused IDs. IDs issued before the sequences existed are
+        looked up once per block and skipped.
+        """
+        prefix = self.prefix(**context)
+        ids = []
+        while len(ids) < count:
+            needed = count - len(ids)
+            values = self.take_spare(prefix, needed)
+            if not values:
+                values = self.reserve(prefix, needed)
+            block = [self.format(prefix, value) for value in values]
+            taken = set()
+            for start in range(0, len(block), ID_LOOKUP_BATCH_SIZE):
+                taken.update(self.model.objects.filter(
+                    **{f'{self.field}__in': block[start:start + ID_LOOKUP_BATCH_SIZE]}
+                ).values_list(self.field, flat=True))
+            ids.extend(value for value in block if value not in taken)
+        return ids
+
+    def next(self, **context):
+        return self.allocate(1, **context)[0]
+
+
+class DailyIdAllocator(IdAllocator):
+    """
+    IDs like INV-20240101-000001, numbered afresh every day.
+    """
+
+    def __init__(self, code, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+    def prefix(self, day=None):
+        return f"{self.code}-{(day or now()).strftime('%Y%m%d')}"
+
+
+class AccreditationNumberAllocator(IdAllocator):
+    """
+    ACCR<yy><school type code>-<number>, numbered afresh every year.
+    """
+
+    def prefix(self, school_type, year=None):
+        return f"ACCR{str(year or now().year)[2:]}{SCHOOL_TYPE_CODES[school_type]}"
+
+
+class SchoolRegistrationNumberAllocator(IdAllocator):
+    """
+    <school type code><number>.
+    """
+
+    def prefix(self, school_type):
+        return SCHOOL_TYPE_CODES[school_type]
+
+    def format(self, prefix, value):
+        return f"{prefix}{value:0{self.width}d}"
+
+
+id_allocators = {}
+
+
+def register_id_allocator(allocator):
+    """
+    Add or replace the allocator used for `allocator.name`.
+    """
+    id_allocators[allocator.name] = allocator
+    return allocator
+
+
+def allocate_ids(name, count, **context):
+    return id_allocators[name].allocate(count, **context)
+
+
+def next_id(name, **context):
+    return id_allocators[name].next(**context)
+
+
+register_id_allocator(DailyIdAllocator('INV', 'invoice', 'schools.Invoice', 'invoice_id', width=6))
+register_id_allocator(DailyIdAllocator('REC', 'receipt', 'schools.Payment', 'receipt_number', width=8))
+register_id_allocator(DailyIdAllocator('EXP', 'expense', 'schools.SchoolExpense', 'receipt_number', width=6))
+register_id_allocator(AccreditationNumberAllocator(
+    'accreditation', 'schools.AccreditationStatus', 'accreditation_number', width=7, block_size=10,
+))
+register_id_allocator(SchoolRegistrationNumberAllocator(
+    'school_registration', 'schools.School', 'registration_number', width=7, block_size=10,
+))
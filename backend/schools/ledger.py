@@ -0,0 +1,187 @@
+"""
+Double-entry finance ledger.
+
+Finance records describe the ledger lines they stand for with
+`ledger_postings()`: (school_id, term_id, account, amount) tuples where debits
+are positive and credits negative, balancing to zero per school and term.
+`sync` compares those lines with what the record has already posted and
+appends only the difference, so creating, editing and deleting a record all
+go through the same path and no entry is ever rewritten.
+
+Every posting also moves the matching SchoolBalance rows in the same
+transaction, so per-school, per-term figures are read from a handful of rows
+however long the ledger grows.
+"""
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils.timezone import now
+
+from backend.schools.models.ledger import LEDGER_ACCOUNTS, LedgerEntry, SchoolBalance
+from backend.schools.session_resolver import match_session
+
+LEDGER_BATCH_SIZE = 1000
+ZERO = Decimal('0')
+
+
+def term_on(school, day):
+    """
+    The id of the term of `school` that `day` falls in, or None.
+    """
+    from backend.schools.models import Term
+
+    terms = Term.objects.filter(start_date__lte=day, end_date__gte=day).select_related('academic_session').order_by(
+        'academic_session__start_date', 'academic_session_id'
+    )
+    sessions = {term.academic_session: term for term in terms}
+    session = match_session(sessions, school.pk, school.school_type, school.program)
+    return sessions[session].pk if session is not None else None
+
+
+def net_lines(lines):
+    totals = defaultdict(Decimal)
+    for school_id, term_id, account, amount in lines:
+        totals[(school_id, term_id, account)] += Decimal(amount)
+    return totals
+
+
+def check_balanced(lines):
+    books = defaultdict(Decimal)
+    for school_id, term_id, account, amount in lines:
+        books[(school_id, term_id)] += Decimal(amount)
+    unbalanced = [book for book, total in books.items() if total]
+    if unbalanced:
+        raise ValueError(f"Ledger lines do not balance for (school, term) {unbalanced}.")
+
+
+def add_to_balance(school_id, term_id, account, debit, credit, count):
+    balances = SchoolBalance.objects.filter(school_id=school_id, term_id=term_id, account=account)
+    changes = {
+        'debit_total': F('debit_total') + debit,
+        'credit_total': F('credit_total') + credit,
+        'entry_count': F('entry_count') + count,
+        'updated_at': now(),
+    }
+    if balances.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            SchoolBalance.objects.create(
+                school_id=school_id, term_id=term_id, account=account,
+                debit_total=debit, credit_total=credit, entry_count=count,
+            )
+    except IntegrityError:
+        # Created by a concurrent posting in the meantime.
+        balances.update(**changes)
+
+
+def post(postings, batch_size=LEDGER_BATCH_SIZE):
+    """
+    Append (source_type, source_id, lines) postings and roll them into the
+    school balances. Zero lines are dropped. Returns the new entries.
+    """
+    entries = []
+    rollup = defaultdict(lambda: [ZERO, ZERO, 0])
+    for source_type, source_id, lines in postings:
+        check_balanced(lines)
+        transaction_id = uuid.uuid4()
+        for (school_id, term_id, account), amount in net_lines(lines).items():
+            if not amount:
+                continue
+            debit, credit = (amount, ZERO) if amount > 0 else (ZERO, -amount)
+            entries.append(LedgerEntry(
+                transaction_id=transaction_id, school_id=school_id, term_id=term_id, account=account,
+                debit=debit, credit=credit, source_type=source_type, source_id=source_id,
+            ))
+            totals = rollup[(school_id, term_id, account)]
+            totals[0] += debit
+            totals[1] += credit
+            totals[2] += 1
+    if not entries:
+        return []
+
+    with transaction.atomic(savepoint=False):
+        LedgerEntry.objects.bulk_create(entries, batch_size=batch_size)
+        # A fixed order keeps concurrent postings from locking balances in opposite orders.
+        for (school_id, term_id, account), (debit, credit, count) in sorted(
+            rollup.items(), key=lambda item: (str(item[0][0]), item[0][1] or 0, item[0][2])
+        ):
+            add_to_balance(school_id, term_id, account, debit, credit, count)
+    return entries
+
+
+def posted_lines(source_type, source_id):
+    """
+    The net amount a record has posted so far, by (school_id, term_id, account).
+    """
+    rows = LedgerEntry.objects.filter(source_type=source_type, source_id=source_id).values(
+        'school_id', 'term_id', 'account'
+    ).annotate(debit_sum=Sum('debit'), credit_sum=Sum('credit'))
+    return {
+        (row['school_id'], row['term_id'], row['account']): row['debit_sum'] - row['credit_sum']
+        for row in rows
+    }
+
+
+def sync(instance, deleted=False):
+    """
+    Post whatever `instance` is missing from the ledger: everything for a new
+    record, the difference for an edited one and a reversal for a deleted one.
+    """
+    model = type(instance)
+    source_type, source_id = model._meta.label, str(instance.pk)
+    with transaction.atomic(savepoint=False):
+        if deleted:
+            wanted = {}
+        else:
+            # Serializes concurrent edits of the same record.
+            model._default_manager.select_for_update().filter(pk=instance.pk).exists()
+            wanted = net_lines(instance.ledger_postings())
+        posted = posted_lines(source_type, source_id)
+        changes = [
+            (*key, wanted.get(key, ZERO) - posted.get(key, ZERO))
+            for key in wanted.keys() | posted.keys()
+            if wanted.get(key, ZERO) != posted.get(key, ZERO)
+        ]
+        return post([(source_type, source_id, changes)])
+
+
+def account_balances(**filters):
+    """
+    {account: {'debit': ..., 'credit': ..., 'balance': ...}} over the balances
+    matching `filters` (e.g. school=..., term=..., school__school_type=...),
+    read from the rollup table.
+    """
+    totals = SchoolBalance.objects.filter(**filters).values('account').annotate(
+        debit=Sum('debit_total'), credit=Sum('credit_total')
+    ).order_by()
+    balances = {
+        account: {'label': label, 'debit': ZERO, 'credit': ZERO, 'balance': ZERO}
+        for account, label in LEDGER_ACCOUNTS
+    }
+    for row in totals:
+        balance = balances[row['account']]
+        balance['debit'], balance['credit'] = row['debit'], row['credit']
+        balance['balance'] = row['debit'] - row['credit']
+    return balances
+
+
+def rebuild_balances():
+    """
+    Recompute every SchoolBalance from the ledger with one aggregate query.
+    """
+    totals = LedgerEntry.objects.values('school_id', 'term_id', 'account').annotate(
+        debit_sum=Sum('debit'), credit_sum=Sum('credit'), count=Count('id')
+    ).order_by()
+    with transaction.atomic():
+        SchoolBalance.objects.all().delete()
+        SchoolBalance.objects.bulk_create([
+            SchoolBalance(
+                school_id=row['school_id'], term_id=row['term_id'], account=row['account'],
+                debit_total=row['debit_sum'], credit_total=row['credit_sum'], entry_count=row['count'],
+            )
+            for row in totals.iterator()
+        ], batch_size=LEDGER_BATCH_SIZE)
@@ -0,0 +1,32 @@
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.api.exports import DATASETS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export
+
+
+class Command(BaseCommand):
+    help = 'Write a statewide dataset (schools, enrollments, staff or finance records) to a CSV or Parquet file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASETS))
+        parser.add_argument('--format', dest='output_format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', help='File to write (default: <dataset>.<format>).')
+        parser.add_argument('--school', help='Only export the records of this school (id).')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        dataset, output_format = options['dataset'], options['output_format']
+        path = options['output'] or f"{dataset}.{output_format}"
+        try:
+            chunks = export(dataset, output_format, school=options['school'], chunk_size=options['chunk_size'])
+        except ValidationError as error:
+            raise CommandError(' '.join(error.messages))
+        except ImproperlyConfigured as error:
+            raise CommandError(str(error))
+
+        size = 0
+        with open(path, 'wb') as file:
+            for chunk in chunks:
+                file.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {dataset} to {path} ({size} bytes)."))
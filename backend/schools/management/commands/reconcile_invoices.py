@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from backend.schools.models import Invoice
+from backend.schools.models.financial_information import INVOICE_RECONCILE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recompute the amount paid, balance and status of invoices that disagree with their payments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the mismatched invoices.')
+        parser.add_argument('--batch-size', type=int, default=INVOICE_RECONCILE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = 0
+            for invoice_id, paid in Invoice.objects.mismatched():
+                count += 1
+                self.stdout.write(f"{invoice_id}: payments total {paid}")
+            self.stdout.write(f"Dry run: {count} invoices to reconcile.")
+            return
+
+        count = Invoice.objects.reconcile(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {count} invoices."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from backend.schools import ledger
+from backend.schools.models.financial_information import LEDGER_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Post finance records missing from the ledger and optionally rebuild the school balances.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild-balances', action='store_true', help='Recompute the balances from the ledger.')
+
+    def handle(self, *args, **options):
+        for model in LEDGER_MODELS:
+            posted = 0
+            for record in model.objects.iterator(chunk_size=500):
+                if ledger.sync(record):
+                    posted += 1
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {posted} records posted.")
+
+        if options['rebuild_balances']:
+            ledger.rebuild_balances()
+            self.stdout.write("School balances rebuilt.")
+        self.stdout.write(self.style.SUCCESS("Ledger in sync."))
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:38
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_amount_paid(apps, schema_editor):
+    Invoice = apps.get_model("schools", "Invoice")
+    Payment = apps.get_model("schools", "Payment")
+    paid = (
+        Payment.objects.filter(invoice=OuterRef("pk"))
+        .values("invoice")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    Invoice.objects.update(
+        amount_paid=Coalesce(
+            Subquery(paid), Value(Decimal("0")), output_field=models.DecimalField()
+        )
+    )
+    Invoice.objects.update(balance=F("total_amount") - F("amount_paid"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="amount_paid",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0.0,
+                editable=False,
+                help_text="Total of the payments made.",
+                max_digits=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="balance",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0.0,
+                editable=False,
+                help_text="Amount left to pay.",
+                max_digits=10,
+            ),
+        ),
+        migrations.RunPython(backfill_amount_paid, migrations.RunPython.noop),
+    ]
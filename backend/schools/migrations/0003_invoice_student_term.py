@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0002_invoice_amount_paid_balance"),
+        ("student", "0004_rollovercheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="student",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The student being billed.",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="invoices",
+                to="student.student",
+            ),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="term",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The term the invoice bills for.",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="invoices",
+                to="schools.term",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="invoice",
+            unique_together={("student", "term")},
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0003_invoice_student_term"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=50, unique=True)),
+                (
+                    "last_value",
+                    models.BigIntegerField(
+                        default=0, help_text="Last value handed out."
+                    ),
+                ),
+            ],
+        ),
+    ]
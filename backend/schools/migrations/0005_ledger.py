@@ -0,0 +1,161 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0004_idsequence"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transaction_id",
+                    models.UUIDField(
+                        db_index=True,
+                        help_text="Lines posted together share this id and balance out.",
+                    ),
+                ),
+                (
+                    "account",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash and Bank"),
+                            ("receivable", "Fees Receivable"),
+                            ("fee_income", "Fee Income"),
+                            ("funding_income", "Funding Income"),
+                            ("expenses", "Operating Expenses"),
+                            ("salaries", "Salaries"),
+                            ("scholarships", "Scholarships and Aid"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "debit",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "credit",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "source_type",
+                    models.CharField(
+                        help_text="Label of the finance model that caused the posting.",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "source_id",
+                    models.CharField(
+                        help_text="Primary key of the finance record.", max_length=50
+                    ),
+                ),
+                ("posted_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "school",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_entries",
+                        to="schools.school",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_entries",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "ledger entries",
+                "indexes": [
+                    models.Index(
+                        fields=["source_type", "source_id"],
+                        name="schools_led_source__64fafd_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SchoolBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "account",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash and Bank"),
+                            ("receivable", "Fees Receivable"),
+                            ("fee_income", "Fee Income"),
+                            ("funding_income", "Funding Income"),
+                            ("expenses", "Operating Expenses"),
+                            ("salaries", "Salaries"),
+                            ("scholarships", "Scholarships and Aid"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "debit_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=17),
+                ),
+                (
+                    "credit_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=17),
+                ),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "school",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_balances",
+                        to="schools.school",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_balances",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("school", "term", "account")},
+            },
+        ),
+    ]
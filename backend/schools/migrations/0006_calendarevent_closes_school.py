@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0005_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="calendarevent",
+            name="closes_school",
+            field=models.BooleanField(
+                default=False,
+                help_text="Indicates if the school is closed for the event (e.g. a public holiday).",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0006_calendarevent_closes_school"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="school",
+            index=models.Index(
+                fields=["updated_at", "id"], name="schools_sch_updated_6385fd_idx"
+            ),
+        ),
+    ]
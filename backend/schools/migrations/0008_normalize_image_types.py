@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:40
+
+from django.db import migrations
+
+# Image types the create views used to store -> the ones the update and
+# delete views (and the details page) look up.
+RENAMED_IMAGE_TYPES = {
+    "classrooms": "classroom",
+    "computerlab": "computer_lab",
+}
+
+
+def rename_image_types(apps, schema_editor):
+    SchoolImages = apps.get_model("schools", "SchoolImages")
+    for old, new in RENAMED_IMAGE_TYPES.items():
+        SchoolImages.objects.filter(image_type=old).update(image_type=new)
+
+
+def restore_image_types(apps, schema_editor):
+    SchoolImages = apps.get_model("schools", "SchoolImages")
+    for old, new in RENAMED_IMAGE_TYPES.items():
+        SchoolImages.objects.filter(image_type=new).update(image_type=old)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0007_school_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_image_types, restore_image_types),
+    ]
@@ -4,6 +4,8 @@ from .stakeholder import Stakeholder, Staff
 from .school_metadata import SchoolMetadata
 from .calendar_system import AcademicSession, Term, CalendarEvent, SuspensionClosure
 from .feedback import SchoolFeedback
+from .id_sequence import IdSequence
+from .ledger import LedgerEntry, SchoolBalance
 from .financial_information import (
     FeeStructure,
     Invoice,
@@ -1,8 +1,23 @@
 from datetime import date
 
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
 
 from .school import School
+from backend.schools.school_calendar import school_calendars
+from backend.schools.suspension_index import suspension_index
+from backend.schools.session_resolver import academic_session_resolver
+
+class AcademicSessionManager(models.Manager):
+
+    def resolve_for_schools(self, schools):
+        """
+        Return the ongoing session of every school in `schools` (a queryset or an
+        iterable of schools) as a dict keyed by school id. The ongoing sessions
+        are loaded once and matched in memory.
+        """
+        return academic_session_resolver.resolve_many(schools)
 
 class AcademicSession(models.Model):
     SCHOOL_TYPE_CHOICES = [
@@ -38,6 +53,8 @@ class AcademicSession(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
 
+    objects = AcademicSessionManager()
+
     def __str__(self):
         if self.school_type == 'all':
             return f"Session {self.session_name}, set for All schools, and for all {'programs' if self.program=='all' else self.program}"
@@ -57,6 +74,8 @@ class AcademicSession(models.Model):
     @classmethod
     def complete_all_ongoing_sessions(cls):
         cls.objects.filter(status="ongoing").update(status="completed")
+        # update() sends no signals, so drop the cached sessions here.
+        invalidate_academic_sessions()
         
     class Meta:
         unique_together = ('school', 'session_name', 'program', 'school_type')
@@ -110,6 +129,20 @@ class AcademicSession(models.Model):
         except Term.DoesNotExist:
             return None
 
+
+def invalidate_academic_sessions():
+    academic_session_resolver.invalidate()
+    # Also after commit, in case a session was resolved from uncommitted rows.
+    transaction.on_commit(academic_session_resolver.invalidate)
+
+@receiver(post_save, sender=AcademicSession)
+@receiver(post_delete, sender=AcademicSession)
+def invalidate_academic_session_cache(sender, instance, **kwargs):
+    """
+    Signal description: Drops the cached ongoing sessions whenever a session is saved or deleted.
+    """
+    invalidate_academic_sessions()
+
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
@@ -231,6 +264,9 @@ class CalendarEvent(models.Model):
     start_date = models.DateTimeField(help_text="Start date and time of the event.")
     end_date = models.DateTimeField(help_text="End date and time of the event.")
     is_mandatory = models.BooleanField(default=True, help_text="Indicates if attendance is mandatory.")
+    closes_school = models.BooleanField(
+        default=False, help_text="Indicates if the school is closed for the event (e.g. a public holiday)."
+    )
     description = models.TextField(blank=True, help_text="Additional details about the event.")
     recurrence_type = models.CharField(
         max_length=20,
@@ -271,7 +307,7 @@ class SuspensionClosure(models.Model):
             self.suspended_to = None
         super().save(*args, **kwargs)
     def __str__(self):
-        return f"{'State wide' if self.is_statewide else self.school.name} {self.suspension_type} ({self.start_date})"
+        return f"{'State wide' if self.is_statewide else self.school.name} {self.suspension_type} ({self.suspended_from})"
 
     def affects_date(self, query_date):
         if self.is_dropped:
@@ -279,3 +315,27 @@ class SuspensionClosure(models.Model):
         if self.is_indefinite:
             return query_date >= self.suspended_from
         return self.suspended_from <= query_date <= self.suspended_to
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+@receiver(post_save, sender=CalendarEvent)
+@receiver(post_delete, sender=CalendarEvent)
+@receiver(post_save, sender=SuspensionClosure)
+@receiver(post_delete, sender=SuspensionClosure)
+def invalidate_school_calendar_cache(sender, instance, **kwargs):
+    """
+    Signal description: Drops the cached school-day calendars whenever a term, event or suspension changes.
+    """
+    school_calendars.invalidate()
+    transaction.on_commit(school_calendars.invalidate)
+
+
+@receiver(post_save, sender=SuspensionClosure)
+@receiver(post_delete, sender=SuspensionClosure)
+def refresh_suspension_index(sender, instance, **kwargs):
+    """
+    Signal description: Rebuilds the suspension index whenever a suspension is saved or deleted.
+    """
+    suspension_index.invalidate()
+    transaction.on_commit(suspension_index.invalidate)
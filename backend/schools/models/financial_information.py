@@ -1,9 +1,16 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from .school import School
 from .levels_and_classes import ProgramLevelTemplate
 from .stakeholder import Staff
-from backend.student.models import Student
+from backend.schools import ledger
+from backend.schools.ids import allocate_ids, next_id
+from backend.schools.school_calendar import term_calendar
+from backend.student.models import EnrollmentRecord, Student
 
 class FinanceRelatedModel(models.Model):
     """
@@ -54,8 +61,161 @@ class FeeStructure(FinanceRelatedModel):
     def __str__(self):
         return f"{self.school.name} - {self.get_fee_type_display()} for {self.class_level.level}"
 
-import uuid
-from django.utils.timezone import now
+from decimal import Decimal
+
+INVOICE_RECONCILE_BATCH_SIZE = 500
+INVOICE_BATCH_SIZE = 1000
+
+
+def invoice_status(total_amount, amount_paid):
+    if amount_paid >= total_amount:
+        return 'Paid'
+    if amount_paid > 0:
+        return 'Partial'
+    return 'Pending'
+
+
+class InvoiceManager(models.Manager):
+    """
+    Keeps Invoice.amount_paid and Invoice.balance current without re-summing payments.
+
+    Every change locks the invoice row, adds to the stored totals with F()
+    expressions and derives the status from the locked values, so concurrent
+    payments on one invoice queue for the lock instead of overwriting each other.
+    """
+
+    def record_payment(self, invoice_id, amount):
+        """
+        Add `amount` (negative to reverse a payment) to an invoice's paid total.
+        """
+        with transaction.atomic(savepoint=False):
+            total_amount, amount_paid = self.select_for_update().values_list(
+                'total_amount', 'amount_paid'
+            ).get(pk=invoice_id)
+            self.filter(pk=invoice_id).update(
+                amount_paid=F('amount_paid') + amount,
+                balance=F('balance') - amount,
+                status=invoice_status(total_amount, amount_paid + amount),
+            )
+
+    def set_total(self, invoice_id, total_amount):
+        with transaction.atomic(savepoint=False):
+            amount_paid = self.select_for_update().values_list('amount_paid', flat=True).get(pk=invoice_id)
+            self.filter(pk=invoice_id).update(
+                total_amount=total_amount,
+                balance=total_amount - F('amount_paid'),
+                status=invoice_status(total_amount, amount_paid),
+            )
+            ledger.sync(self.get(pk=invoice_id))
+
+    def mismatched(self):
+        """
+        (invoice_id, payments total) of every invoice whose stored totals
+        disagree with its payments, in one aggregate query.
+        """
+        return self.annotate(
+            paid=models.functions.Coalesce(Sum('payments__amount'), Decimal('0'), output_field=models.DecimalField()),
+        ).exclude(
+            amount_paid=F('paid'), balance=F('total_amount') - F('paid'),
+        ).values_list('pk', 'paid')
+
+    def reconcile(self, batch_size=INVOICE_RECONCILE_BATCH_SIZE):
+        """
+        Recompute amount_paid, balance and status of the mismatched invoices.
+        Each batch is locked and re-summed so payments arriving meanwhile are kept.
+        """
+        invoice_ids = [invoice_id for invoice_id, _ in self.mismatched()]
+        for start in range(0, len(invoice_ids), batch_size):
+            with transaction.atomic():
+                invoices = list(self.select_for_update().filter(pk__in=invoice_ids[start:start + batch_size]))
+                paid = dict(
+                    Payment.objects.filter(invoice__in=invoices).values('invoice').annotate(
+                        total=Sum('amount')
+                    ).values_list('invoice', 'total')
+                )
+                for invoice in invoices:
+                    invoice.amount_paid = paid.get(invoice.pk, Decimal('0'))
+                    invoice.balance = invoice.total_amount - invoice.amount_paid
+                    invoice.status = invoice_status(invoice.total_amount, invoice.amount_paid)
+                self.bulk_update(invoices, ['amount_paid', 'balance', 'status'])
+        return len(invoice_ids)
+
+    def generate_for_cohort(self, school, class_level, term, due_date=None, optional_fees=None,
+                            prorate=False, batch_size=INVOICE_BATCH_SIZE):
+        """
+        Invoice every student actively enrolled in `school` for the session of
+        `term`, limited to one ProgramLevelTemplate when `class_level` is given.
+
+        `optional_fees` maps student ids to the optional FeeStructures (or their
+        ids) chosen for them. Students already invoiced for the term are skipped.
+        With `prorate`, students enrolled after the term started pay the required
+        fees in proportion to the school days left from their enrollment date.
+        The fee schedule is read once and the invoices and their optional fees
+        are written with bulk inserts, so the query count does not grow with the
+        cohort. Returns the new invoices.
+        """
+        due_date = due_date or term.start_date
+        if due_date is None:
+            raise ValidationError(f"{term} has no start date; give a due date.")
+        optional_fees = {
+            student_id: {getattr(fee, 'pk', fee) for fee in fees}
+            for student_id, fees in (optional_fees or {}).items()
+        }
+
+        enrollments = EnrollmentRecord.objects.filter(
+            school=school, academic_session_id=term.academic_session_id, is_active=True,
+        )
+        if class_level is not None:
+            enrollments = enrollments.filter(program_level__program_level_template=class_level)
+        invoiced = set(self.filter(school=school, term=term, student__isnull=False).values_list('student_id', flat=True))
+        cohort = [
+            (student_id, level_id, enrolled_on)
+            for student_id, level_id, enrolled_on in enrollments.values_list(
+                'student_id', 'program_level__program_level_template_id', 'enrollment_date'
+            )
+            if level_id is not None and student_id not in invoiced
+        ]
+        if not cohort:
+            return []
+
+        required, optional = {}, {}
+        for fee in FeeStructure.objects.filter(school=school, class_level_id__in={level_id for _, level_id, _ in cohort}):
+            if fee.is_optional:
+                optional[fee.pk] = fee
+            else:
+                required[fee.class_level_id] = required.get(fee.class_level_id, Decimal('0')) + fee.amount
+        calendar = term_calendar(term, school) if prorate else None
+
+        invoices, selections = [], []
+        for (student_id, level_id, enrolled_on), invoice_id in zip(cohort, allocate_ids('invoice', len(cohort))):
+            total = required.get(level_id, Decimal('0'))
+            if calendar is not None and calendar.total and enrolled_on > calendar.start:
+                share = Decimal(calendar.count(start=enrolled_on)) / Decimal(calendar.total)
+                total = (total * share).quantize(Decimal('0.01'))
+            for fee_id in optional_fees.get(student_id, ()):
+                fee = optional.get(fee_id)
+                if fee is None or fee.class_level_id != level_id:
+                    raise ValidationError(f"Fee {fee_id} is not an optional fee of the class level of student {student_id}.")
+                total += fee.amount
+                selections.append((invoice_id, fee_id))
+            invoices.append(Invoice(
+                invoice_id=invoice_id, school=school, student_id=student_id, term=term, due_date=due_date,
+                total_amount=total, balance=total, status=invoice_status(total, Decimal('0')),
+            ))
+
+        Selection = Invoice.optional_fees_selected.through
+        with transaction.atomic():
+            self.bulk_create(invoices, batch_size=batch_size)
+            Selection.objects.bulk_create(
+                [Selection(invoice_id=invoice_id, feestructure_id=fee_id) for invoice_id, fee_id in selections],
+                batch_size=batch_size,
+            )
+            ledger.post(
+                [(Invoice._meta.label, invoice.pk, invoice.ledger_postings()) for invoice in invoices],
+                batch_size=batch_size,
+            )
+        return invoices
+
 
 class Invoice(FinanceRelatedModel):
     """
@@ -68,9 +228,27 @@ class Invoice(FinanceRelatedModel):
         primary_key=True, 
         help_text="Unique invoice identifier (e.g., INV-YYYYMMDD-XXXXX)."
     )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='invoices',
+        help_text="The student being billed."
+    )
+    term = models.ForeignKey(
+        'Term',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='invoices',
+        help_text="The term the invoice bills for."
+    )
     invoice_date = models.DateField(auto_now_add=True, help_text="The date when the invoice was created.")
     due_date = models.DateField(help_text="The date by which the payment is due.")
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Total amount to be paid.")
+    amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, editable=False, help_text="Total of the payments made.")
+    balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, editable=False, help_text="Amount left to pay.")
     status = models.CharField(
         max_length=20,
         choices=[('Pending', 'Pending'), ('Partial', 'Partialy Paid'),('Paid', 'Paid'), ('Overdue', 'Overdue')],
@@ -83,38 +261,62 @@ class Invoice(FinanceRelatedModel):
         help_text="Optional fees selected by the parent or guardian."
     )
 
+    objects = InvoiceManager()
+
+    class Meta:
+        unique_together = (('student', 'term'),)
+
     def __str__(self):
-        return f"Invoice {self.invoice_id} for {self.student.full_name()}"
+        if self.student_id is None:
+            return f"Invoice {self.invoice_id}"
+        return f"Invoice {self.invoice_id} for {self.student.full_name}"
+
+    def ledger_postings(self):
+        return [
+            (self.school_id, self.term_id, 'receivable', self.total_amount),
+            (self.school_id, self.term_id, 'fee_income', -Decimal(self.total_amount)),
+        ]
 
     def save(self, *args, **kwargs):
         """
-        Override save method to generate a unique invoice ID.
+        Override save method to generate a unique invoice ID and keep the
+        balance and status in step with the total.
+
+        amount_paid only changes through `Invoice.objects.record_payment`, so an
+        update re-reads it under the row lock instead of writing back the value
+        loaded with this instance, which payments may have moved on since.
         """
         if not self.invoice_id:
-            date_prefix = now().strftime('%Y%m%d')  # e.g., 20240101 for January 1, 2024
-            unique_suffix = str(uuid.uuid4().int)[:6]  # Generate a unique 6-digit suffix
-            self.invoice_id = f"INV-{date_prefix}-{unique_suffix}"
+            self.invoice_id = next_id('invoice')
 
-        super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            if not self._state.adding:
+                amount_paid = Invoice.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'amount_paid', flat=True
+                ).first()
+                if amount_paid is not None:
+                    self.amount_paid = amount_paid
+            self.balance = Decimal(self.total_amount) - Decimal(self.amount_paid)
+            self.status = invoice_status(Decimal(self.total_amount), Decimal(self.amount_paid))
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'total_amount' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'balance', 'status'}
+            super().save(*args, **kwargs)
 
     def calculate_total(self):
         """
         Calculate the total amount based on applicable non-optional and selected optional fees.
         """
-        total = 0.0
         non_optional_fees = FeeStructure.objects.filter(
             school=self.school,
-            class_level=self.student.class_level,
+            class_level=self.student.enrollment_record.program_level.program_level_template,
             is_optional=False
-        )
-        for fee in non_optional_fees:
-            total += fee.amount
-
-        for fee in self.optional_fees_selected.all():
-            total += fee.amount
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        optional_fees = self.optional_fees_selected.aggregate(total=Sum('amount'))['total'] or Decimal('0')
 
-        self.total_amount = total
-        self.save()
+        total = non_optional_fees + optional_fees
+        Invoice.objects.set_total(self.pk, total)
+        self.refresh_from_db(fields=['total_amount', 'amount_paid', 'balance', 'status'])
         return total
 
 class Payment(FinanceRelatedModel):
@@ -158,27 +360,44 @@ class Payment(FinanceRelatedModel):
     def __str__(self):
         return f"Payment for Invoice {self.invoice.invoice_id} - {self.amount} Naira"
 
+    def ledger_postings(self):
+        term_id = self.invoice.term_id
+        return [
+            (self.school_id, term_id, 'cash', self.amount),
+            (self.school_id, term_id, 'receivable', -Decimal(self.amount)),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Override save method to:
         - Generate a unique receipt number.
-        - Update the invoice status if total payments cover the invoice amount.
+        - Add the payment (or the change to its amount) to the invoice totals.
         """
         if not self.receipt_number:
-            from uuid import uuid4
-            self.receipt_number = f"REC-{uuid4().hex[:16].upper()}"
+            self.receipt_number = next_id('receipt')
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self._state.adding:
+                change = Decimal(self.amount)
+            else:
+                previous = Payment.objects.select_for_update().values_list('invoice_id', 'amount').get(pk=self.pk)
+                if previous[0] != self.invoice_id:
+                    Invoice.objects.record_payment(previous[0], -previous[1])
+                    change = Decimal(self.amount)
+                else:
+                    change = Decimal(self.amount) - previous[1]
+            super().save(*args, **kwargs)
+            if change:
+                Invoice.objects.record_payment(self.invoice_id, change)
 
-        # Update invoice status based on total payments
-        total_paid = sum(payment.amount for payment in self.invoice.payments.all())
-        if total_paid >= self.invoice.total_amount:
-            self.invoice.status = 'Paid'
-        elif total_paid > 0 and total_paid < self.invoice.total_amount:
-            self.invoice.status = 'Partially Paid'
-        else:
-            self.invoice.status = 'Pending'
-        self.invoice.save()
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_from_invoice(sender, instance, **kwargs):
+    """
+    Signal description: Takes a deleted payment off its invoice's totals.
+    """
+    if Invoice.objects.filter(pk=instance.invoice_id).exists():
+        Invoice.objects.record_payment(instance.invoice_id, -instance.amount)
 
 class ExpenseCategory(FinanceRelatedModel):
     """
@@ -208,13 +427,19 @@ class SchoolExpense(FinanceRelatedModel):
     def __str__(self):
         return f"{self.category.name} - {self.amount} for {self.school.name}"
 
+    def ledger_postings(self):
+        term_id = ledger.term_on(self.school, self.date_incurred)
+        return [
+            (self.school_id, term_id, 'expenses', self.amount),
+            (self.school_id, term_id, 'cash', -Decimal(self.amount)),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Auto-generate receipt_number if not provided.
         """
         if not self.receipt_number:
-            from uuid import uuid4
-            self.receipt_number = f"EXP-{uuid4().hex[:12].upper()}"
+            self.receipt_number = next_id('expense')
         super().save(*args, **kwargs)
 
 class Budget(FinanceRelatedModel):
@@ -238,6 +463,14 @@ class Salary(FinanceRelatedModel):
     def __str__(self):
         return f"{self.employee.full_name()} - {self.pay_date}"
 
+    def ledger_postings(self):
+        school = self.staff.school
+        term_id = ledger.term_on(school, self.pay_date or self.created_at.date())
+        return [
+            (school.pk, term_id, 'salaries', self.amount),
+            (school.pk, term_id, 'cash', -Decimal(self.amount)),
+        ]
+
 class FundingSource(FinanceRelatedModel):
     source_name = models.CharField(max_length=100, help_text="Name of the funding source (e.g., Government Grant).")
     funding_type = models.CharField(
@@ -257,6 +490,13 @@ class FundingSource(FinanceRelatedModel):
     def __str__(self):
         return f"{self.source_name} - {self.amount} ({self.school.name})"
 
+    def ledger_postings(self):
+        term_id = ledger.term_on(self.school, self.date_received)
+        return [
+            (self.school_id, term_id, 'cash', self.amount),
+            (self.school_id, term_id, 'funding_income', -Decimal(self.amount)),
+        ]
+
 class ScholarshipAndAid(FinanceRelatedModel):
     name = models.CharField(max_length=100, help_text="Name of the scholarship or aid program.")
     description = models.TextField(blank=True, help_text="Details about the program.")
@@ -267,3 +507,35 @@ class ScholarshipAndAid(FinanceRelatedModel):
 
     def __str__(self):
         return f"{self.name} ({self.school.name})"
+
+    def ledger_postings(self):
+        term_id = ledger.term_on(self.school, self.created_at.date())
+        return [
+            (self.school_id, term_id, 'scholarships', self.total_funding),
+            (self.school_id, term_id, 'cash', -Decimal(self.total_funding)),
+        ]
+
+
+# Fee structures and budgets are plans rather than money movements, so they
+# are not posted.
+LEDGER_MODELS = (Invoice, Payment, SchoolExpense, Salary, FundingSource, ScholarshipAndAid)
+
+
+def post_to_ledger(sender, instance, raw=False, **kwargs):
+    """
+    Signal description: Posts a new or changed finance record to the ledger.
+    """
+    if not raw:
+        ledger.sync(instance)
+
+
+def reverse_from_ledger(sender, instance, **kwargs):
+    """
+    Signal description: Reverses the ledger postings of a deleted finance record.
+    """
+    ledger.sync(instance, deleted=True)
+
+
+for ledger_model in LEDGER_MODELS:
+    post_save.connect(post_to_ledger, sender=ledger_model, dispatch_uid=f'post_to_ledger_{ledger_model.__name__}')
+    post_delete.connect(reverse_from_ledger, sender=ledger_model, dispatch_uid=f'reverse_from_ledger_{ledger_model.__name__}')
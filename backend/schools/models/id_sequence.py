@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class IdSequence(models.Model):
+    """
+    One counter per ID key (e.g. INV-20240101). Blocks of values are reserved
+    by advancing `last_value` under a row lock (see backend.schools.ids).
+    """
+    key = models.CharField(max_length=50, unique=True)
+    last_value = models.BigIntegerField(default=0, help_text="Last value handed out.")
+
+    def __str__(self):
+        return f"{self.key}: {self.last_value}"
@@ -0,0 +1,92 @@
+from django.db import models
+
+LEDGER_ACCOUNTS = [
+    ('cash', 'Cash and Bank'),
+    ('receivable', 'Fees Receivable'),
+    ('fee_income', 'Fee Income'),
+    ('funding_income', 'Funding Income'),
+    ('expenses', 'Operating Expenses'),
+    ('salaries', 'Salaries'),
+    ('scholarships', 'Scholarships and Aid'),
+]
+
+
+class LedgerEntry(models.Model):
+    """
+    One line of a double-entry posting. Entries are only ever added: a change
+    to a finance record is posted as the difference, a deletion as a reversal
+    (see backend.schools.ledger).
+
+    The school and term keys have no database constraint so the history
+    outlives the records it describes.
+    """
+    transaction_id = models.UUIDField(db_index=True, help_text="Lines posted together share this id and balance out.")
+    school = models.ForeignKey(
+        'School',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='ledger_entries',
+    )
+    term = models.ForeignKey(
+        'Term',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='ledger_entries',
+    )
+    account = models.CharField(max_length=20, choices=LEDGER_ACCOUNTS)
+    debit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    source_type = models.CharField(max_length=50, help_text="Label of the finance model that caused the posting.")
+    source_id = models.CharField(max_length=50, help_text="Primary key of the finance record.")
+    posted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['source_type', 'source_id'])]
+        verbose_name_plural = 'ledger entries'
+
+    def __str__(self):
+        return f"{self.get_account_display()} Dr {self.debit} Cr {self.credit}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries cannot be changed; post a correction instead.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries cannot be deleted; post a reversal instead.")
+
+
+class SchoolBalance(models.Model):
+    """
+    Running debit and credit totals of one account for a school and term,
+    kept up to date by every posting so dashboards never sum the ledger.
+    """
+    school = models.ForeignKey(
+        'School',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='ledger_balances',
+    )
+    term = models.ForeignKey(
+        'Term',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='ledger_balances',
+    )
+    account = models.CharField(max_length=20, choices=LEDGER_ACCOUNTS)
+    debit_total = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    credit_total = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('school', 'term', 'account')
+
+    def __str__(self):
+        return f"{self.get_account_display()}: {self.balance}"
+
+    @property
+    def balance(self):
+        return self.debit_total - self.credit_total
@@ -1,8 +1,24 @@
+import re
+
 from django.db import models
 from django.core.exceptions import ValidationError
 
 from backend.schools.models import School
 
+class ProgramLevelTemplateManager(models.Manager):
+    def progression(self):
+        """
+        All levels in the order students move through them: by program
+        (primary, jss, sss), then by the number in the level name.
+        """
+        programs = [program for program, _ in ProgramLevelTemplate.SCHOOL_PROGRAM_CHOICES]
+
+        def position(template):
+            number = re.search(r'\d+', template.level)
+            return (programs.index(template.program), int(number.group()) if number else 0, template.pk)
+
+        return sorted(self.all(), key=position)
+
 class ProgramLevelTemplate(models.Model):
     SCHOOL_PROGRAM_CHOICES = [
         ('primary', 'Primary'),
@@ -13,6 +29,8 @@ class ProgramLevelTemplate(models.Model):
     program = models.CharField(max_length=7, choices=SCHOOL_PROGRAM_CHOICES)
     level = models.CharField(max_length=9, help_text="Level name (e.g., Primary 1, JSS 2).")
 
+    objects = ProgramLevelTemplateManager()
+
     class Meta:
         unique_together = ('program', 'level')
 
@@ -23,22 +23,12 @@ class AccreditationStatus(models.Model):
 
 	# Generate Accreditation Number format- ACCR-YYYY-DDDD Y-year, D-any digit
 	def generate_accreditation_number(self):
-		from datetime import date
+		from backend.schools.ids import next_id
 
-		import uuid
-
-		school_type_code = {
-            'public': '1',
-            'private': '2',
-            'community': '3',
-        }
-
-		type_code = school_type_code[self.school.school_type]
-		
-		return f"ACCR{str(date.today().year)[2:]}{type_code}-{str((uuid.uuid4().int))[:7]}"
+		return next_id('accreditation', school_type=self.school.school_type)
 
 	def save(self, *args, **kwargs):
-		if self.status == 'accreditated':
+		if self.status == 'accreditated' and not self.accreditation_number:
 			self.accreditation_number = self.generate_accreditation_number()
 		if self.status == 'pending':
 			self.valid_from = None
@@ -3,25 +3,92 @@ import uuid
 
 from django.db import models
 from datetime import date, datetime
-from django.db.models import Q, Prefetch
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q, F, Prefetch, OuterRef, Subquery, Window
+from django.db.models.functions import RowNumber
 from django.urls import reverse
 
+from backend.schools.ids import next_id
+
+# Infrastructure shown on the school details page:
+# context key -> (reverse one-to-one accessor on School, SchoolImages.image_type)
+SCHOOL_INFRASTRUCTURE = {
+    'classroom': ('classrooms', 'classroom'),
+    'computer_lab': ('computerlab', 'computer_lab'),
+    'library': ('library', 'library'),
+    'laboratory': ('laboratory', 'laboratory'),
+    'sports_facility': ('sportsfacility', 'sports_facility'),
+    'special_needs': ('specialneedsresource', 'special_needs_resource'),
+}
+IMAGES_PER_INFRASTRUCTURE = 3
+
+class SchoolQuerySet(models.QuerySet):
+
+    def with_status(self):
+        """
+        Annotate the latest accreditation status and the latest active suspension
+        onto every school, so that `school.status` costs no extra query per row.
+        """
+        from . import AccreditationStatus, SuspensionClosure
+
+        latest_accreditation = AccreditationStatus.objects.filter(
+            school=OuterRef('pk')
+        ).order_by('-created_at')
+        latest_suspension = SuspensionClosure.objects.filter(
+            school=OuterRef('pk'), is_dropped=False
+        ).order_by('-created_at')
+
+        return self.annotate(
+            latest_accreditation_status=Subquery(latest_accreditation.values('status')[:1]),
+            active_suspension_type=Subquery(latest_suspension.values('suspension_type')[:1]),
+        )
+
+    def with_infrastructure(self):
+        """
+        Join every infrastructure one-to-one row in the same query as the school.
+        """
+        return self.select_related(*(accessor for accessor, _ in SCHOOL_INFRASTRUCTURE.values()))
+
+    def filter_listing(self, school_type=None, program=None, lga=None):
+        """
+        Apply the optional filters offered on the school list page.
+        """
+        queryset = self
+        if school_type:
+            queryset = queryset.filter(school_type=school_type)
+        if program:
+            queryset = queryset.filter(program=program)
+        if lga:
+            queryset = queryset.filter(lga__iexact=lga)
+        return queryset
+
 class SchoolManager(models.Manager):
 
-    def get_school_academic_session(self, school):
-        from . import AcademicSession
-        filters = Q(school=school) | (Q(school_type=school.school_type) | Q(school_type='all'))
-        if '+' in school.program:
-            programs = school.program.split('+')
-            filters |= Q(program__in=programs)
-        else:
-            filters |= Q(program=school.program)
+    def get_queryset(self):
+        return SchoolQuerySet(self.model, using=self._db)
+
+    def with_status(self):
+        return self.get_queryset().with_status()
 
-        return AcademicSession.objects.filter(filters, status='ongoing').first()
+    def with_infrastructure(self):
+        return self.get_queryset().with_infrastructure()
+
+    def filter_listing(self, **filters):
+        return self.get_queryset().filter_listing(**filters)
+
+    def get_school_academic_session(self, school):
+        # Ongoing sessions are cached and matched in memory, see session_resolver.
+        from backend.schools.session_resolver import academic_session_resolver
+        return academic_session_resolver.resolve(school)
 
     def get_school_status(self, school):
+        # Schools coming from `with_status()` already carry both values.
+        if hasattr(school, 'latest_accreditation_status'):
+            return self.format_school_status(
+                school.latest_accreditation_status,
+                school.active_suspension_type,
+            )
 
-        
         try:
             accr = school.recent_accreditation_status() 
         except (AttributeError, TypeError): 
@@ -32,22 +99,66 @@ class SchoolManager(models.Manager):
         except (AttributeError, TypeError):
             sus = None
 
-        if accr and accr.status == 'accreditated':
-            if not sus:
+        return self.format_school_status(
+            accr.status if accr else None,
+            sus.suspension_type if sus else None,
+        )
+
+    @staticmethod
+    def format_school_status(accr_status, suspension_type):
+        """
+        Build the status label from the latest accreditation status and the
+        type of the latest active suspension (either may be None).
+        """
+        if accr_status == 'accreditated':
+            if not suspension_type:
                 return 'Active'
             else:
-                return f"{accr.status} - Under {sus.suspension_type}"
-        elif accr and accr.status == 'awaiting accreditation':
-            if sus:
-                return f"{sus.suspension_type} & {accr.status}"
-            return accr.status
-
-        if accr:
-            return accr.status
-        if sus:
-            return sus.suspension_type
+                return f"{accr_status} - Under {suspension_type}"
+        elif accr_status == 'awaiting accreditation':
+            if suspension_type:
+                return f"{suspension_type} & {accr_status}"
+            return accr_status
+
+        if accr_status:
+            return accr_status
+        if suspension_type:
+            return suspension_type
         return '-' 
 
+    def get_infrastructure_details(self, school):
+        """
+        Return each infrastructure record of the school and its latest images,
+        keyed as the school details page expects (e.g. 'library', 'library_images').
+
+        The records come from the school itself (load it with `with_infrastructure()`
+        to avoid a query per record) and all images are fetched in one windowed query.
+        """
+        from . import SchoolImages
+
+        image_types = {image_type: key for key, (_, image_type) in SCHOOL_INFRASTRUCTURE.items()}
+        images = SchoolImages.objects.filter(
+            school=school, image_type__in=image_types
+        ).annotate(
+            position=Window(
+                expression=RowNumber(),
+                partition_by=F('image_type'),
+                order_by=F('created_at').desc(),
+            )
+        ).filter(position__lte=IMAGES_PER_INFRASTRUCTURE).order_by('image_type', 'position')
+
+        details = {}
+        for key, (accessor, _) in SCHOOL_INFRASTRUCTURE.items():
+            try:
+                details[key] = getattr(school, accessor)
+            except ObjectDoesNotExist:
+                details[key] = None
+            details[f'{key}_images'] = []
+
+        for image in images:
+            details[f'{image_types[image.image_type]}_images'].append(image)
+        return details
+
     def get_levels_and_classes(self, school):
         """
         Fetch level classes and program levels for this school.
@@ -138,6 +249,7 @@ class School(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [models.Index(fields=['updated_at', 'id'])]
 
     def save(self, *args, **kwargs):
         """
@@ -163,12 +275,9 @@ class School(models.Model):
 
     def generate_registration_number(self):
         """
-        Generate a unique registration number based on the school type using UUID.
+        Generate a unique registration number based on the school type.
         """
-        school_type_code = {'public': '1', 'private': '2', 'community': '3'}
-        type_code = school_type_code[self.school_type]
-        unique_id = str(uuid.uuid4().int)[:7]
-        return f"{type_code}{unique_id}"
+        return next_id('school_registration', school_type=self.school_type)
 
     def __str__(self):
         return self.name
@@ -197,6 +306,9 @@ class School(models.Model):
     def get_levels_and_classes(self):
         return self.__class__.objects.get_levels_and_classes(self)
 
+    def get_infrastructure_details(self):
+        return self.__class__.objects.get_infrastructure_details(self)
+
     def get_current_accreditation(self):
         return self.__class__.objects.get_current_accreditation(self)
 
@@ -0,0 +1,252 @@
+"""
+School-day calendars.
+
+A TermCalendar answers "is this a school day for this school" for every day of
+a term from one boolean array, indexed by calendar day from the term's start
+date (the same offsets TermAttendance uses). It is built in one pass: weekdays
+are school days, then the days of every calendar event that closes the school
+(recurring events expanded over the term) and of every suspension or closure
+of the school or the whole state are cleared.
+
+Calendars of many schools are built from two queries and kept both in this
+process and, bit-packed, in the cache. A version token in the cache is bumped
+by the Term, CalendarEvent and SuspensionClosure signals, and a process drops
+its calendars when the token changes. The token only reaches other processes
+when CACHES is shared (REDIS_URL); with the default per-process cache they
+pick up a change once their memo and cached calendars have expired, after at
+most MEMO_TIMEOUT + CALENDAR_CACHE_TIMEOUT seconds.
+"""
+import calendar
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+VERSION_CACHE_KEY = 'schools:calendar:version'
+CALENDAR_CACHE_TIMEOUT = 60 * 5  # seconds
+MEMO_TIMEOUT = 60  # seconds
+SCHOOL_WEEKDAYS = (0, 1, 2, 3, 4)  # Monday to Friday
+
+
+@dataclass
+class TermCalendar:
+    start: date
+    days: np.ndarray  # bool, one per calendar day of the term
+
+    @property
+    def end(self):
+        return self.start + timedelta(days=len(self.days) - 1)
+
+    @property
+    def total(self):
+        return int(self.days.sum())
+
+    def offset(self, day):
+        return (day - self.start).days
+
+    def is_school_day(self, day):
+        offset = self.offset(day)
+        return 0 <= offset < len(self.days) and bool(self.days[offset])
+
+    def school_days(self):
+        return [self.start + timedelta(days=offset) for offset in np.flatnonzero(self.days).tolist()]
+
+    def count(self, start=None, end=None):
+        """
+        School days from `start` to `end`, both included and both defaulting to the term's ends.
+        """
+        first = max(self.offset(start), 0) if start else 0
+        last = min(self.offset(end), len(self.days) - 1) if end else len(self.days) - 1
+        return int(self.days[first:last + 1].sum()) if first <= last else 0
+
+    def elapsed(self, today):
+        return self.count(end=today)
+
+    def remaining(self, today):
+        return self.count(start=today + timedelta(days=1))
+
+    def percentage_elapsed(self, today):
+        return round(self.elapsed(today) * 100 / self.total) if self.total else 0
+
+    def share_from(self, day):
+        """
+        The share of the term's school days from `day` on, between 0 and 1.
+        """
+        return self.count(start=day) / self.total if self.total else 0.0
+
+    def pack(self):
+        return self.start, len(self.days), np.packbits(self.days).tobytes()
+
+    @classmethod
+    def unpack(cls, packed):
+        start, length, bits = packed
+        return cls(start, np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=length).astype(bool))
+
+
+def as_date(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def add_months(day, months):
+    year, month = divmod(day.month - 1 + months, 12)
+    year += day.year
+    return date(year, month + 1, min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def event_occurrences(start, end, recurrence_type, window_start, window_end):
+    """
+    (first day, last day) of every occurrence of an event that overlaps the window.
+    """
+    length = end - start
+    if recurrence_type == 'Weekly':
+        shift = lambda k: start + timedelta(weeks=k)
+        first = max(0, (window_start - end).days // 7)
+    elif recurrence_type in ('Monthly', 'Yearly'):
+        step = 1 if recurrence_type == 'Monthly' else 12
+        shift = lambda k: add_months(start, k * step)
+        months = (window_start.year - start.year) * 12 + window_start.month - start.month
+        first = max(0, (months - length.days // 28 - 1) // step)
+    else:
+        return [(start, end)] if start <= window_end and end >= window_start else []
+
+    occurrences = []
+    k = first
+    while shift(k) <= window_end:
+        occurrence = shift(k)
+        if occurrence + length >= window_start:
+            occurrences.append((occurrence, occurrence + length))
+        k += 1
+    return occurrences
+
+
+def weekday_mask(start, length):
+    weekdays = (start.weekday() + np.arange(length)) % 7
+    return np.isin(weekdays, SCHOOL_WEEKDAYS)
+
+
+def close(days, start, first, last):
+    """
+    Clear the days from `first` to `last` (None: to the end of the term).
+    """
+    begin = max((first - start).days, 0)
+    stop = len(days) if last is None else min((last - start).days + 1, len(days))
+    if begin < stop:
+        days[begin:stop] = False
+
+
+def build_calendars(term, school_ids, include_suspensions=True):
+    """
+    {school_id: TermCalendar} of `term` for the schools, in two queries. Without
+    `include_suspensions` the days of suspensions and closures stay open and the
+    second query is skipped.
+    """
+    from backend.schools.models import CalendarEvent, SuspensionClosure
+
+    start, end = term.start_date, term.end_date
+    length = (end - start).days + 1
+    base = weekday_mask(start, length)
+    calendars = {school_id: TermCalendar(start, base.copy()) for school_id in school_ids}
+
+    events = CalendarEvent.objects.filter(
+        school__in=school_ids, closes_school=True, start_date__date__lte=end,
+    ).filter(
+        ~Q(recurrence_type='None') | Q(end_date__date__gte=start)
+    ).values_list('school_id', 'start_date', 'end_date', 'recurrence_type')
+    for school_id, event_start, event_end, recurrence_type in events:
+        occurrences = event_occurrences(as_date(event_start), as_date(event_end), recurrence_type, start, end)
+        for first, last in occurrences:
+            close(calendars[school_id].days, start, first, last)
+    if not include_suspensions:
+        return calendars
+
+    suspensions = SuspensionClosure.objects.filter(
+        Q(is_statewide=True) | Q(school__in=school_ids),
+        Q(suspended_to__isnull=True) | Q(suspended_to__gte=start),
+        is_dropped=False, suspended_from__lte=end,
+    ).values_list('school_id', 'is_statewide', 'suspended_from', 'suspended_to')
+    for school_id, is_statewide, suspended_from, suspended_to in suspensions:
+        affected = calendars.values() if is_statewide else [calendars[school_id]]
+        for school_calendar in affected:
+            close(school_calendar.days, start, suspended_from, suspended_to)
+    return calendars
+
+
+class SchoolCalendars:
+
+    def __init__(self):
+        self._version = None
+        self._loaded_at = 0.0
+        self._calendars = {}
+
+    def get_many(self, term, schools):
+        """
+        {school_id: TermCalendar} of `term` for `schools` (instances or ids).
+
+        Calendars are shared between callers; don't modify them.
+        """
+        self._check_version()
+        school_ids = [getattr(school, 'pk', school) for school in schools]
+        found = {
+            school_id: self._calendars[(term.pk, school_id)]
+            for school_id in school_ids if (term.pk, school_id) in self._calendars
+        }
+        missing = [school_id for school_id in school_ids if school_id not in found]
+        if missing:
+            keys = {self._cache_key(term, school_id): school_id for school_id in missing}
+            for key, packed in cache.get_many(list(keys)).items():
+                found[keys[key]] = TermCalendar.unpack(packed)
+            built = build_calendars(term, [school_id for school_id in missing if school_id not in found])
+            if built:
+                cache.set_many(
+                    {self._cache_key(term, school_id): built[school_id].pack() for school_id in built},
+                    CALENDAR_CACHE_TIMEOUT,
+                )
+            found.update(built)
+            self._calendars.update({(term.pk, school_id): found[school_id] for school_id in missing})
+        return found
+
+    def get(self, term, school):
+        return self.get_many(term, [school])[getattr(school, 'pk', school)]
+
+    def invalidate(self):
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        self._clear()
+
+    def _cache_key(self, term, school_id):
+        return f'schools:calendar:{self._version}:{term.pk}:{school_id}'
+
+    def _check_version(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+            version = cache.get(VERSION_CACHE_KEY)
+        now = time.monotonic()
+        if version != self._version or now - self._loaded_at > MEMO_TIMEOUT:
+            self._clear()
+            self._version = version
+            self._loaded_at = now
+
+    def _clear(self):
+        self._version = None
+        self._calendars = {}
+
+
+school_calendars = SchoolCalendars()
+
+
+def term_calendar(term, school):
+    """
+    The TermCalendar of `term` for one school (an instance or its id).
+    """
+    return school_calendars.get(term, school)
+
+
+def term_calendars(term, schools):
+    return school_calendars.get_many(term, schools)
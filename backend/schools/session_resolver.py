@@ -0,0 +1,160 @@
+"""
+Cached resolution of the ongoing academic session of a school.
+
+Only a handful of sessions are ongoing at any time, so the resolver keeps them in
+the cache and matches schools against them in memory. Results are also
+memoized per process, keyed on (school_type, program, school_id).
+
+`invalidate()` is called from the AcademicSession signals and from
+`AcademicSession.complete_all_ongoing_sessions`. It bumps a version token in
+the cache, which every resolver checks before using its memo. The token only
+reaches other processes when CACHES is shared (REDIS_URL); with the default
+per-process cache they pick up a change once their memo and cached sessions
+have expired, after at most MEMO_TIMEOUT + SESSIONS_CACHE_TIMEOUT seconds.
+"""
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+SESSIONS_CACHE_KEY = 'schools:ongoing_academic_sessions'
+VERSION_CACHE_KEY = 'schools:ongoing_academic_sessions:version'
+SESSIONS_CACHE_TIMEOUT = 60  # seconds
+MEMO_TIMEOUT = 60  # seconds
+
+_MISSING = object()
+
+
+def school_programs(program):
+    """
+    Split a school program into its components (e.g. 'jss+sss' -> ['jss', 'sss']).
+    """
+    return program.split('+') if '+' in program else [program]
+
+
+def session_applies_to_school(session, school_id, school_type, programs):
+    """
+    Whether an ongoing session applies to a school. Mirrors the filter that
+    used to be built in `SchoolManager.get_school_academic_session`: the session
+    is set for the school itself, for its school type, for all schools, or for
+    one of its programs.
+    """
+    return (
+        (session.school_id is not None and session.school_id == school_id)
+        or session.school_type in (school_type, 'all')
+        or session.program in programs
+    )
+
+
+def match_session(sessions, school_id, school_type, program):
+    """
+    Return the first session (in start date order) that applies to the school.
+    """
+    programs = school_programs(program)
+    for session in sessions:
+        if session_applies_to_school(session, school_id, school_type, programs):
+            return session
+    return None
+
+
+class AcademicSessionResolver:
+
+    def __init__(self):
+        self._version = None
+        self._loaded_at = 0.0
+        self._sessions = None
+        self._resolved = {}
+
+    def resolve(self, school):
+        """
+        Return the ongoing AcademicSession of the school, or None.
+
+        The returned instance is shared between callers; don't modify it.
+        """
+        self._check_version()
+        key = (school.school_type, school.program, school.pk)
+        session = self._resolved.get(key, _MISSING)
+        if session is _MISSING:
+            session = match_session(self.ongoing_sessions(), school.pk, school.school_type, school.program)
+            self._resolved[key] = session
+        return session
+
+    def resolve_many(self, schools):
+        """
+        Resolve the ongoing session of many schools at once, using the same rules
+        as `resolve()`. `schools` is a School queryset (only the id, type and
+        program columns are read) or an iterable of School instances.
+
+        Returns a dict of school id -> AcademicSession or None.
+        """
+        sessions = self.ongoing_sessions()
+        if isinstance(schools, QuerySet):
+            rows = schools.values_list('pk', 'school_type', 'program').iterator()
+        else:
+            rows = ((school.pk, school.school_type, school.program) for school in schools)
+
+        # Sessions set for individual schools, in match order.
+        position = {session.pk: index for index, session in enumerate(sessions)}
+        by_school = {}
+        for session in sessions:
+            if session.school_id is not None:
+                by_school.setdefault(session.school_id, session)
+
+        # Apart from those, the match only depends on the school type and program.
+        shared = {}
+        resolved = {}
+        for school_id, school_type, program in rows:
+            group = (school_type, program)
+            if group not in shared:
+                shared[group] = match_session(sessions, None, school_type, program)
+            session = shared[group]
+            own = by_school.get(school_id)
+            if own is not None and (session is None or position[own.pk] < position[session.pk]):
+                session = own
+            resolved[school_id] = session
+        return resolved
+
+    def ongoing_sessions(self):
+        """
+        All ongoing sessions ordered as the resolver matches them (start date, then id).
+        """
+        self._check_version()
+        if self._sessions is None:
+            sessions = cache.get(SESSIONS_CACHE_KEY)
+            if sessions is None:
+                sessions = self._load_sessions()
+                cache.set(SESSIONS_CACHE_KEY, sessions, SESSIONS_CACHE_TIMEOUT)
+            self._sessions = sessions
+        return self._sessions
+
+    def invalidate(self):
+        """
+        Drop the cached sessions in this process and in the cache.
+        """
+        cache.delete(SESSIONS_CACHE_KEY)
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        self._clear()
+
+    def _load_sessions(self):
+        from backend.schools.models import AcademicSession
+        return list(AcademicSession.objects.filter(status='ongoing').order_by('start_date', 'pk'))
+
+    def _check_version(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+            version = cache.get(VERSION_CACHE_KEY)
+        now = time.monotonic()
+        if version != self._version or now - self._loaded_at > MEMO_TIMEOUT:
+            self._clear()
+            self._version = version
+            self._loaded_at = now
+
+    def _clear(self):
+        self._version = None
+        self._sessions = None
+        self._resolved = {}
+
+
+academic_session_resolver = AcademicSessionResolver()
@@ -0,0 +1,196 @@
+"""
+In-memory index of active suspensions and closures.
+
+The index keeps every suspension that has not been dropped as parallel NumPy
+arrays sorted by start day, with indefinite suspensions running to the end of
+time. A point query ("which schools are closed on D") is a binary search on
+the start days plus one vectorized comparison of the end days; a range query
+("how many school days did these schools lose between A and B") merges each
+school's intervals, statewide ones included, and counts the days they cover
+in the school-day calendars of the terms in the period: weekdays within a
+term that no closing calendar event (a holiday, a mid-term break) took.
+
+The index is built with one query per process and rebuilt when a version
+token in the cache changes; the SuspensionClosure signals bump it. The token
+only reaches other processes when CACHES is shared (REDIS_URL); with the
+default per-process cache each process also rebuilds its index every
+MEMO_TIMEOUT seconds.
+"""
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+
+from backend.schools.school_calendar import build_calendars
+
+VERSION_CACHE_KEY = 'schools:suspensions:version'
+MEMO_TIMEOUT = 60  # seconds
+OPEN_END = date.max.toordinal()
+
+
+@dataclass(frozen=True)
+class Suspension:
+    pk: int
+    school_id: object
+    is_statewide: bool
+    suspension_type: str
+    suspended_from: date
+    suspended_to: date  # None when indefinite
+
+
+class SuspensionIndex:
+
+    def __init__(self, suspensions):
+        self.suspensions = sorted(suspensions, key=lambda suspension: (suspension.suspended_from, suspension.pk))
+        self.starts = np.array([suspension.suspended_from.toordinal() for suspension in self.suspensions], dtype=np.int64)
+        self.ends = np.array(
+            [suspension.suspended_to.toordinal() if suspension.suspended_to else OPEN_END for suspension in self.suspensions],
+            dtype=np.int64,
+        )
+        self.statewide = np.array([suspension.is_statewide for suspension in self.suspensions], dtype=bool)
+
+    def __len__(self):
+        return len(self.suspensions)
+
+    def overlapping(self, start, end):
+        """
+        Indexes of the suspensions that cover any day from `start` to `end`.
+        """
+        candidates = np.searchsorted(self.starts, end.toordinal(), side='right')
+        return np.flatnonzero(self.ends[:candidates] >= start.toordinal())
+
+    def active_on(self, day):
+        """
+        The suspensions in force on `day`.
+        """
+        return [self.suspensions[index] for index in self.overlapping(day, day).tolist()]
+
+    def closed_on(self, day):
+        """
+        (statewide, school ids): whether a statewide suspension is in force on
+        `day`, and the schools suspended on their own.
+        """
+        active = self.active_on(day)
+        return (
+            any(suspension.is_statewide for suspension in active),
+            {suspension.school_id for suspension in active if not suspension.is_statewide},
+        )
+
+    def suspended_days(self, start, end, school_ids):
+        """
+        {school_id: (first, last) ordinal intervals of the days from `start` to
+        `end` the school was suspended, merged} for `school_ids`; all empty
+        when `start` is after `end`.
+        """
+        if start > end:
+            return {school_id: [] for school_id in school_ids}
+        first, last = start.toordinal(), end.toordinal()
+        intervals = defaultdict(list)
+        shared = []
+        wanted = set(school_ids)
+        for index in self.overlapping(start, end).tolist():
+            interval = (max(int(self.starts[index]), first), min(int(self.ends[index]), last))
+            if self.statewide[index]:
+                shared.append(interval)
+            elif self.suspensions[index].school_id in wanted:
+                intervals[self.suspensions[index].school_id].append(interval)
+
+        shared_days = merge(shared)
+        return {
+            school_id: merge(shared + intervals[school_id]) if school_id in intervals else shared_days
+            for school_id in school_ids
+        }
+
+
+def merge(intervals):
+    """
+    Union of inclusive (first, last) ordinal intervals, sorted and non-overlapping.
+    """
+    merged = []
+    for first, last in sorted(intervals):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+class SuspensionIndexCache:
+
+    def __init__(self):
+        self._version = None
+        self._loaded_at = 0.0
+        self._index = None
+
+    def get(self):
+        self._check_version()
+        if self._index is None:
+            self._index = self._build()
+        return self._index
+
+    def invalidate(self):
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        self._index = None
+
+    def _build(self):
+        from backend.schools.models import SuspensionClosure
+
+        rows = SuspensionClosure.objects.filter(is_dropped=False).values_list(
+            'pk', 'school_id', 'is_statewide', 'suspension_type', 'suspended_from', 'suspended_to', 'is_indefinite',
+        )
+        return SuspensionIndex([
+            Suspension(pk, school_id, is_statewide, suspension_type, suspended_from, None if is_indefinite else suspended_to)
+            for pk, school_id, is_statewide, suspension_type, suspended_from, suspended_to, is_indefinite in rows
+        ])
+
+    def _check_version(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+            version = cache.get(VERSION_CACHE_KEY)
+        now = time.monotonic()
+        if version != self._version or now - self._loaded_at > MEMO_TIMEOUT:
+            self._index = None
+            self._version = version
+            self._loaded_at = now
+
+
+suspension_index = SuspensionIndexCache()
+
+
+def schools_closed_on(day, schools):
+    """
+    Ids of the schools in `schools` (a School queryset) closed on `day`.
+    """
+    statewide, school_ids = suspension_index.get().closed_on(day)
+    if statewide:
+        return set(schools.values_list('pk', flat=True))
+    return set(schools.filter(pk__in=school_ids).values_list('pk', flat=True)) if school_ids else set()
+
+
+def days_lost(start, end, schools):
+    """
+    {school_id: school days lost to suspensions from `start` to `end`} for
+    `schools` (a School queryset). Costs one query for the terms in the period
+    and one per term for the calendar events of the suspended schools.
+    """
+    from backend.schools.models import Term
+
+    school_ids = list(schools.values_list('pk', flat=True))
+    suspended = suspension_index.get().suspended_days(start, end, school_ids)
+    lost = dict.fromkeys(school_ids, 0)
+    affected = [school_id for school_id in school_ids if suspended[school_id]]
+    if not affected:
+        return lost
+    for term in Term.objects.filter(start_date__lte=end, end_date__gte=start):
+        calendars = build_calendars(term, affected, include_suspensions=False)
+        for school_id in affected:
+            lost[school_id] += sum(
+                calendars[school_id].count(date.fromordinal(first), date.fromordinal(last))
+                for first, last in suspended[school_id]
+            )
+    return lost
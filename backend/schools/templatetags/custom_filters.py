@@ -1,6 +1,7 @@
 from django import template
 import math
 import datetime
+from datetime import date
 
 register = template.Library()
 
@@ -41,78 +42,85 @@ def none_or_percentage(value):
     """
     return "Not Available" if value in [None, ''] else f"{int(value)}%"
 
-from datetime import date
-
-@register.simple_tag(name='percentage_attained')
-def percentage_attained(date_from, date_to=None):
-    if not date_to:
-        date_to = date.today()  # Use today's date if not specified
-
-    if date_to < date_from:
-        raise ValueError("`date_to` cannot be earlier than `date_from`.")
-    if date.today() > date_to:
-        return 100
-    total_days = (date_to - date_from).days + 1  # Add 1 to make it inclusive
-    attained_days = (date.today() - date_from).days + 1  # Add 1 to make it inclusive
-    percentage = attained_days / total_days if total_days else 0.0
-
-    return round(percentage * 100)
+def school_calendar(term, school):
+    """
+    The school-day calendar of `term` for `school`, when the tag was given a term and a school.
+    """
+    from backend.schools.models import Term
+    from backend.schools.school_calendar import term_calendar
 
+    if school and isinstance(term, Term) and term.start_date and term.end_date:
+        return term_calendar(term, school)
+    return None
 
-register = template.Library()
 
 @register.simple_tag(name='days_between')
-def days_between(date1, date2):
+def days_between(date1, date2=None, school=None):
     """
     Calculates the number of days between two dates.
 
     Args:
-        date1 (date): The first date.
+        date1 (date): The first date, or a term.
         date2 (date): The second date.
+        school (School): With a term, count the school days of the term instead.
 
     Returns:
         int: The number of days between date1 and date2.
     """
-    from datetime import date
+    calendar = school_calendar(date1, school)
+    if calendar is not None:
+        return calendar.total
     if date1 and date2:
         return abs((date2 - date1).days)
     return 0
 
 @register.simple_tag(name='days_passed')
-def days_passed(start_date):
+def days_passed(start_date, school=None):
     """
     Calculates the number of days passed since the start date.
 
     Args:
-        start_date (date): The start date.
+        start_date (date): The start date, or a term.
+        school (School): With a term, count the school days passed instead.
 
     Returns:
         int: The number of days passed.
     """
-    from datetime import date
+    calendar = school_calendar(start_date, school)
+    if calendar is not None:
+        return calendar.elapsed(date.today())
     if start_date:
         return (date.today() - start_date).days
     return 0
 
 @register.simple_tag(name='days_remaining')
-def days_remaining(end_date):
+def days_remaining(end_date, school=None):
     """
     Calculates the number of days remaining until the end date.
 
     Args:
-        end_date (date): The end date.
+        end_date (date): The end date, or a term.
+        school (School): With a term, count the school days remaining instead.
 
     Returns:
         int: The number of days remaining.
     """
-    from datetime import date
+    calendar = school_calendar(end_date, school)
+    if calendar is not None:
+        return calendar.remaining(date.today())
     if end_date:
         return (end_date - date.today()).days
     return 0
 
 @register.simple_tag(name='percentage_attained')
-def percentage_attained(start_date, end_date):
-    from datetime import date, timedelta
+def percentage_attained(start_date, end_date=None, school=None):
+    """
+    Percentage of the period from start_date to end_date that has passed. Given
+    a term and a school, the percentage of the term's school days instead.
+    """
+    calendar = school_calendar(start_date, school)
+    if calendar is not None:
+        return calendar.percentage_elapsed(date.today())
     today = date.today()
     if start_date and end_date:
         total_days = (end_date - start_date).days + 1  # Include both start and end dates
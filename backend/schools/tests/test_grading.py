@@ -0,0 +1,57 @@
+import numpy as np
+from django.test import TestCase
+
+from backend.schools.grading import GradingEngine
+from backend.schools.models import GradingScale, GradeBoundary, SubjectGradingConfiguration, SubjectRepository
+
+
+class GradingEngineTest(TestCase):
+
+    def setUp(self):
+        self.waec = GradingScale.objects.create(scale_name='WAEC')
+        for grade, lower, upper in (('A', 70, 100), ('B', 60, 69), ('C', 50, 59), ('F', 0, 49)):
+            GradeBoundary.objects.create(grading_scale=self.waec, grade=grade, lower_bound=lower, upper_bound=upper)
+        self.gapped = GradingScale.objects.create(scale_name='Pass/Distinction')
+        GradeBoundary.objects.create(grading_scale=self.gapped, grade='P', lower_bound=40, upper_bound=59)
+        GradeBoundary.objects.create(grading_scale=self.gapped, grade='D', lower_bound=75, upper_bound=100)
+        self.maths = SubjectRepository.objects.create(subject_name='Mathematics')
+        self.english = SubjectRepository.objects.create(subject_name='English')
+        self.art = SubjectRepository.objects.create(subject_name='Fine Art')
+        SubjectGradingConfiguration.objects.create(subject=self.maths, grading_scale=self.waec, weightage=200)
+        SubjectGradingConfiguration.objects.create(subject=self.english, grading_scale=self.gapped, weightage=100)
+
+    def test_grade_scores(self):
+        engine = GradingEngine()
+        grades = engine.grade([0, 49, 49.5, 50, 69.5, 70, 100, 101, -1, np.nan], self.waec)
+        self.assertEqual(grades.tolist(), ['F', 'F', 'F', 'C', 'B', 'A', 'A', '', '', ''])
+        self.assertEqual(engine.grade([39, 59.5, 60, 74, 75], self.gapped.pk).tolist(), ['', 'P', '', '', 'D'])
+
+    def test_grade_subjects_and_aggregate(self):
+        """
+        Test that each subject is graded on its own scale and that the average
+        is weighted by the subject weightage, leaving missing scores out.
+        """
+        with self.assertNumQueries(2):
+            engine = GradingEngine()
+        columns = {
+            'student': ['s1', 's1', 's1', 's2', 's2'],
+            'subject': [self.maths.pk, self.english.pk, self.art.pk, self.maths.pk, self.english.pk],
+            'score': [80, 65, 90, 40, np.nan],
+        }
+        with self.assertNumQueries(0):
+            graded = engine.grade_subjects(columns)
+            aggregate = engine.aggregate(columns, scale=self.waec)
+        self.assertEqual(graded['grade'].tolist(), ['A', '', '', 'F', ''])
+        self.assertEqual(graded['weight'].tolist(), [200, 100, 100, 200, 100])
+        self.assertEqual(graded['student'], columns['student'])
+
+        self.assertEqual(aggregate['student'].tolist(), ['s1', 's2'])
+        np.testing.assert_allclose(aggregate['weighted_average'], [(80 * 200 + 65 * 100 + 90 * 100) / 400, 40])
+        self.assertEqual(aggregate['grade'].tolist(), ['A', 'F'])
+
+    def test_default_scale(self):
+        engine = GradingEngine(scales=[self.waec], default_scale=self.waec, default_weightage=50)
+        graded = engine.grade_subjects({'subject': [self.art.pk, self.english.pk], 'score': [55, 55]})
+        # English is configured on a scale that was not loaded.
+        self.assertEqual(graded['grade'].tolist(), ['C', 'C'])
+        self.assertEqual(graded['weight'].tolist(), [50, 50])
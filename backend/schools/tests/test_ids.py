@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.db import transaction
+from django.test import TestCase
+
+from backend.schools.ids import DailyIdAllocator, allocate_ids, next_id
+from backend.schools.models import School, AccreditationStatus, IdSequence, Invoice
+
+
+class IdAllocatorTest(TestCase):
+
+    def setUp(self):
+        # A private allocator so spare blocks kept by other tests do not interfere.
+        self.invoice_ids = DailyIdAllocator('INV', 'test_invoice', 'schools.Invoice', 'invoice_id', width=6, block_size=10)
+        self.school = School.objects.create(
+            name='Test School', school_type='private', program='primary',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+
+    def test_daily_sequence(self):
+        ids = self.invoice_ids.allocate(3, day=date(2024, 1, 1))
+        self.assertEqual(ids, ['INV-20240101-000001', 'INV-20240101-000002', 'INV-20240101-000003'])
+        self.assertEqual(self.invoice_ids.next(day=date(2024, 1, 2)), 'INV-20240102-000001')
+
+    def test_skips_legacy_ids(self):
+        Invoice.objects.create(invoice_id='INV-20240101-000002', school=self.school, due_date=date(2024, 1, 31))
+        ids = self.invoice_ids.allocate(3, day=date(2024, 1, 1))
+        self.assertEqual(ids, ['INV-20240101-000001', 'INV-20240101-000003', 'INV-20240101-000011'])
+
+    def test_spare_block_after_commit(self):
+        """
+        Test that the rest of a committed block is used without touching the
+        sequence, and that a rolled back block is never reused.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.invoice_ids.allocate(1, day=date(2024, 1, 1))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.invoice_ids.next(day=date(2024, 1, 1)), 'INV-20240101-000002')
+
+        try:
+            with transaction.atomic():
+                self.invoice_ids.allocate(1, day=date(2024, 1, 5))
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.invoice_ids.spare.get('INV-20240105'), None)
+
+    def test_model_ids(self):
+        self.assertRegex(self.school.registration_number, r'^2\d{7}$')
+        accreditation = AccreditationStatus.objects.create(school=self.school, status='accreditated')
+        number = accreditation.accreditation_number
+        self.assertRegex(number, rf'^ACCR{str(date.today().year)[2:]}2-\d{{7}}$')
+        accreditation.save()
+        self.assertEqual(accreditation.accreditation_number, number)
+
+        self.assertEqual(len(set(allocate_ids('receipt', 50))), 50)
+        self.assertTrue(IdSequence.objects.filter(key__startswith='receipt:REC-').exists())
+        self.assertNotEqual(next_id('expense'), next_id('expense'))
@@ -0,0 +1,192 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+
+from backend.schools.models import (
+    School, Invoice, Payment, FeeStructure, AcademicSession, Term, ProgramLevelTemplate, LevelClasses,
+)
+from backend.student.models import Student, EnrollmentRecord
+
+
+class InvoicePaymentTest(TestCase):
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School', school_type='public', program='primary',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        self.invoice = Invoice.objects.create(school=self.school, due_date=date(2025, 1, 31), total_amount=Decimal('1000'))
+
+    def pay(self, amount, invoice=None):
+        return Payment.objects.create(
+            school=self.school, invoice=invoice or self.invoice, amount=Decimal(amount), payment_method='Cash'
+        )
+
+    def assertTotals(self, amount_paid, balance, status):
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.amount_paid, Decimal(amount_paid))
+        self.assertEqual(self.invoice.balance, Decimal(balance))
+        self.assertEqual(self.invoice.status, status)
+
+    def test_new_invoice_balance(self):
+        self.assertTotals('0', '1000', 'Pending')
+
+    def test_payments_update_totals(self):
+        """
+        Test that each payment adds to the invoice without re-reading its payments.
+        """
+        self.pay('400')
+        self.assertTotals('400', '600', 'Partial')
+        with self.assertNumQueries(15):
+            self.pay('600')
+        self.assertTotals('1000', '0', 'Paid')
+
+    def test_edit_and_delete_payment(self):
+        payment = self.pay('400')
+        payment.amount = Decimal('250')
+        payment.save()
+        self.assertTotals('250', '750', 'Partial')
+        payment.delete()
+        self.assertTotals('0', '1000', 'Pending')
+
+    def test_move_payment_to_another_invoice(self):
+        other = Invoice.objects.create(school=self.school, due_date=date(2025, 1, 31), total_amount=Decimal('300'))
+        payment = self.pay('300')
+        payment.invoice = other
+        payment.save()
+        self.assertTotals('0', '1000', 'Pending')
+        other.refresh_from_db()
+        self.assertEqual((other.amount_paid, other.balance, other.status), (Decimal('300'), Decimal('0'), 'Paid'))
+
+    def test_saving_a_stale_invoice_keeps_payments(self):
+        """
+        Test that saving an instance loaded before a payment keeps the payment in the totals.
+        """
+        stale = Invoice.objects.get(pk=self.invoice.pk)
+        self.pay('400')
+        stale.due_date = date(2025, 2, 28)
+        stale.save()
+        self.assertTotals('400', '600', 'Partial')
+
+        stale.total_amount = Decimal('400')
+        stale.save(update_fields=['total_amount'])
+        self.assertTotals('400', '0', 'Paid')
+
+    def test_delete_invoice_with_payments(self):
+        self.pay('400')
+        self.invoice.delete()
+        self.assertFalse(Payment.objects.exists())
+
+    def test_reconcile(self):
+        """
+        Test that reconciliation repairs drifted totals and leaves correct ones alone.
+        """
+        self.pay('400')
+        correct = Invoice.objects.create(school=self.school, due_date=date(2025, 1, 31), total_amount=Decimal('500'))
+        self.pay('100', invoice=correct)
+        Invoice.objects.filter(pk=self.invoice.pk).update(amount_paid=0, balance=Decimal('1000'), status='Pending')
+
+        self.assertEqual([invoice_id for invoice_id, _ in Invoice.objects.mismatched()], [self.invoice.pk])
+        out = StringIO()
+        call_command('reconcile_invoices', stdout=out)
+        self.assertIn('Reconciled 1 invoices.', out.getvalue())
+        self.assertTotals('400', '600', 'Partial')
+        self.assertFalse(Invoice.objects.mismatched().exists())
+
+
+class InvoiceCohortTest(TestCase):
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School', school_type='public', program='jss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        self.term = Term.objects.create(
+            academic_session=session, term_name=1, start_date=date(2024, 9, 9), end_date=date(2024, 12, 13),
+        )
+        self.jss1 = ProgramLevelTemplate.objects.create(program='jss', level='JSS 1')
+        self.jss2 = ProgramLevelTemplate.objects.create(program='jss', level='JSS 2')
+        self.fees = {}
+        for level, fee_type, amount, is_optional in (
+            (self.jss1, 'tuition', '20000', False), (self.jss1, 'exam', '5000', False),
+            (self.jss1, 'extra_lesson', '3000', True), (self.jss2, 'tuition', '25000', False),
+        ):
+            self.fees[(level.level, fee_type)] = FeeStructure.objects.create(
+                school=self.school, class_level=level, fee_type=fee_type, amount=Decimal(amount), is_optional=is_optional,
+            )
+        self.students = {
+            level.level: [self.enroll(session, level, f'{level.level}{number}') for number in 'abcd']
+            for level in (self.jss1, self.jss2)
+        }
+
+    def enroll(self, session, level, name):
+        level_class, _ = LevelClasses.objects.get_or_create(
+            school=self.school, program_level_template=level, class_section_name='A',
+        )
+        student = Student.objects.create(
+            first_name='Amina', last_name=name.replace(' ', ''), date_of_birth=date(2012, 1, 1), gender='F',
+            country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North', school=self.school,
+        )
+        EnrollmentRecord.objects.create(
+            student=student, school=self.school, program='jss', academic_session=session, program_level=level_class,
+        )
+        return student
+
+    def test_generate_for_class_level(self):
+        extra_lesson = self.fees[('JSS 1', 'extra_lesson')]
+        chosen = self.students['JSS 1'][0]
+        invoices = Invoice.objects.generate_for_cohort(
+            self.school, self.jss1, self.term, optional_fees={chosen.pk: [extra_lesson]},
+        )
+        self.assertEqual(len(invoices), 4)
+        totals = dict(Invoice.objects.filter(term=self.term).values_list('student_id', 'total_amount'))
+        self.assertEqual(totals, {
+            student.pk: Decimal('28000') if student == chosen else Decimal('25000')
+            for student in self.students['JSS 1']
+        })
+        invoice = Invoice.objects.get(student=chosen)
+        self.assertEqual(list(invoice.optional_fees_selected.all()), [extra_lesson])
+        self.assertEqual((invoice.balance, invoice.status, invoice.due_date), (Decimal('28000'), 'Pending', date(2024, 9, 9)))
+        self.assertEqual(invoice.calculate_total(), Decimal('28000'))
+        self.assertEqual(str(invoice), f'Invoice {invoice.invoice_id} for JSS1a Amina')
+
+    def test_generate_for_school_with_fixed_queries(self):
+        """
+        Test that the whole school is invoiced with a fixed number of queries and
+        that students already invoiced for the term are skipped.
+        """
+        Invoice.objects.generate_for_cohort(self.school, self.jss2, self.term)
+        with self.assertNumQueries(14):
+            invoices = Invoice.objects.generate_for_cohort(self.school, None, self.term)
+        self.assertEqual({invoice.student_id for invoice in invoices}, {student.pk for student in self.students['JSS 1']})
+        self.assertEqual(Invoice.objects.filter(term=self.term).count(), 8)
+        self.assertEqual(len(set(Invoice.objects.values_list('invoice_id', flat=True))), 8)
+        self.assertEqual(Invoice.objects.generate_for_cohort(self.school, None, self.term), [])
+
+    def test_rejects_fee_of_another_level(self):
+        with self.assertRaises(ValidationError):
+            Invoice.objects.generate_for_cohort(
+                self.school, self.jss2, self.term,
+                optional_fees={self.students['JSS 2'][0].pk: [self.fees[('JSS 1', 'extra_lesson')].pk]},
+            )
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_prorates_late_enrollments_by_school_days(self):
+        late, on_time, early, _ = self.students['JSS 2']
+        EnrollmentRecord.objects.filter(student__in=self.students['JSS 2']).update(enrollment_date=date(2024, 9, 1))
+        EnrollmentRecord.objects.filter(student=late).update(enrollment_date=date(2024, 11, 11))
+        EnrollmentRecord.objects.filter(student=on_time).update(enrollment_date=date(2024, 9, 9))
+
+        invoices = Invoice.objects.generate_for_cohort(self.school, self.jss2, self.term, prorate=True)
+        totals = {invoice.student_id: invoice.total_amount for invoice in invoices}
+        # 25 of the term's 70 school days are left from 11 November.
+        self.assertEqual(totals[late.pk], Decimal('8928.57'))
+        self.assertEqual(totals[on_time.pk], Decimal('25000'))
+        self.assertEqual(totals[early.pk], Decimal('25000'))
@@ -0,0 +1,125 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from backend.schools import ledger
+from backend.schools.models import (
+    School, AcademicSession, Term, Invoice, Payment, ExpenseCategory, SchoolExpense, FundingSource,
+    LedgerEntry, SchoolBalance,
+)
+
+
+class LedgerTest(TestCase):
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School', school_type='public', program='primary',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31),
+            status='ongoing', school_type='public',
+        )
+        self.term = Term.objects.create(
+            academic_session=session, term_name=1, start_date=date(2024, 9, 9), end_date=date(2024, 12, 13),
+        )
+
+    def balances(self, **filters):
+        return {
+            account: values['balance']
+            for account, values in ledger.account_balances(school=self.school, **filters).items()
+            if values['balance']
+        }
+
+    def assertLedgerBalanced(self):
+        totals = LedgerEntry.objects.aggregate(debit=Sum('debit'), credit=Sum('credit'))
+        self.assertEqual(totals['debit'], totals['credit'])
+
+    def test_invoice_and_payments(self):
+        invoice = Invoice.objects.create(
+            school=self.school, term=self.term, due_date=date(2024, 9, 30), total_amount=Decimal('1000'),
+        )
+        payment = Payment.objects.create(
+            school=self.school, invoice=invoice, amount=Decimal('400'), payment_method='Cash',
+        )
+        self.assertEqual(self.balances(term=self.term), {
+            'cash': Decimal('400'), 'receivable': Decimal('600'), 'fee_income': Decimal('-1000'),
+        })
+
+        payment.amount = Decimal('250')
+        payment.save()
+        invoice.save()
+        self.assertEqual(self.balances()['receivable'], Decimal('750'))
+
+        payment.delete()
+        self.assertEqual(self.balances(), {'receivable': Decimal('1000'), 'fee_income': Decimal('-1000')})
+        # Create, edit and delete of the payment are three postings of two lines each.
+        self.assertEqual(LedgerEntry.objects.filter(source_type='schools.Payment').count(), 6)
+        self.assertLedgerBalanced()
+
+    def test_expenses_and_funding_dated_into_terms(self):
+        category = ExpenseCategory.objects.create(school=self.school, name='Repairs')
+        SchoolExpense.objects.create(
+            school=self.school, category=category, description='Roof', amount=Decimal('300'),
+            date_incurred=date(2024, 10, 1),
+        )
+        FundingSource.objects.create(
+            school=self.school, source_name='Grant', funding_type='government', amount=Decimal('5000'),
+            date_received=date(2025, 1, 20),
+        )
+        self.assertEqual(self.balances(term=self.term), {'expenses': Decimal('300'), 'cash': Decimal('-300')})
+        self.assertEqual(self.balances(term=None), {'cash': Decimal('5000'), 'funding_income': Decimal('-5000')})
+
+    def test_entries_are_append_only(self):
+        Invoice.objects.create(school=self.school, due_date=date(2024, 9, 30), total_amount=Decimal('100'))
+        entry = LedgerEntry.objects.first()
+        entry.debit = Decimal('1')
+        with self.assertRaises(ValueError):
+            entry.save()
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+    def test_rebuild_and_sync_command(self):
+        """
+        Test that the incremental balances match a rebuild from the ledger and
+        that syncing records already posted adds nothing.
+        """
+        invoice = Invoice.objects.create(
+            school=self.school, term=self.term, due_date=date(2024, 9, 30), total_amount=Decimal('1000'),
+        )
+        Payment.objects.create(school=self.school, invoice=invoice, amount=Decimal('400'), payment_method='POS')
+        incremental = sorted(SchoolBalance.objects.values_list('account', 'debit_total', 'credit_total', 'entry_count'))
+        entries = LedgerEntry.objects.count()
+
+        out = StringIO()
+        call_command('sync_ledger', '--rebuild-balances', stdout=out)
+        self.assertIn('Ledger in sync.', out.getvalue())
+        self.assertEqual(LedgerEntry.objects.count(), entries)
+        self.assertEqual(
+            sorted(SchoolBalance.objects.values_list('account', 'debit_total', 'credit_total', 'entry_count')),
+            incremental,
+        )
+
+    def test_finance_pages(self):
+        Invoice.objects.create(
+            school=self.school, term=self.term, due_date=date(2024, 9, 30), total_amount=Decimal('1000'),
+        )
+        self.assertEqual(self.client.get(reverse('schools:finance_overview')).status_code, 302)
+        self.client.force_login(User.objects.create_user(username='bursar', password='password', is_staff=True))
+        response = self.client.get(reverse('schools:finance_overview'), {'term': self.term.pk, 'school_type': 'public'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Fees Receivable')
+        receivable = next(row for row in response.context['balances'] if row['label'] == 'Fees Receivable')
+        self.assertEqual(receivable['balance'], Decimal('1000'))
+
+        for term in ('abc', '1.5', str(self.term.pk + 1)):
+            self.assertEqual(self.client.get(reverse('schools:finance_overview'), {'term': term}).status_code, 404)
+
+        response = self.client.get(reverse('schools:school_finance', kwargs={'school_id': self.school.pk}))
+        self.assertEqual(response.status_code, 200)
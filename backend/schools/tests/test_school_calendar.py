@@ -0,0 +1,122 @@
+import time
+from datetime import date, datetime, timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from backend.schools.models import School, AcademicSession, Term, CalendarEvent, SuspensionClosure
+from backend.schools.school_calendar import (
+    MEMO_TIMEOUT, event_occurrences, school_calendars, term_calendar, term_calendars,
+)
+
+
+class SchoolCalendarTest(TestCase):
+
+    def setUp(self):
+        self.school = self.create_school('Test School')
+        self.other_school = self.create_school('Other School')
+        session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        # Monday 9 September to Friday 13 December: 14 weeks of school.
+        self.term = Term.objects.create(
+            academic_session=session, term_name=1, start_date=date(2024, 9, 9), end_date=date(2024, 12, 13),
+        )
+
+    def create_school(self, name):
+        return School.objects.create(
+            name=name, school_type='public', program='jss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+
+    def add_event(self, start, end, recurrence_type='None', closes_school=True, school=None):
+        return CalendarEvent.objects.create(
+            school=school or self.school, event_name='Holiday', event_type='Other',
+            start_date=datetime(*start, 8, tzinfo=timezone.utc), end_date=datetime(*end, 15, tzinfo=timezone.utc),
+            recurrence_type=recurrence_type, closes_school=closes_school,
+        )
+
+    def suspend(self, suspended_from, suspended_to=None, school=None, **options):
+        return SuspensionClosure.objects.create(
+            school=school or self.school, suspension_type='Closure', reason='Test',
+            suspended_from=suspended_from, suspended_to=suspended_to, **options,
+        )
+
+    def test_weekdays_are_school_days(self):
+        calendar = term_calendar(self.term, self.school)
+        self.assertEqual(calendar.total, 70)
+        self.assertTrue(calendar.is_school_day(date(2024, 9, 9)))
+        self.assertFalse(calendar.is_school_day(date(2024, 9, 14)))
+        self.assertFalse(calendar.is_school_day(date(2024, 12, 16)))
+        self.assertEqual(calendar.elapsed(date(2024, 9, 15)), 5)
+        self.assertEqual(calendar.remaining(date(2024, 12, 11)), 2)
+        self.assertEqual(calendar.percentage_elapsed(date(2025, 1, 1)), 100)
+        self.assertEqual(calendar.percentage_elapsed(date(2024, 9, 1)), 0)
+
+    def test_events_and_suspensions_close_days(self):
+        self.add_event((2024, 10, 1), (2024, 10, 1))
+        # Every Friday, from before the term started.
+        self.add_event((2024, 8, 30), (2024, 8, 30), 'Weekly')
+        # The 15th of every month: a Tuesday in October, a Friday in November.
+        self.add_event((2024, 1, 15), (2024, 1, 15), 'Monthly')
+        self.add_event((2020, 12, 12), (2020, 12, 12), 'Yearly')
+        self.add_event((2024, 9, 10), (2024, 9, 10), closes_school=False)
+        self.add_event((2024, 9, 11), (2024, 9, 11), school=self.other_school)
+        self.suspend(date(2024, 11, 4), date(2024, 11, 5), school=self.other_school, is_statewide=True)
+        self.suspend(date(2024, 11, 6), date(2024, 11, 6), school=self.other_school)
+        self.suspend(date(2024, 11, 7), date(2024, 11, 7), is_dropped=True)
+        self.suspend(date(2024, 12, 12), is_indefinite=True)
+
+        calendar = term_calendar(self.term, self.school)
+        closed = {date(2024, 10, 1), date(2024, 10, 15), date(2024, 11, 4), date(2024, 11, 5), date(2024, 12, 12)}
+        self.assertEqual(calendar.total, 70 - 14 - len(closed))
+        for day in closed | {date(2024, 9, 13), date(2024, 11, 15)}:
+            self.assertFalse(calendar.is_school_day(day), day)
+        for day in (date(2024, 9, 10), date(2024, 9, 11), date(2024, 11, 6), date(2024, 11, 7)):
+            self.assertTrue(calendar.is_school_day(day), day)
+
+    def test_calendars_are_built_once_and_refreshed_on_change(self):
+        with self.assertNumQueries(2):
+            calendars = term_calendars(self.term, [self.school, self.other_school.pk])
+        self.assertEqual(set(calendars), {self.school.pk, self.other_school.pk})
+        with self.assertNumQueries(0):
+            self.assertEqual(term_calendar(self.term, self.school).total, 70)
+
+        self.suspend(date(2024, 9, 9), date(2024, 9, 13), is_statewide=True)
+        self.assertEqual(term_calendar(self.term, self.other_school).total, 65)
+
+    def test_memo_expires(self):
+        """
+        Test that a change made without invalidation (e.g. by another process) is
+        seen once the memo and the cached calendars have expired.
+        """
+        self.assertEqual(term_calendar(self.term, self.school).total, 70)
+        SuspensionClosure.objects.bulk_create([SuspensionClosure(
+            school=self.school, suspension_type='Closure', reason='Test',
+            suspended_from=date(2024, 9, 9), suspended_to=date(2024, 9, 13),
+        )])
+        cache.delete(school_calendars._cache_key(self.term, self.school.pk))
+        self.assertEqual(term_calendar(self.term, self.school).total, 70)
+        later = time.monotonic() + MEMO_TIMEOUT + 1
+        with mock.patch('backend.schools.school_calendar.time.monotonic', return_value=later):
+            self.assertEqual(term_calendar(self.term, self.school).total, 65)
+
+    def test_event_occurrences(self):
+        self.assertEqual(
+            event_occurrences(date(2023, 1, 31), date(2023, 2, 1), 'Monthly', date(2024, 2, 1), date(2024, 3, 1)),
+            [(date(2024, 1, 31), date(2024, 2, 1)), (date(2024, 2, 29), date(2024, 3, 1))],
+        )
+        self.assertEqual(
+            event_occurrences(date(2024, 9, 2), date(2024, 9, 3), 'None', date(2024, 9, 4), date(2024, 9, 30)), [],
+        )
+
+    def test_template_tags_count_school_days(self):
+        template = Template(
+            '{% load custom_filters %}{% days_between term school=school %}|{% days_between end start %}'
+        )
+        context = Context({
+            'term': self.term, 'school': self.school, 'start': self.term.start_date, 'end': self.term.end_date,
+        })
+        self.assertEqual(template.render(context), '70|95')
@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from backend.schools.models import School, Classrooms, Library, SchoolImages
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+INFRASTRUCTURE_KEYS = [
+    'classroom', 'computer_lab', 'library', 'laboratory', 'sports_facility', 'special_needs',
+]
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SchoolDetailsLoaderTest(TestCase):
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test Public School', school_type='public', program='primary',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        Classrooms.objects.create(school=self.school, number_of_classrooms=12)
+        Library.objects.create(school=self.school, book_count=300)
+        for i in range(5):
+            SchoolImages.objects.create(
+                school=self.school,
+                image_type='classroom',
+                image=SimpleUploadedFile(f'room{i}.jpg', b'image', content_type='image/jpeg'),
+            )
+        SchoolImages.objects.create(
+            school=self.school,
+            image_type='library',
+            image=SimpleUploadedFile('shelf.jpg', b'image', content_type='image/jpeg'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_infrastructure_loads_in_two_queries(self):
+        """
+        Test that the school, its infrastructure rows and all images cost two queries.
+        """
+        with self.assertNumQueries(2):
+            school = School.objects.with_infrastructure().get(pk=self.school.pk)
+            details = school.get_infrastructure_details()
+
+        self.assertEqual(details['classroom'].number_of_classrooms, 12)
+        self.assertEqual(details['library'].book_count, 300)
+        self.assertIsNone(details['computer_lab'])
+        self.assertEqual(len(details['classroom_images']), 3)
+        self.assertEqual(len(details['library_images']), 1)
+        self.assertEqual(details['laboratory_images'], [])
+
+    def test_details_view_context_keys(self):
+        """
+        Test that the details view still provides every infrastructure context key.
+        """
+        client = Client()
+        client.force_login(User.objects.create_user(username='testuser', password='password'))
+        response = client.get(reverse('schools:details', kwargs={'pk': self.school.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        for key in INFRASTRUCTURE_KEYS:
+            self.assertIn(key, response.context)
+            self.assertIn(f'{key}_images', response.context)
+        for key in ('school', 'academic_session', 'stakeholders', 'classes', 'program_levels'):
+            self.assertIn(key, response.context)
+
+    def test_details_page_shows_every_image_type(self):
+        """
+        Test that an image stored under each infrastructure view's image type reaches the page.
+        """
+        school = School.objects.create(
+            name='Second Public School', school_type='public', program='primary',
+            lga='Test LGA', ward='Test Ward', street_address='1 Second Street',
+        )
+        Classrooms.objects.create(school=school, number_of_classrooms=4)
+        # The image types the infrastructure create/update views store.
+        image_types = {
+            'classroom': 'classroom', 'computer_lab': 'computer_lab', 'library': 'library',
+            'laboratory': 'laboratory', 'sports_facility': 'sports_facility',
+            'special_needs': 'special_needs_resource',
+        }
+        images = {
+            key: SchoolImages.objects.create(
+                school=school,
+                image_type=image_type,
+                image=SimpleUploadedFile(f'{key}.jpg', b'image', content_type='image/jpeg'),
+            )
+            for key, image_type in image_types.items()
+        }
+
+        client = Client()
+        client.force_login(User.objects.create_user(username='viewer', password='password'))
+        response = client.get(reverse('schools:details', kwargs={'pk': school.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        for key, image in images.items():
+            self.assertEqual(response.context[f'{key}_images'], [image])
+        self.assertContains(response, images['classroom'].image.url)
@@ -0,0 +1,106 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from backend.schools.models import School, AccreditationStatus, SuspensionClosure
+
+
+class SchoolStatusAnnotationTest(TestCase):
+
+    def setUp(self):
+        self.school_data = {
+            'school_type': 'public',
+            'program': 'primary',
+            'lga': 'Jos North',
+            'ward': 'Test Ward',
+            'street_address': '123 Test Street',
+        }
+
+    def create_school(self, name, **extra):
+        return School.objects.create(name=name, **(self.school_data | extra))
+
+    def test_annotated_status_matches_per_school_status(self):
+        """
+        Test that the annotated status gives the same label as the per-school lookup.
+        """
+        plain = self.create_school('Plain School')
+        accredited = self.create_school('Accredited School')
+        suspended = self.create_school('Suspended School')
+        AccreditationStatus.objects.create(school=accredited, status='accreditated')
+        AccreditationStatus.objects.create(school=suspended, status='accreditated')
+        SuspensionClosure.objects.create(
+            school=suspended, suspension_type='Suspension', reason='Test', suspended_from=date.today()
+        )
+        SuspensionClosure.objects.create(
+            school=accredited, suspension_type='Closure', reason='Dropped', suspended_from=date.today(), is_dropped=True
+        )
+
+        annotated = {school.pk: school.status for school in School.objects.with_status()}
+        for school in (plain, accredited, suspended):
+            self.assertEqual(annotated[school.pk], School.objects.get(pk=school.pk).status)
+        self.assertEqual(annotated[plain.pk], '-')
+        self.assertEqual(annotated[accredited.pk], 'Active')
+        self.assertEqual(annotated[suspended.pk], 'accreditated - Under Suspension')
+
+    def test_filter_listing(self):
+        """
+        Test filtering schools by school type, program and LGA.
+        """
+        self.create_school('Public Primary')
+        self.create_school('Private JSS', school_type='private', program='jss')
+        self.create_school('Other LGA', lga='Jos South')
+
+        self.assertEqual(School.objects.filter_listing(school_type='private').count(), 1)
+        self.assertEqual(School.objects.filter_listing(program='primary').count(), 2)
+        self.assertEqual(School.objects.filter_listing(lga='jos north').count(), 2)
+        self.assertEqual(School.objects.filter_listing().count(), 3)
+
+
+class SchoolListViewTest(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+
+    def create_schools(self, count, start=0):
+        for i in range(start, start + count):
+            school = School.objects.create(
+                name=f'School {i:03d}', school_type='public', program='primary',
+                lga='Jos North', ward='Ward', street_address='Street',
+            )
+            AccreditationStatus.objects.create(school=school, status='accreditated')
+
+    def count_list_queries(self):
+        # Warm up the session/user queries so only the listing is compared.
+        self.client.get(reverse('schools:list'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('schools:list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_schools(self):
+        """
+        Test that listing schools costs the same number of queries for 2 or 40 schools.
+        """
+        self.create_schools(2)
+        few = self.count_list_queries()
+        self.create_schools(38, start=2)
+        many = self.count_list_queries()
+        self.assertEqual(few, many)
+
+    def test_pagination_and_filters(self):
+        """
+        Test that the list is paginated and filters are applied.
+        """
+        self.create_schools(60)
+        response = self.client.get(reverse('schools:list'))
+        self.assertEqual(len(response.context['schools']), 50)
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 2)
+
+        response = self.client.get(reverse('schools:list'), {'school_type': 'private'})
+        self.assertEqual(len(response.context['schools']), 0)
@@ -0,0 +1,116 @@
+import time
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.test import TestCase
+
+from backend.schools.models import School, AcademicSession
+from backend.schools.session_resolver import MEMO_TIMEOUT, SESSIONS_CACHE_KEY, academic_session_resolver
+
+
+def resolve_with_query(school):
+    """The per-call OR filter the resolver replaces, used as the reference."""
+    programs = school.program.split('+')
+    filters = Q(school=school) | Q(school_type=school.school_type) | Q(school_type='all') | Q(program__in=programs)
+    return AcademicSession.objects.filter(filters, status='ongoing').order_by('start_date', 'pk').first()
+
+
+class AcademicSessionResolverTest(TestCase):
+
+    def setUp(self):
+        academic_session_resolver.invalidate()
+        self.schools = [
+            School.objects.create(
+                name=f'School {school_type} {program}', school_type=school_type, program=program,
+                lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+            )
+            for school_type in ('public', 'private', 'community')
+            for program in ('primary', 'jss+sss', 'all')
+        ]
+
+    def create_session(self, name, start, **fields):
+        fields.setdefault('status', 'ongoing')
+        return AcademicSession.objects.create(
+            session_name=name, start_date=start, end_date=date(start.year + 1, 7, 31), **fields
+        )
+
+    def test_matches_query_resolution(self):
+        """
+        Test that cached resolution gives the same session as the database filter.
+        """
+        self.create_session('2024/2025', date(2024, 9, 1), school_type='private', program='jss')
+        self.create_session('2024/2025', date(2024, 9, 8), school_type='public', program='primary')
+        self.create_session('2024/2025', date(2024, 9, 2), school_type='individual', program='sss', school=self.schools[7])
+        self.create_session('2023/2024', date(2023, 9, 1), school_type='community', program='jss', status='completed')
+
+        for school in self.schools:
+            self.assertEqual(school.get_academic_session(), resolve_with_query(school), school.name)
+
+    def test_no_queries_after_warm_up(self):
+        """
+        Test that resolving sessions for many schools costs no query once warmed up.
+        """
+        self.create_session('2024/2025', date(2024, 9, 1))
+        self.schools[0].get_academic_session()
+        with self.assertNumQueries(0):
+            for school in self.schools:
+                self.assertIsNotNone(school.get_academic_session())
+
+    def test_invalidated_on_save_and_delete(self):
+        """
+        Test that saving or deleting a session drops the cached result.
+        """
+        school = self.schools[0]
+        self.assertIsNone(school.get_academic_session())
+
+        session = self.create_session('2024/2025', date(2024, 9, 1))
+        self.assertEqual(school.get_academic_session(), session)
+
+        session.delete()
+        self.assertIsNone(school.get_academic_session())
+
+    def test_invalidated_by_complete_all_ongoing_sessions(self):
+        """
+        Test that completing every ongoing session drops the cached result.
+        """
+        school = self.schools[0]
+        self.create_session('2024/2025', date(2024, 9, 1))
+        self.assertIsNotNone(school.get_academic_session())
+
+        AcademicSession.complete_all_ongoing_sessions()
+        self.assertIsNone(school.get_academic_session())
+
+    def test_memo_expires(self):
+        """
+        Test that a change made without invalidation (e.g. by another process) is
+        seen once the memo and the cached sessions have expired.
+        """
+        school = self.schools[0]
+        session = self.create_session('2024/2025', date(2024, 9, 1))
+        self.assertEqual(school.get_academic_session(), session)
+
+        AcademicSession.objects.filter(pk=session.pk).update(status='completed')
+        cache.delete(SESSIONS_CACHE_KEY)
+        self.assertEqual(school.get_academic_session(), session)
+        later = time.monotonic() + MEMO_TIMEOUT + 1
+        with mock.patch('backend.schools.session_resolver.time.monotonic', return_value=later):
+            self.assertIsNone(school.get_academic_session())
+
+    def test_resolve_for_schools(self):
+        """
+        Test that bulk resolution matches per-school resolution in two queries.
+        """
+        self.create_session('2024/2025', date(2024, 9, 3), school_type='private', program='jss')
+        self.create_session('2024/2025', date(2024, 9, 8), school_type='public', program='primary')
+        self.create_session('2024/2025', date(2024, 9, 2), school_type='individual', program='sss', school=self.schools[7])
+        self.create_session('2024/2025', date(2024, 9, 9), school_type='individual', program='primary', school=self.schools[0])
+        academic_session_resolver.invalidate()
+
+        with self.assertNumQueries(2):
+            resolved = AcademicSession.objects.resolve_for_schools(School.objects.all())
+
+        self.assertEqual(len(resolved), len(self.schools))
+        for school in self.schools:
+            self.assertEqual(resolved[school.pk], resolve_with_query(school), school.name)
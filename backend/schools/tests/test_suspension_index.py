@@ -0,0 +1,120 @@
+import time
+from datetime import date, datetime, timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from backend.schools.models import School, AcademicSession, Term, CalendarEvent, SuspensionClosure
+from backend.schools.suspension_index import MEMO_TIMEOUT, days_lost, schools_closed_on, suspension_index
+
+
+class SuspensionIndexTest(TestCase):
+
+    def setUp(self):
+        self.north = [self.create_school(f'North {number}', 'Jos North') for number in range(3)]
+        self.south = self.create_school('South', 'Jos South')
+        session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        # Monday 2 September to Friday 13 December.
+        Term.objects.create(
+            academic_session=session, term_name=1, start_date=date(2024, 9, 2), end_date=date(2024, 12, 13),
+        )
+
+    def create_school(self, name, lga):
+        return School.objects.create(
+            name=name, school_type='public', program='jss', lga=lga, ward='Test Ward', street_address='123 Test Street',
+        )
+
+    def suspend(self, school, suspended_from, suspended_to=None, **options):
+        return SuspensionClosure.objects.create(
+            school=school, suspension_type='Closure', reason='Test',
+            suspended_from=suspended_from, suspended_to=suspended_to, **options,
+        )
+
+    def test_point_queries(self):
+        first, second, third = self.north
+        # Monday 2 to Friday 6 September.
+        self.suspend(first, date(2024, 9, 2), date(2024, 9, 6))
+        self.suspend(second, date(2024, 9, 5), is_indefinite=True)
+        self.suspend(third, date(2024, 9, 2), date(2024, 9, 30), is_dropped=True)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(suspension_index.get().closed_on(date(2024, 9, 5)), (False, {first.pk, second.pk}))
+        with self.assertNumQueries(0):
+            self.assertEqual(suspension_index.get().closed_on(date(2025, 1, 1)), (False, {second.pk}))
+        self.assertEqual(schools_closed_on(date(2024, 9, 1), School.objects.all()), set())
+
+        # Saving refreshes the index.
+        self.suspend(self.south, date(2024, 9, 1), date(2024, 9, 1), is_statewide=True)
+        self.assertEqual(
+            schools_closed_on(date(2024, 9, 1), School.objects.all()), {school.pk for school in [*self.north, self.south]}
+        )
+
+    def test_index_expires(self):
+        """
+        Test that a suspension saved without invalidation (e.g. by another
+        process) is seen once the index has expired.
+        """
+        day = date(2024, 9, 2)
+        self.assertEqual(schools_closed_on(day, School.objects.all()), set())
+        SuspensionClosure.objects.bulk_create([SuspensionClosure(
+            school=self.south, suspension_type='Closure', reason='Test', suspended_from=day, suspended_to=day,
+        )])
+        self.assertEqual(schools_closed_on(day, School.objects.all()), set())
+        later = time.monotonic() + MEMO_TIMEOUT + 1
+        with mock.patch('backend.schools.suspension_index.time.monotonic', return_value=later):
+            self.assertEqual(schools_closed_on(day, School.objects.all()), {self.south.pk})
+
+    def test_days_lost_counts_weekdays_once(self):
+        first, second, third = self.north
+        self.suspend(first, date(2024, 9, 2), date(2024, 9, 6))
+        # Overlaps the one above and runs over a weekend.
+        self.suspend(first, date(2024, 9, 5), date(2024, 9, 10))
+        self.suspend(second, date(2024, 9, 20), is_indefinite=True)
+        self.suspend(self.south, date(2024, 9, 9), date(2024, 9, 9), is_statewide=True)
+
+        lost = days_lost(date(2024, 9, 1), date(2024, 9, 30), School.objects.filter(lga='Jos North'))
+        self.assertEqual(lost, {first.pk: 7, second.pk: 8, third.pk: 1})
+        lost = days_lost(date(2024, 9, 30), date(2024, 9, 1), School.objects.filter(lga='Jos North'))
+        self.assertEqual(lost, {first.pk: 0, second.pk: 0, third.pk: 0})
+
+    def test_days_lost_counts_school_days(self):
+        """
+        Test that holidays and days outside a term are not counted as lost.
+        """
+        first, second, _ = self.north
+        # Monday 9 to Friday 20 December, over the end of term.
+        self.suspend(first, date(2024, 12, 9), date(2024, 12, 20))
+        # Monday 7 to Friday 11 October, over a two-day mid-term break.
+        self.suspend(second, date(2024, 10, 7), date(2024, 10, 11))
+        CalendarEvent.objects.create(
+            school=second, event_name='Mid-term break', event_type='Other',
+            start_date=datetime(2024, 10, 10, 8, tzinfo=timezone.utc),
+            end_date=datetime(2024, 10, 11, 15, tzinfo=timezone.utc), closes_school=True,
+        )
+
+        # The suspended schools, the index, the terms and one term's events.
+        with self.assertNumQueries(4):
+            lost = days_lost(date(2024, 9, 1), date(2025, 1, 31), School.objects.filter(lga='Jos North'))
+        self.assertEqual(lost, {first.pk: 5, second.pk: 3, self.north[2].pk: 0})
+
+    def test_report_view(self):
+        self.client.force_login(User.objects.create_user(username='testuser', password='password'))
+        self.suspend(self.north[0], date(2024, 9, 2), date(2024, 9, 6))
+        response = self.client.get(
+            reverse('schools:suspension_report'), {'day': '2024-09-03', 'start': '2024-09-01', 'end': '2024-09-30'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([school for school, _ in response.context['closed']], [self.north[0]])
+        self.assertEqual(
+            [(row['lga'], row['affected'], row['days_lost']) for row in response.context['lga_rows']],
+            [('Jos North', 1, 5), ('Jos South', 0, 0)],
+        )
+
+        # A reversed period is read from its earlier day to its later one.
+        response = self.client.get(reverse('schools:suspension_report'), {'start': '2024-09-30', 'end': '2024-09-01'})
+        self.assertEqual((response.context['start'], response.context['end']), (date(2024, 9, 1), date(2024, 9, 30)))
+        self.assertEqual(response.context['lga_rows'][0]['days_lost'], 5)
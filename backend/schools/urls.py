@@ -50,6 +50,7 @@ urlpatterns = [
     path('suspension-closure/<uuid:pk>/set/', views.suspension_set, name='suspension_set'),
     path('suspension-closure/<int:pk>/update/', views.suspension_update, name='suspension_update'),
     path('suspension-closure/<int:pk>/drop/', views.suspension_drop, name='suspension_drop'),
+    path('suspension-closure/report/', views.suspension_report, name='suspension_report'),
     
     path('inspection-report/<uuid:pk>/set/', views.inspection_report_set, name='inspection_report_set'),
     path('inspection-report/<int:pk>/update/', views.inspection_report_update, name='inspection_report_update'),
@@ -141,6 +142,7 @@ urlpatterns = [
     path('staff/<int:pk>/delete/', stakeholders.staff_delete, name='staff_delete'),
 
     path('finance/<uuid:school_id>/details/', finance.school_finance, name='school_finance'),
+    path('finance/overview/', finance.finance_overview, name='finance_overview'),
     
     path('fee-structure/<uuid:school_id>/create/', finance.fee_structure_create, name='fee_structure_create'),
     path('fee-structure/<int:pk>/update/', finance.fee_structure_update, name='fee_structure_update'),
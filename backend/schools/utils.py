@@ -50,9 +50,7 @@ def remove_old_file(file_path):
 
 # Image type mapping to clean up strings
 IMAGE_TYPE_MAPPING = {
-    'computer_lab': 'computerlab',
     'science_lab': 'sciencelab',
-    'classrooms': 'classrooms',
     # Add other mappings as needed
 }
 
@@ -82,7 +80,9 @@ def infrastructure_create(request, school_id, form_class, image_type):
                     images = request.FILES.getlist('image')
                     MAX_IMAGES = 3
                     if images:
-                        existing_count = SchoolImages.objects.filter(school_id=school_id, image_type=image_type).count()
+                        existing_count = SchoolImages.objects.filter(
+                            school_id=school_id, image_type=IMAGE_TYPE_MAPPING.get(image_type, image_type)
+                        ).count()
                         if existing_count + len(images) > MAX_IMAGES:
                             raise ValidationError(f"Maximum {MAX_IMAGES} images allowed.")
 
@@ -180,7 +180,7 @@ def infrastructure_update(request, school_id, model_class, form_class, image_typ
         image_form = SchoolImagesUpdateForm()
 
     # Retrieve existing images
-    images = SchoolImages.objects.filter(school_id=school_id, image_type=image_type.replace('_', ''))
+    images = SchoolImages.objects.filter(school_id=school_id, image_type=IMAGE_TYPE_MAPPING.get(image_type, image_type))
 
     return render(request, 'schools/infrastructure_update.html', {
         'form': form,
@@ -1,8 +1,13 @@
+from datetime import date
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
 
 
-from backend.schools.models import FeeStructure, School
+from backend.schools import ledger
+from backend.schools.models import FeeStructure, School, Term
 from backend.schools.forms import FeeStructureForm
 from backend.schools.utils import generic_create, generic_delete
 
@@ -12,11 +17,40 @@ from backend.schools.utils import generic_create, generic_delete
 # ==============================
 def school_finance(request, school_id):
     school = get_object_or_404(School, pk=school_id)
+    term_id = ledger.term_on(school, date.today())
 
     context = {
         'school': school,
+        'balances': ledger.account_balances(school=school).values(),
+        'term_balances': ledger.account_balances(school=school, term_id=term_id).values() if term_id else None,
     }
     return render(request, 'sections/finance.html', context)
+
+@staff_member_required
+def finance_overview(request):
+    """
+    Account balances across all schools, optionally for one term or school type,
+    read from the per-school rollups.
+    """
+    filters = {}
+    term = None
+    if request.GET.get('term'):
+        if not request.GET['term'].isdigit():
+            raise Http404("Invalid term.")
+        term = get_object_or_404(Term.objects.select_related('academic_session'), pk=int(request.GET['term']))
+        filters['term'] = term
+    school_type = request.GET.get('school_type')
+    if school_type:
+        filters['school__school_type'] = school_type
+
+    context = {
+        'balances': ledger.account_balances(**filters).values(),
+        'term': term,
+        'school_type': school_type,
+        'terms': Term.objects.select_related('academic_session').order_by('-academic_session__start_date', 'term_name'),
+        'school_types': School.SCHOOL_TYPE_CHOICES,
+    }
+    return render(request, 'sections/finance_overview.html', context)
 # Create Fee Structure
 def fee_structure_create(request, school_id):
     school = get_object_or_404(School, pk=school_id)
@@ -16,7 +16,7 @@ def classroom_create(request, school_id):
     View to handle the creation of classroom infrastructure and associated images.
     """
     from backend.schools.forms import ClassroomsForm  # Import form locally if needed
-    return infrastructure_create(request, school_id, ClassroomsForm, 'classrooms')
+    return infrastructure_create(request, school_id, ClassroomsForm, 'classroom')
 
 def classroom_update(request, school_id):
     """
@@ -1,5 +1,6 @@
 from itertools import zip_longest
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.db.models import Q, Prefetch
 from django.views.generic.edit import FormView
 from django.contrib.auth.decorators import login_required, user_passes_test
@@ -14,17 +15,10 @@ from backend.schools.forms import (
 )
 from backend.schools.models import (
     AcademicSession,
-    Classrooms,
-    ComputerLab,
-    Laboratory,
-    Library,
     ProgramLevelTemplate,
     School,
-    SchoolImages,
-    SportsFacility,
     Stakeholder,
     Stream,
-    SpecialNeedsResource,
     Term,
 )
 
@@ -66,31 +60,43 @@ def school_update(request, pk):
         form = SchoolForm(instance=school)
     return render(request, 'schools/school_create.html', {'form': form})
 
+SCHOOLS_PER_PAGE = 50
+
 @login_required
 def school_list(request):
-    schools = School.objects.all()
-    return render(request, 'schools/school_list.html', {'schools': schools})
+    filters = {
+        'school_type': request.GET.get('school_type', ''),
+        'program': request.GET.get('program', ''),
+        'lga': request.GET.get('lga', '').strip(),
+    }
+    # Status is annotated in the same query, so the page costs a fixed
+    # number of queries however many schools are listed.
+    schools = School.objects.with_status().filter_listing(**filters)
+
+    paginator = Paginator(schools, SCHOOLS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
+
+    context = {
+        'schools': page_obj.object_list,
+        'page_obj': page_obj,
+        'filters': filters,
+        'query_string': query_params.urlencode(),
+        'school_type_choices': School.SCHOOL_TYPE_CHOICES,
+        'program_choices': School.PROGRAM_CHOICES,
+    }
+    return render(request, 'schools/school_list.html', context)
 
 @login_required
 def school_details(request, pk):
-    school = get_object_or_404(School, pk=pk)
+    school = get_object_or_404(School.objects.with_infrastructure(), pk=pk)
     academic_session = school.get_academic_session()
     stakeholders = school.stakeholders.all()
 
-    # Infrastructure
-    classroom = Classrooms.objects.filter(school=school).order_by('-created_at').first()  # Expecting only one record
-    computer_lab = ComputerLab.objects.filter(school=school).order_by('-created_at').first()  # Expecting only one record
-    library = Library.objects.filter(school=school).order_by('-created_at').first()
-    laboratory = Laboratory.objects.filter(school=school).order_by('-created_at').first()
-    sports_facility = SportsFacility.objects.filter(school=school).order_by('-created_at').first()
-    special_needs = SpecialNeedsResource.objects.filter(school=school).order_by('-created_at').first()
-    # Fetch images grouped by type
-    classroom_images = SchoolImages.objects.filter(school=school, image_type='classrooms').order_by('-created_at')[:3]
-    computer_lab_images = SchoolImages.objects.filter(school=school, image_type='computerlab').order_by('-created_at')[:3]
-    library_images = SchoolImages.objects.filter(school=school, image_type='library').order_by('-created_at')[:3]
-    laboratory_images = SchoolImages.objects.filter(school=school, image_type='laboratoty').order_by('-created_at')[:3]
-    sports_facility_images = SchoolImages.objects.filter(school=school, image_type='sports_facility').order_by('-created_at')[:3]
-    special_needs_images = SchoolImages.objects.filter(school=school, image_type='special_needs_resource').order_by('-created_at')[:3]
+    # Infrastructure records and their latest images (e.g. 'library', 'library_images')
+    infrastructure = school.get_infrastructure_details()
 
     # Fetch the related ProgramLevelTemplate objects
     level_classes = school.get_levels_and_classes()
@@ -99,21 +105,8 @@ def school_details(request, pk):
         'school': school,
         'academic_session': academic_session,
         'stakeholders': stakeholders,
-
-        'classroom': classroom,
-        'classroom_images': classroom_images,
-        'computer_lab': computer_lab,
-        'computer_lab_images': computer_lab_images,
-        'library': library,
-        'library_images': library_images,
-        'laboratory': laboratory,
-        'laboratory_images': laboratory_images,
-        'sports_facility': sports_facility,
-        'sports_facility_images': sports_facility_images,
-        'special_needs': special_needs,
-        'special_needs_images': special_needs_images,
     } 
-    context = context | level_classes
+    context = context | infrastructure | level_classes
     return render(request, 'schools/school_details.html', context)
 
 @login_required
@@ -404,8 +397,10 @@ def accreditation_delete(request, pk):
 |            model.        |
 ====================================
 """
+from datetime import date
 from backend.schools.models import SuspensionClosure
 from backend.schools.forms import SuspensionForm
+from backend.schools.suspension_index import days_lost, suspension_index
 @login_required
 def suspension_set(request, pk):
     school = get_object_or_404(School, pk=pk)
@@ -428,7 +423,7 @@ def suspension_set(request, pk):
 def suspension_update(request, pk):
     suspension = get_object_or_404(SuspensionClosure, pk=pk)
     if request.POST:
-        form = SuspensionForm(request.POST, instance=suspension, initial={'school': school.pk})
+        form = SuspensionForm(request.POST, instance=suspension, initial={'school': suspension.school_id})
         if form.is_valid():
             form.save()
             messages.success(request, "Suspension updated successfully for this school")
@@ -445,6 +440,57 @@ def suspension_drop(request, pk):
         return redirect("schools:details", pk=suspension.school.pk)
     return render(request, 'schools/suspension_confirm_delete.html', {'suspension': suspension})
 
+
+def report_day(value, default):
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+@login_required
+def suspension_report(request):
+    """
+    Schools closed on a day and school days lost to suspensions per LGA over a
+    period, answered from the in-memory suspension index and the term calendars.
+    """
+    today = date.today()
+    day = report_day(request.GET.get('day'), today)
+    start = report_day(request.GET.get('start'), date(today.year, 1, 1))
+    end = report_day(request.GET.get('end'), today)
+    if start > end:
+        start, end = end, start
+    schools = School.objects.filter_listing(
+        school_type=request.GET.get('school_type'), lga=request.GET.get('lga'),
+    )
+
+    active = suspension_index.get().active_on(day)
+    statewide = [suspension for suspension in active if suspension.is_statewide]
+    own = {suspension.school_id: suspension for suspension in active if not suspension.is_statewide}
+    closed = schools if statewide else schools.filter(pk__in=own)
+    closed = [
+        (school, own.get(school.pk) or statewide[0])
+        for school in closed.only('pk', 'name', 'lga', 'school_type').order_by('lga', 'name')
+    ]
+
+    school_lgas = dict(schools.values_list('pk', 'lga'))
+    lost = days_lost(start, end, schools)
+    by_lga = {}
+    for school_id, lga in school_lgas.items():
+        row = by_lga.setdefault(lga, {'lga': lga, 'schools': 0, 'affected': 0, 'days_lost': 0})
+        row['schools'] += 1
+        row['affected'] += bool(lost[school_id])
+        row['days_lost'] += lost[school_id]
+    lga_rows = sorted(by_lga.values(), key=lambda row: (-row['days_lost'], row['lga']))
+    for row in lga_rows:
+        row['average'] = round(row['days_lost'] / row['schools'], 1)
+
+    context = {
+        'day': day, 'start': start, 'end': end, 'closed': closed, 'statewide': statewide, 'lga_rows': lga_rows,
+        'school_type': request.GET.get('school_type', ''), 'lga': request.GET.get('lga', ''),
+        'school_types': School.SCHOOL_TYPE_CHOICES,
+    }
+    return render(request, 'schools/suspension_report.html', context)
+
 """
 ====================================
 |VIEWS FOR inspection report MODEL |
@@ -1,13 +1,43 @@
+import numpy as np
+
+
 def generate_luhn_check_digit(number):
     """Generates a Luhn check digit for the given number."""
     def digits_of(n):
         return [int(d) for d in str(n)]
     digits = digits_of(number)
-    odd_digits = digits[-1::-2]
-    even_digits = digits[-2::-2]
+    # The check digit is appended on the right, so the payload's last digit is doubled.
+    doubled_digits = digits[-1::-2]
+    plain_digits = digits[-2::-2]
     checksum = 0
-    checksum += sum(odd_digits)
-    for d in even_digits:
+    checksum += sum(plain_digits)
+    for d in doubled_digits:
         checksum += sum(digits_of(d * 2))
     check_digit = (10 - checksum % 10) % 10
-    return check_digit
\ No newline at end of file
+    return check_digit
+
+
+def luhn_check_digits(numbers, width):
+    """
+    Luhn check digits of an array of non-negative integers of at most `width` digits,
+    computed column by column instead of number by number.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    # Column i holds the digit i places from the right.
+    digits = numbers[:, None] // (10 ** np.arange(width, dtype=np.int64)) % 10
+    doubled = digits[:, 0::2] * 2
+    checksum = (doubled - 9 * (doubled > 9)).sum(axis=1) + digits[:, 1::2].sum(axis=1)
+    return (10 - checksum % 10) % 10
+
+
+def is_luhn_valid(number):
+    """Checks a string of digits whose last digit is its Luhn check digit."""
+    checksum = 0
+    for position, character in enumerate(reversed(number)):
+        digit = ord(character) - 48
+        if position % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        checksum += digit
+    return checksum % 10 == 0
@@ -0,0 +1,245 @@
+"""
+Attendance storage.
+
+Daily registers are written to the Attendance row store, one row per student
+per day, where recent days stay easy to query and correct. `rollup_attendance`
+periodically folds rows older than ATTENDANCE_ROW_DAYS into TermAttendance,
+one row per student per term holding a byte per day, and deletes them. A
+register submitted for a day already past the cut-off goes straight into
+TermAttendance, so a day is only ever stored in one place.
+
+Rates and totals add the counts kept on TermAttendance to a count of the rows
+still in the row store: two aggregate queries whatever the size of the class.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.utils.timezone import now
+
+from backend.schools.ledger import term_on
+from backend.schools.models import School, Term
+from backend.schools.school_calendar import term_calendar
+from backend.student.models import Attendance, EnrollmentRecord, TermAttendance
+from backend.student.models.attendance import ATTENDANCE_STATUSES
+
+ATTENDANCE_ROW_DAYS = 14
+ATTENDANCE_BATCH_SIZE = 1000
+STATUS_CODES = {status: code for code, (status, _) in enumerate(ATTENDANCE_STATUSES, start=1)}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+COUNT_FIELDS = ('days_present', 'days_absent', 'days_excused')
+
+
+def rollup_cutoff(today=None):
+    """
+    The first day still kept in the row store.
+    """
+    row_days = getattr(settings, 'ATTENDANCE_ROW_DAYS', ATTENDANCE_ROW_DAYS)
+    return (today or date.today()) - timedelta(days=row_days)
+
+
+def term_days(term):
+    return (term.end_date - term.start_date).days + 1
+
+
+def in_term(term, day):
+    return term.start_date <= day <= term.end_date
+
+
+def decode_marks(marks, term):
+    """
+    The status codes of every day of `term` as a uint8 array.
+    """
+    codes = np.zeros(term_days(term), dtype=np.uint8)
+    stored = np.frombuffer(bytes(marks or b''), dtype=np.uint8)[:len(codes)]
+    codes[:len(stored)] = stored
+    return codes
+
+
+def set_counts(term_attendance, codes):
+    totals = np.bincount(codes, minlength=len(STATUS_CODES) + 1)
+    for code, field in enumerate(COUNT_FIELDS, start=1):
+        setattr(term_attendance, field, int(totals[code]))
+
+
+def fold(term, marks):
+    """
+    Write {student_id: [(day, status), ...]} for `term` into TermAttendance.
+    """
+    with transaction.atomic(savepoint=False):
+        existing = {
+            row.student_id: row
+            for row in TermAttendance.objects.select_for_update().filter(term=term, student__in=list(marks))
+        }
+        updated, created = [], []
+        for student_id, days in marks.items():
+            row = existing.get(student_id)
+            if row is None:
+                row = TermAttendance(student_id=student_id, term=term)
+                created.append(row)
+            else:
+                row.updated_at = now()
+                updated.append(row)
+            codes = decode_marks(row.marks, term)
+            offsets = np.array([(day - term.start_date).days for day, _ in days], dtype=int)
+            codes[offsets] = [STATUS_CODES[status] for _, status in days]
+            row.marks = codes.tobytes()
+            set_counts(row, codes)
+        TermAttendance.objects.bulk_update(
+            updated, ['marks', *COUNT_FIELDS, 'updated_at'], batch_size=ATTENDANCE_BATCH_SIZE
+        )
+        TermAttendance.objects.bulk_create(created, batch_size=ATTENDANCE_BATCH_SIZE)
+
+
+def register_term(school, day):
+    term_id = term_on(school, day)
+    if term_id is None:
+        raise ValidationError(f"{day} is not in a term of {school.name}.")
+    return Term.objects.get(pk=term_id)
+
+
+def submit_register(level_class, day, statuses=None, default='Present', today=None):
+    """
+    Mark the daily register of a class section.
+
+    Every student actively enrolled in `level_class` is marked `default`
+    unless `statuses` ({student_id: status}) says otherwise. Returns the
+    number of students marked.
+    """
+    statuses = statuses or {}
+    invalid = {status for status in [default, *statuses.values()] if status not in STATUS_CODES}
+    if invalid:
+        raise ValidationError(f"Unknown attendance statuses: {', '.join(sorted(invalid))}.")
+    term = register_term(level_class.school, day)
+    if not term_calendar(term, level_class.school_id).is_school_day(day):
+        raise ValidationError(f"{day} is not a school day at {level_class.school.name}.")
+
+    students = list(EnrollmentRecord.objects.filter(
+        program_level=level_class, is_active=True,
+    ).values_list('student_id', flat=True))
+    unknown = set(statuses) - set(students)
+    if unknown:
+        raise ValidationError(f"{len(unknown)} students are not enrolled in {level_class}.")
+    marks = {student_id: statuses.get(student_id, default) for student_id in students}
+
+    if day < rollup_cutoff(today):
+        fold(term, {student_id: [(day, status)] for student_id, status in marks.items()})
+    else:
+        Attendance.objects.bulk_create(
+            [
+                Attendance(student_id=student_id, term=term, date=day, status=status)
+                for student_id, status in marks.items()
+            ],
+            batch_size=ATTENDANCE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['student', 'date'],
+            update_fields=['term', 'status'],
+        )
+    return len(marks)
+
+
+def rollup_attendance(before=None, batch_size=ATTENDANCE_BATCH_SIZE):
+    """
+    Fold Attendance rows dated before `before` (default: the rollup cut-off)
+    into TermAttendance and delete them. Rows without a term get the one their
+    school was in on the day; rows outside any term are left in place.
+    Returns the number of rows folded.
+    """
+    before = before or rollup_cutoff()
+    folded, last_pk = 0, 0
+    terms, schools, resolved = {}, {}, {}
+    while True:
+        rows = list(
+            Attendance.objects.filter(date__lt=before, pk__gt=last_pk).order_by('pk').values_list(
+                'pk', 'student_id', 'student__school_id', 'term_id', 'date', 'status'
+            )[:batch_size]
+        )
+        if not rows:
+            return folded
+        last_pk = rows[-1][0]
+
+        missing = {school_id for _, _, school_id, term_id, _, _ in rows if term_id is None} - set(schools)
+        schools.update(School.objects.in_bulk(missing))
+        for key in {(school_id, day) for _, _, school_id, term_id, day, _ in rows if term_id is None}:
+            if key not in resolved:
+                school = schools.get(key[0])
+                resolved[key] = term_on(school, key[1]) if school is not None else None
+        terms.update(Term.objects.in_bulk(
+            {term_id or resolved[(school_id, day)] for _, _, school_id, term_id, day, _ in rows} - set(terms) - {None}
+        ))
+
+        by_term, pks = defaultdict(lambda: defaultdict(list)), []
+        for pk, student_id, school_id, term_id, day, status in rows:
+            term = terms.get(term_id or resolved[(school_id, day)])
+            if term is not None and in_term(term, day):
+                by_term[term][student_id].append((day, status))
+                pks.append(pk)
+        with transaction.atomic():
+            for term, marks in by_term.items():
+                fold(term, marks)
+            Attendance.objects.filter(pk__in=pks).delete()
+        folded += len(pks)
+
+
+def attendance_totals(term, students=None):
+    """
+    {student_id: {'Present': n, 'Absent': n, 'Excused': n}} for `term`, from
+    TermAttendance and the row store. `students` (ids or a queryset) limits
+    the students.
+    """
+    stored = TermAttendance.objects.filter(term=term)
+    recent = Attendance.objects.filter(term=term)
+    if students is not None:
+        stored, recent = stored.filter(student__in=students), recent.filter(student__in=students)
+
+    totals = defaultdict(lambda: dict.fromkeys(STATUS_CODES, 0))
+    for student_id, *counts in stored.values_list('student_id', *COUNT_FIELDS):
+        for status, count in zip(STATUS_CODES, counts):
+            totals[student_id][status] += count
+    for student_id, status, count in recent.values_list('student_id', 'status').annotate(
+        count=Count('pk')
+    ).order_by():
+        totals[student_id][status] += count
+    return dict(totals)
+
+
+def attendance_rate(totals):
+    """
+    Percentage of the marked days a student was present. Excused days count
+    neither way; None when nothing counts.
+    """
+    counted = totals['Present'] + totals['Absent']
+    return round(totals['Present'] * 100 / counted, 2) if counted else None
+
+
+def attendance_rates(term, students=None):
+    return {
+        student_id: attendance_rate(totals)
+        for student_id, totals in attendance_totals(term, students).items()
+    }
+
+
+def class_attendance_rates(level_class, term):
+    """
+    Attendance rates of the students actively enrolled in a class section.
+    """
+    students = EnrollmentRecord.objects.filter(program_level=level_class, is_active=True).values('student_id')
+    return attendance_rates(term, students)
+
+
+def student_attendance(student, term):
+    """
+    [(date, status), ...] of a student's marked days in `term`, in date order.
+    """
+    marks = {}
+    stored = TermAttendance.objects.filter(student=student, term=term).values_list('marks', flat=True).first()
+    if stored is not None:
+        codes = decode_marks(stored, term)
+        for offset in np.flatnonzero(codes).tolist():
+            marks[term.start_date + timedelta(days=offset)] = STATUS_NAMES[int(codes[offset])]
+    marks.update(Attendance.objects.filter(student=student, term=term).values_list('date', 'status'))
+    return sorted(marks.items())
@@ -0,0 +1,222 @@
+"""
+Duplicate student detection.
+
+The unique constraint on Student only stops exact copies; a transfer or a
+re-registration under a misspelt name gets through. `find_duplicates` looks
+for those in three steps:
+
+1. Blocking. Students are read in date of birth order, so each day's births
+   arrive together, and only students born on the same day are compared.
+   Within a day, students are grouped by the Soundex code of their first and
+   of their last name (one key namespace, so swapped names meet too), and
+   only students sharing a group are paired. A group larger than
+   MAX_BLOCK_SIZE is sorted by name and only neighbours within
+   BLOCK_WINDOW are paired, so no day costs more than O(n * window).
+2. Scoring. Names are turned into hashed character-bigram vectors and every
+   pair of a day is scored at once with NumPy: the cosine similarity of the
+   names (either way round), plus agreement on state and place of birth.
+3. Review. Pairs scoring DUPLICATE_THRESHOLD or more are stored as pending
+   DuplicateCandidate rows; a pair already stored keeps its review status.
+
+Days are scored in `workers` processes; the processes only see plain tuples.
+"""
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+
+import numpy as np
+from django.conf import settings
+from django.utils.timezone import now
+
+from backend.student.models import DuplicateCandidate, Student
+
+DUPLICATE_THRESHOLD = 0.85
+MAX_BLOCK_SIZE = 200
+BLOCK_WINDOW = 20
+BIGRAM_DIMENSIONS = 512
+READ_CHUNK_SIZE = 2000
+BATCH_RECORDS = 5000  # records sent to a worker at a time
+RECORD_FIELDS = ('pk', 'first_name', 'middle_name', 'last_name', 'gender', 'state_of_origin', 'place_of_birth')
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+NAME_WEIGHT = 0.8
+STATE_WEIGHT = 0.1
+PLACE_WEIGHT = 0.1
+GENDER_PENALTY = 0.2
+
+
+def clean(name):
+    return ''.join(character for character in (name or '').lower() if character.isalpha())
+
+
+def soundex(name):
+    """
+    American Soundex code of a name, e.g. 'Okafor' -> 'O216'; '' for no letters.
+    """
+    name = clean(name)
+    if not name:
+        return ''
+    code, previous = [name[0].upper()], SOUNDEX_CODES.get(name[0])
+    for character in name[1:]:
+        digit = SOUNDEX_CODES.get(character)
+        if digit and digit != previous:
+            code.append(digit)
+        if character not in 'hw':
+            previous = digit
+    return ''.join(code)[:4].ljust(4, '0')
+
+
+def bigram_vectors(names):
+    """
+    L2-normalised hashed bigram counts of `names`, one row per name.
+    """
+    vectors = np.zeros((len(names), BIGRAM_DIMENSIONS), dtype=np.float32)
+    for row, name in enumerate(names):
+        padded = f" {clean(name)} "
+        if len(padded) > 2:
+            for first, second in zip(padded, padded[1:]):
+                vectors[row, (ord(first) * 31 + ord(second)) % BIGRAM_DIMENSIONS] += 1
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def block_pairs(records):
+    """
+    Index pairs (i < j) of `records` that share a blocking key.
+    """
+    blocks = defaultdict(set)
+    for index, record in enumerate(records):
+        for name in (record[1], record[3]):
+            key = soundex(name)
+            if key:
+                blocks[key].add(index)
+
+    pairs = set()
+    for members in blocks.values():
+        members = sorted(members)
+        if len(members) > MAX_BLOCK_SIZE:
+            members.sort(key=lambda index: (clean(records[index][3]), clean(records[index][1])))
+            window = BLOCK_WINDOW
+        else:
+            window = len(members)
+        for position, i in enumerate(members):
+            for j in members[position + 1:position + window]:
+                pairs.add((min(i, j), max(i, j)))
+    return sorted(pairs)
+
+
+def score_pairs(records, pairs):
+    """
+    Similarity from 0 to 1 of every (i, j) pair of `records`, as an array.
+    """
+    if not pairs:
+        return np.zeros(0, dtype=np.float32)
+    left, right = np.array(pairs).T
+    first = bigram_vectors([record[1] for record in records])
+    middle = bigram_vectors([record[2] for record in records])
+    last = bigram_vectors([record[3] for record in records])
+    place = bigram_vectors([record[6] for record in records])
+    similarity = lambda a, b: np.einsum('ij,ij->i', a[left], b[right])
+
+    straight = (similarity(first, first) + similarity(last, last)) / 2
+    swapped = (similarity(first, last) + similarity(last, first)) / 2
+    names = np.maximum(straight, swapped)
+    has_middle = middle.any(axis=1)
+    both_middle = has_middle[left] & has_middle[right]
+    names = np.where(both_middle, (names * 2 + similarity(middle, middle)) / 3, names)
+
+    states = np.array([clean(record[5]) for record in records])
+    genders = np.array([record[4] for record in records])
+    score = (
+        NAME_WEIGHT * names
+        + STATE_WEIGHT * (states[left] == states[right])
+        + PLACE_WEIGHT * similarity(place, place)
+        - GENDER_PENALTY * (genders[left] != genders[right])
+    )
+    return np.clip(score, 0, 1)
+
+
+def score_days(days, threshold=DUPLICATE_THRESHOLD):
+    """
+    [(pk, pk, score), ...] of the likely duplicates among `days`, a list of
+    lists of records born on the same day. Runs in the worker processes.
+    """
+    found = []
+    for records in days:
+        pairs = block_pairs(records)
+        for (i, j), score in zip(pairs, score_pairs(records, pairs).tolist()):
+            if score >= threshold:
+                a, b = sorted((records[i][0], records[j][0]))
+                found.append((a, b, round(score, 4)))
+    return found
+
+
+def birth_days(students):
+    """
+    Lists of the records of `students` born on the same day, leaving out
+    days with a single birth.
+    """
+    rows = students.order_by('date_of_birth').values_list('date_of_birth', *RECORD_FIELDS)
+    for _, day in groupby(rows.iterator(chunk_size=READ_CHUNK_SIZE), key=lambda row: row[0]):
+        records = [row[1:] for row in day]
+        if len(records) > 1:
+            yield records
+
+
+def batches(days, size=BATCH_RECORDS):
+    batch, count = [], 0
+    for records in days:
+        batch.append(records)
+        count += len(records)
+        if count >= size:
+            yield batch
+            batch, count = [], 0
+    if batch:
+        yield batch
+
+
+def scored_batches(students, threshold, workers):
+    days = batches(birth_days(students))
+    if workers == 1:
+        for batch in days:
+            yield score_days(batch, threshold)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a few batches per worker in flight rather than reading every student first.
+        while True:
+            wave = list(islice(days, workers * 2))
+            if not wave:
+                return
+            yield from pool.map(score_days, wave, [threshold] * len(wave))
+
+
+def find_duplicates(students=None, threshold=DUPLICATE_THRESHOLD, workers=None):
+    """
+    Queue the likely duplicates among `students` (default: every student)
+    for review. Returns (pairs found, pairs newly queued).
+    """
+    students = Student.objects.all() if students is None else students
+    workers = workers or getattr(settings, 'DUPLICATE_WORKERS', None) or os.cpu_count()
+    before = DuplicateCandidate.objects.count()
+    found = 0
+    for pairs in scored_batches(students, threshold, workers):
+        found += len(pairs)
+        DuplicateCandidate.objects.bulk_create(
+            [DuplicateCandidate(student_id=a, other_id=b, score=score) for a, b, score in pairs],
+            batch_size=READ_CHUNK_SIZE,
+            ignore_conflicts=True,
+        )
+    return found, DuplicateCandidate.objects.count() - before
+
+
+def review(candidate, status, user=None):
+    """
+    Record the outcome of reviewing a DuplicateCandidate.
+    """
+    candidate.status = status
+    candidate.reviewed_by = user
+    candidate.reviewed_at = now()
+    candidate.save(update_fields=['status', 'reviewed_by', 'reviewed_at'])
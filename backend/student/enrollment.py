@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from backend.student.models import EnrollmentRecord, Student
+
+ENROLLMENT_BATCH_SIZE = 1000
+ENROLLMENT_UPDATE_FIELDS = (
+    'school', 'program', 'academic_session', 'program_level', 'stream',
+    'enrollment_mode', 'generate_admission_info', 'enrollment_date', 'is_active',
+)
+
+
+@dataclass
+class EnrollmentResult:
+    created: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+
+    @property
+    def records(self):
+        return self.created + self.updated
+
+
+class EnrollmentService:
+    """
+    Enrolls students into a class section of a school for the school's
+    current academic session.
+
+    A student has a single EnrollmentRecord (it is one-to-one), so students
+    already enrolled have their record moved to the new class and session;
+    the others get a new one. Everything happens in one transaction with a
+    fixed number of queries, however many students are enrolled.
+    """
+
+    def validate(self, school, level_class, stream):
+        if level_class.school_id != school.pk:
+            raise ValidationError(f"{level_class} is not a class of {school}.")
+        if stream is not None and stream.program_level_template_id != level_class.program_level_template_id:
+            raise ValidationError(f"The {stream} stream is not offered for {level_class.program_level_template}.")
+
+    def enroll_many(self, students, school, level_class, stream=None, enrollment_mode='1', generate_admission_info=True,
+                    is_active=True):
+        """
+        Enroll `students` into `level_class` and return an EnrollmentResult.
+        `stream` defaults to the class section's own stream.
+        """
+        if stream is None:
+            stream = level_class.stream
+        self.validate(school, level_class, stream)
+        academic_session = school.get_academic_session()
+        if academic_session is None:
+            raise ValidationError(f"{school} has no ongoing academic session.")
+
+        values = {
+            'school': school,
+            'program': level_class.program_level_template.program,
+            'academic_session': academic_session,
+            'program_level': level_class,
+            'stream': stream,
+            'enrollment_mode': enrollment_mode,
+            'generate_admission_info': generate_admission_info,
+            'is_active': is_active,
+        }
+        students = list({student.pk: student for student in students}.values())
+        result = EnrollmentResult()
+        if not students:
+            return result
+
+        with transaction.atomic():
+            existing = {
+                record.student_id: record
+                for record in EnrollmentRecord.objects.select_for_update().filter(student__in=students)
+            }
+            today = date.today()
+            for student in students:
+                record = existing.get(student.pk)
+                if record is None:
+                    result.created.append(EnrollmentRecord(student=student, **values))
+                    continue
+                if record.academic_session_id != academic_session.pk or record.school_id != school.pk:
+                    record.enrollment_date = today
+                for name, value in values.items():
+                    setattr(record, name, value)
+                result.updated.append(record)
+
+            EnrollmentRecord.objects.bulk_create(result.created, batch_size=ENROLLMENT_BATCH_SIZE)
+            EnrollmentRecord.objects.bulk_update(result.updated, ENROLLMENT_UPDATE_FIELDS, batch_size=ENROLLMENT_BATCH_SIZE)
+
+            moved = [student for student in students if student.school_id != school.pk]
+            for student in moved:
+                student.school = school
+            Student.objects.bulk_update(moved, ['school'], batch_size=ENROLLMENT_BATCH_SIZE)
+        return result
+
+
+def enroll_many(students, school, level_class, stream=None, **options):
+    return EnrollmentService().enroll_many(students, school, level_class, stream, **options)
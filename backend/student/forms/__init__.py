@@ -1,8 +1,10 @@
-from .student import StudentForm, GuardianForm
+from .student import StudentForm, GuardianForm, StudentImportForm
 from .academic_info import (
     SelectSchoolForm,
     SetProgramForm,
     SetProgramLevelStreamForm, 
     EnrollmentFinalForm,
-    EnrollmentRecordForm
+    EnrollmentRecordForm,
+    BulkEnrollmentForm,
+    AttendanceRegisterForm,
   )
\ No newline at end of file
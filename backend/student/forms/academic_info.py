@@ -81,7 +81,8 @@ class SetProgramLevelStreamForm(forms.Form):
                 choices.append((group_label, group_choices))
         return choices
 
-from backend.student.models import EnrollmentRecord
+from backend.student.models import EnrollmentRecord, Student
+from backend.student.reg_num import is_reg_num_shaped
 
 class EnrollmentFinalForm(forms.ModelForm):
     class Meta:
@@ -107,3 +108,84 @@ class EnrollmentRecordForm(forms.ModelForm):
             'enrollment_mode': forms.Select(attrs={'class': 'form-control'}),
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
+
+
+class BulkEnrollmentForm(forms.Form):
+    reg_nums = forms.CharField(
+        label="Registration numbers",
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 10}),
+        help_text="The registration numbers of the students to enroll, separated by spaces, commas or new lines."
+    )
+    stream = forms.ModelChoiceField(
+        queryset=Stream.objects.none(),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        help_text="Select the stream if applicable (defaults to the class section's stream)."
+    )
+    enrollment_mode = forms.ChoiceField(
+        choices=EnrollmentRecord._meta.get_field('enrollment_mode').choices,
+        initial='1',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    generate_admission_info = forms.BooleanField(
+        required=False,
+        initial=True,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        level_class = kwargs.pop('level_class')
+        super().__init__(*args, **kwargs)
+        self.fields['stream'].queryset = Stream.objects.filter(program_level_template=level_class.program_level_template_id)
+
+    def clean_reg_nums(self):
+        """
+        Resolve the registration numbers to students in one query. Only their
+        shape is checked first: older numbers carry no check digit.
+        """
+        reg_nums = list(dict.fromkeys(self.cleaned_data['reg_nums'].replace(',', ' ').split()))
+        invalid = [reg_num for reg_num in reg_nums if not is_reg_num_shaped(reg_num)]
+        if invalid:
+            raise forms.ValidationError(f"Invalid registration numbers: {', '.join(invalid)}.")
+        students = list(Student.objects.filter(reg_num__in=reg_nums))
+        unknown = set(reg_nums) - {student.reg_num for student in students}
+        if unknown:
+            raise forms.ValidationError(f"No students with registration numbers: {', '.join(sorted(unknown))}.")
+        return students
+
+
+class AttendanceRegisterForm(forms.Form):
+    date = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    absent = forms.ModelMultipleChoiceField(
+        queryset=Student.objects.none(),
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        help_text="Students who were absent. Everyone not ticked is marked present."
+    )
+    excused = forms.ModelMultipleChoiceField(
+        queryset=Student.objects.none(),
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        help_text="Students whose absence is excused."
+    )
+
+    def __init__(self, *args, **kwargs):
+        level_class = kwargs.pop('level_class')
+        super().__init__(*args, **kwargs)
+        students = Student.objects.filter(
+            enrollment_record__program_level=level_class, enrollment_record__is_active=True
+        ).order_by('last_name', 'first_name')
+        self.fields['absent'].queryset = students
+        self.fields['excused'].queryset = students
+
+    def clean(self):
+        cleaned_data = super().clean()
+        both = set(cleaned_data.get('absent') or ()) & set(cleaned_data.get('excused') or ())
+        if both:
+            raise forms.ValidationError("A student cannot be both absent and excused.")
+        return cleaned_data
+
+    def statuses(self):
+        statuses = {student.pk: 'Absent' for student in self.cleaned_data['absent']}
+        statuses.update({student.pk: 'Excused' for student in self.cleaned_data['excused']})
+        return statuses
@@ -2,7 +2,8 @@ from datetime import date
 
 from django import forms
 from django.forms import DateInput
-from django.core.validators import RegexValidator
+from django.core.validators import RegexValidator, FileExtensionValidator
+from backend.schools.models import School
 from backend.student.models import Student, Guardian
 
 class StudentForm(forms.ModelForm):
@@ -33,6 +34,23 @@ class StudentForm(forms.ModelForm):
         return dob
 
 
+class StudentImportForm(forms.Form):
+    file = forms.FileField(
+        validators=[FileExtensionValidator(['csv', 'xlsx'])],
+        help_text="A .csv or .xlsx file with one student per row and the student fields as column headers."
+    )
+    school = forms.ModelChoiceField(
+        queryset=School.objects.all(), required=False,
+        help_text="The school to register every imported student to (optional)."
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        for field_name, field in self.fields.items():
+            field.widget.attrs['class'] = 'form-control'
+
+
 class GuardianForm(forms.ModelForm):
     class Meta:
         model = Guardian
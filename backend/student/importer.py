@@ -0,0 +1,251 @@
+"""
+Bulk student import.
+
+Rows are read from a CSV or XLSX file as a stream and handled in chunks. Each
+row is checked with the Student model fields' own validators and the date of
+birth rule of Student.clean, duplicates of the unique_together key are caught
+in memory, and every valid chunk is inserted with one bulk_create. Rows that
+fail are written to an error report instead of stopping the import.
+"""
+import csv
+import io
+import os
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, transaction
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from backend.student.models import Student
+from backend.student.models.student import validate_date_of_birth
+from backend.student.reg_num import assign_reg_nums
+from backend.student.search import index_students
+
+IMPORT_CHUNK_SIZE = 2000
+# Three parameters per student, under SQLite's historical limit of 999.
+EXISTING_KEYS_BATCH_SIZE = 300
+IMPORT_FIELDS = (
+    'first_name', 'last_name', 'middle_name', 'nin_number', 'date_of_birth', 'gender',
+    'blood_group', 'genotype', 'disability_status', 'country_of_birth', 'state_of_origin',
+    'place_of_birth', 'address',
+)
+ERROR_REPORT_HEADER = ('row', 'field', 'error')
+DUPLICATE_KEY = Student._meta.unique_together[0]
+# Errors kept on the result for display; the report file gets all of them.
+MAX_REPORTED_ERRORS = 500
+
+
+def read_csv_rows(file):
+    """
+    Yield (row number, row dict) from a CSV file opened in binary or text mode.
+    The header is row 1.
+    """
+    if isinstance(file, io.TextIOBase):
+        text = file
+    else:
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    for row_number, row in enumerate(csv.DictReader(text), start=2):
+        yield row_number, row
+
+
+def read_xlsx_rows(file):
+    """
+    Yield (row number, row dict) from the first sheet of an XLSX workbook.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValidationError("Importing .xlsx files requires openpyxl.")
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        return read_csv_rows(file)
+    if extension == '.xlsx':
+        return read_xlsx_rows(file)
+    raise ValidationError(f"Unsupported file type {extension!r}; use .csv or .xlsx.")
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+
+class StudentImporter:
+    """
+    Imports students from (row number, row dict) pairs.
+
+    Every error is written as (row, field, error) to `error_report`, a text
+    stream, when one is given.
+    """
+
+    def __init__(self, school=None, chunk_size=IMPORT_CHUNK_SIZE, error_report=None):
+        self.school = school
+        self.chunk_size = chunk_size
+        self.error_writer = None
+        if error_report is not None:
+            self.error_writer = csv.writer(error_report)
+            self.error_writer.writerow(ERROR_REPORT_HEADER)
+        self.fields = [Student._meta.get_field(name) for name in IMPORT_FIELDS]
+        # Choice fields also accept their labels, in any case.
+        self.choices = {
+            model_field.name: {
+                str(option).lower(): value
+                for value, label in model_field.choices
+                for option in (value, label)
+            }
+            for model_field in self.fields if model_field.choices
+        }
+        self.columns_checked = False
+        self.result = ImportResult()
+
+    def run(self, rows):
+        chunk = []
+        for row_number, row in rows:
+            chunk.append((row_number, row))
+            if len(chunk) == self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.result
+
+    def reject(self, row_number, errors):
+        """
+        Record a row that will not be imported, with its (field, message) errors.
+        """
+        self.result.failed += 1
+        for field_name, message in errors:
+            if len(self.result.errors) < MAX_REPORTED_ERRORS:
+                self.result.errors.append((row_number, field_name, message))
+            if self.error_writer is not None:
+                self.error_writer.writerow((row_number, field_name, message))
+
+    def check_columns(self, row):
+        required = [model_field.name for model_field in self.fields if not model_field.blank]
+        missing = [name for name in required if name not in row]
+        if missing:
+            raise ValidationError(f"Missing columns: {', '.join(missing)}.")
+
+    def clean_row(self, row):
+        """
+        Return (values, errors) for one row, using the model fields' validators.
+        """
+        values, errors = {}, []
+        for model_field in self.fields:
+            name = model_field.name
+            value = row.get(name)
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == '':
+                value = None if model_field.null else ''
+            elif name in self.choices:
+                value = self.choices[name].get(str(value).lower(), value)
+            try:
+                values[name] = model_field.clean(value, None)
+            except ValidationError as error:
+                errors.append((name, ' '.join(error.messages)))
+        dob = values.get('date_of_birth')
+        if dob:
+            try:
+                validate_date_of_birth(dob)
+            except ValidationError as error:
+                errors.append(('date_of_birth', ' '.join(error.messages)))
+        return values, errors
+
+    def duplicate_key(self, values):
+        return tuple(
+            value.casefold() if isinstance(value, str) else value
+            for value in (values[name] for name in DUPLICATE_KEY)
+        )
+
+    def existing_keys(self, students):
+        """
+        The duplicate keys of the chunk that are already in the database.
+
+        Each (first_name, last_name, date_of_birth) term is a prefix of the
+        unique_together index, so every student costs one index seek; IN lists on
+        each column would make the database probe every combination of them.
+        The condition is written out directly because building thousands of Q
+        objects costs more than the query itself.
+        """
+        connection = connections[Student.objects.db]
+        columns = [Student._meta.get_field(name) for name in DUPLICATE_KEY[:3]]
+        term = '(%s)' % ' AND '.join(f'{connection.ops.quote_name(column.column)} = %s' for column in columns)
+        keys = set()
+        for start in range(0, len(students), EXISTING_KEYS_BATCH_SIZE):
+            batch = students[start:start + EXISTING_KEYS_BATCH_SIZE]
+            params = [
+                column.get_db_prep_value(getattr(student, column.attname), connection)
+                for student in batch for column in columns
+            ]
+            matches = RawSQL(' OR '.join([term] * len(batch)), params, output_field=BooleanField())
+            existing = Student.objects.filter(matches).values_list(*DUPLICATE_KEY)
+            keys.update(self.duplicate_key(dict(zip(DUPLICATE_KEY, key))) for key in existing)
+        return keys
+
+    def import_chunk(self, chunk):
+        if not self.columns_checked:
+            self.check_columns(chunk[0][1])
+            self.columns_checked = True
+
+        candidates, seen = [], {}
+        for row_number, row in chunk:
+            values, errors = self.clean_row(row)
+            if errors:
+                self.reject(row_number, errors)
+                continue
+            key = self.duplicate_key(values)
+            if key in seen:
+                self.reject(row_number, [('__all__', f"Duplicate of row {seen[key]} in this file.")])
+                continue
+            seen[key] = row_number
+            candidates.append((row_number, key, Student(school=self.school, **values)))
+        if not candidates:
+            return
+
+        existing = self.existing_keys([student for _, _, student in candidates])
+        new_students = []
+        for row_number, key, student in candidates:
+            if key in existing:
+                self.reject(row_number, [('__all__', "A student with these details already exists.")])
+            else:
+                new_students.append((row_number, student))
+        if not new_students:
+            return
+
+        assign_reg_nums([student for _, student in new_students])
+        try:
+            with transaction.atomic():
+                Student.objects.bulk_create([student for _, student in new_students])
+                index_students([student for _, student in new_students], created=True)
+            self.result.created += len(new_students)
+        except IntegrityError:
+            # Another import raced this chunk; insert row by row to find the conflicts.
+            for row_number, student in new_students:
+                try:
+                    with transaction.atomic():
+                        Student.objects.bulk_create([student])
+                        index_students([student], created=True)
+                    self.result.created += 1
+                except IntegrityError as error:
+                    self.reject(row_number, [('__all__', str(error))])
+
+
+def import_students(file, filename, school=None, chunk_size=IMPORT_CHUNK_SIZE, error_report=None):
+    importer = StudentImporter(school=school, chunk_size=chunk_size, error_report=error_report)
+    return importer.run(read_rows(file, filename))
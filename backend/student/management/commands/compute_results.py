@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.schools.grading import GradingEngine
+from backend.schools.models import LevelClasses, Term
+from backend.student.results import compute_term_results
+
+
+class Command(BaseCommand):
+    help = 'Compute and store the term results of every class section, or of one school or section.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('term', type=int, help='Primary key of the term.')
+        parser.add_argument('--school', help='Only the sections of this school (primary key).')
+        parser.add_argument('--level-class', type=int, help='Only this class section (primary key).')
+
+    def handle(self, *args, **options):
+        try:
+            term = Term.objects.select_related('academic_session').get(pk=options['term'])
+        except Term.DoesNotExist as error:
+            raise CommandError(error)
+
+        sections = LevelClasses.objects.select_related('school').order_by('school_id', 'pk')
+        if options['school']:
+            sections = sections.filter(school_id=options['school'])
+        if options['level_class']:
+            sections = sections.filter(pk=options['level_class'])
+
+        # Boundaries and configurations are loaded once for every section.
+        engine = GradingEngine()
+        sections_done = students = 0
+        for level_class in sections.iterator():
+            results = compute_term_results(level_class, term, engine=engine)
+            if results:
+                sections_done += 1
+                students += len(results)
+        self.stdout.write(self.style.SUCCESS(f"Results computed for {students} students in {sections_done} sections."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from backend.student.duplicates import DUPLICATE_THRESHOLD, find_duplicates
+
+
+class Command(BaseCommand):
+    help = 'Queue students that look like duplicates of each other for review.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD, help='Lowest similarity (0 to 1) to queue.')
+        parser.add_argument('--workers', type=int, help='Scoring processes (default: DUPLICATE_WORKERS, else one per CPU).')
+
+    def handle(self, *args, **options):
+        found, queued = find_duplicates(threshold=options['threshold'], workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(f"Found {found} likely duplicate pairs; {queued} newly queued for review."))
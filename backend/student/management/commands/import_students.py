@@ -0,0 +1,46 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.schools.models import School
+from backend.student.importer import IMPORT_CHUNK_SIZE, import_students
+
+
+class Command(BaseCommand):
+    help = 'Import students from a CSV or XLSX file, writing rejected rows to an error report.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The .csv or .xlsx file to import.')
+        parser.add_argument('--school', help='Primary key of the school to register the students to.')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Rows inserted per batch.')
+        parser.add_argument('--errors', help='Where to write the error report (default: <path>.errors.csv).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        school = None
+        if options['school']:
+            try:
+                school = School.objects.get(pk=options['school'])
+            except (School.DoesNotExist, ValidationError):
+                raise CommandError(f"School {options['school']} does not exist.")
+
+        errors_path = options['errors'] or f'{path}.errors.csv'
+        started = time.perf_counter()
+        try:
+            with open(path, 'rb') as file, open(errors_path, 'w', newline='', encoding='utf-8') as error_report:
+                result = import_students(
+                    file, path, school=school, chunk_size=options['chunk_size'], error_report=error_report,
+                )
+        except OSError as error:
+            raise CommandError(error)
+        except ValidationError as error:
+            raise CommandError(' '.join(error.messages))
+        elapsed = time.perf_counter() - started
+
+        rows = result.created + result.failed
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} of {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)."
+        ))
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f"{result.failed} rows rejected; see {errors_path}."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from backend.student.search import SEARCH_INDEX_BATCH_SIZE, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search tokens of every student.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SEARCH_INDEX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} students."))
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.schools.models import AcademicSession
+from backend.student.rollover import rollover_session
+
+OUTCOMES = ('promoted', 'repeating', 'graduated', 'withdrawn', 'transferred', 'unplaced')
+
+
+class Command(BaseCommand):
+    help = 'Move every student of an academic session into the next one, school by school.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('from_session', type=int, help='Primary key of the session being closed.')
+        parser.add_argument('to_session', type=int, help='Primary key of the new session.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would happen.')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint of a previous run.')
+        parser.add_argument('--complete-session', action='store_true', help='Mark the closed session completed afterwards.')
+
+    def handle(self, *args, **options):
+        try:
+            from_session = AcademicSession.objects.get(pk=options['from_session'])
+            to_session = AcademicSession.objects.get(pk=options['to_session'])
+        except AcademicSession.DoesNotExist as error:
+            raise CommandError(error)
+        if from_session == to_session:
+            raise CommandError("The sessions must differ.")
+
+        started = time.perf_counter()
+        schools = 0
+
+        def progress(school_id, counts):
+            nonlocal schools
+            schools += 1
+            if schools % 100 == 0:
+                self.stdout.write(f"{schools} schools processed...")
+
+        result = rollover_session(
+            from_session, to_session, dry_run=options['dry_run'], restart=options['restart'], progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+
+        prefix = "Dry run: " if options['dry_run'] else ""
+        self.stdout.write(f"{prefix}{result.schools} schools in {elapsed:.1f}s.")
+        for outcome in OUTCOMES:
+            self.stdout.write(f"  {outcome}: {result.counts[outcome]}")
+
+        if options['complete_session'] and not options['dry_run']:
+            from_session.complete_session()
+            self.stdout.write(self.style.SUCCESS(f"Academic session '{from_session.session_name}' completed."))
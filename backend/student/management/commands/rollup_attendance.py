@@ -0,0 +1,20 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from backend.student.attendance import ATTENDANCE_BATCH_SIZE, rollup_attendance, rollup_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Fold attendance rows older than ATTENDANCE_ROW_DAYS into the per-term attendance bitmaps.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before', type=date.fromisoformat, help='Fold rows dated before this day (YYYY-MM-DD) instead.'
+        )
+        parser.add_argument('--batch-size', type=int, default=ATTENDANCE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        before = options['before'] or rollup_cutoff()
+        count = rollup_attendance(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Folded {count} attendance rows dated before {before}."))
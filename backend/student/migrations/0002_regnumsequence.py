@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+def create_reg_num_sequence(apps, schema_editor):
+    RegNumSequence = apps.get_model("student", "RegNumSequence")
+    RegNumSequence.objects.get_or_create(
+        name="reg_num", defaults={"last_value": 10**9 - 1}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("student", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegNumSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                (
+                    "last_value",
+                    models.BigIntegerField(
+                        default=0, help_text="Last registration number body handed out."
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_reg_num_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:19
+
+import backend.student.models.student
+import django.core.validators
+from django.db import migrations
+
+
+def empty_photographs_to_null(apps, schema_editor):
+    Student = apps.get_model("student", "Student")
+    Student.objects.filter(passport_photograph="").update(passport_photograph=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("student", "0002_regnumsequence"),
+    ]
+
+    operations = [
+        # Before AlterField: the new field would turn the "" filter into "= NULL".
+        migrations.RunPython(empty_photographs_to_null, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="student",
+            name="passport_photograph",
+            field=backend.student.models.student.NullableImageField(
+                blank=True,
+                null=True,
+                unique=True,
+                upload_to="students/passport/%Y/%m/%d/",
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        ["jpg", "jpeg", "png"]
+                    ),
+                    backend.student.models.student.validate_image,
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0001_initial"),
+        ("student", "0003_passport_photograph_null"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RolloverCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("schools_processed", models.PositiveIntegerField(default=0)),
+                (
+                    "counts",
+                    models.JSONField(
+                        default=dict, help_text="Number of students per outcome."
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="enrollmentrecord",
+            index=models.Index(
+                fields=["school", "academic_session"],
+                name="student_enr_school__4fb901_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="rollovercheckpoint",
+            name="from_session",
+            field=models.ForeignKey(
+                help_text="The session students are moved out of.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rollovers_from",
+                to="schools.academicsession",
+            ),
+        ),
+        migrations.AddField(
+            model_name="rollovercheckpoint",
+            name="last_school",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The last school whose students were rolled over.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="schools.school",
+            ),
+        ),
+        migrations.AddField(
+            model_name="rollovercheckpoint",
+            name="to_session",
+            field=models.ForeignKey(
+                help_text="The session students are moved into.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rollovers_to",
+                to="schools.academicsession",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="rollovercheckpoint",
+            unique_together={("from_session", "to_session")},
+        ),
+    ]
@@ -0,0 +1,241 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0005_ledger"),
+        ("student", "0004_rollovercheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExamMetadata",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "exam_type",
+                    models.CharField(
+                        choices=[
+                            ("midterm", "Midterm Exam"),
+                            ("final", "Final Exam"),
+                            ("continuous_assessment", "Continuous Assessment"),
+                            ("mock", "Mock Exam"),
+                            ("external", "External Exam"),
+                        ],
+                        help_text="Type of the exam (e.g., Midterm, Final).",
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "exam_date",
+                    models.DateField(help_text="The date the exam is conducted."),
+                ),
+                (
+                    "max_score",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=100.0,
+                        help_text="The maximum achievable score for the exam.",
+                        max_digits=5,
+                    ),
+                ),
+                (
+                    "description",
+                    models.TextField(
+                        blank=True,
+                        help_text="Additional details or remarks about the exam.",
+                    ),
+                ),
+                (
+                    "academic_session",
+                    models.ForeignKey(
+                        help_text="The academic session this exam is part of.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exams",
+                        to="schools.academicsession",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        help_text="The subject this exam is for.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exams",
+                        to="schools.subjectrepository",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="The term this exam counts towards; empty for session-wide exams.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exams",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["exam_date"],
+                "unique_together": {
+                    ("exam_type", "academic_session", "term", "subject")
+                },
+            },
+        ),
+        migrations.CreateModel(
+            name="ExaminationRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "score",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Score achieved in the exam.",
+                        max_digits=5,
+                    ),
+                ),
+                (
+                    "grade",
+                    models.CharField(
+                        blank=True,
+                        help_text="Grade achieved in the examination.",
+                        max_length=2,
+                    ),
+                ),
+                (
+                    "teacher_remarks",
+                    models.TextField(
+                        blank=True, help_text="Additional comments about the exam."
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        help_text="The student this examination record is associated with.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="examination_records",
+                        to="student.student",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        help_text="The subject this examination is for.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="examination_records",
+                        to="schools.subjectrepository",
+                    ),
+                ),
+                (
+                    "exam",
+                    models.ForeignKey(
+                        help_text="The exam or continuous assessment this score is for.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="records",
+                        to="student.exammetadata",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("student", "exam")},
+            },
+        ),
+        migrations.CreateModel(
+            name="TermResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subjects", models.JSONField(default=list)),
+                (
+                    "total_score",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Sum of the subject totals.",
+                        max_digits=8,
+                    ),
+                ),
+                (
+                    "average",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Weighted average percentage.",
+                        max_digits=5,
+                    ),
+                ),
+                ("grade", models.CharField(blank=True, max_length=2)),
+                (
+                    "position",
+                    models.PositiveIntegerField(
+                        help_text="Position in the class section; tied students share it."
+                    ),
+                ),
+                ("class_size", models.PositiveIntegerField()),
+                (
+                    "cumulative_average",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Average of the session's term averages up to this term.",
+                        max_digits=5,
+                    ),
+                ),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "level_class",
+                    models.ForeignKey(
+                        help_text="The class section the results were computed for.",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="term_results",
+                        to="schools.levelclasses",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="term_results",
+                        to="student.student",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="student_results",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("student", "term")},
+            },
+        ),
+    ]
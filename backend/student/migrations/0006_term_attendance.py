@@ -0,0 +1,187 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def archive_duplicate_marks(apps, schema_editor):
+    """
+    Keep only the latest mark of a student per day before making them unique;
+    the others are moved to ArchivedAttendance.
+    """
+    Attendance = apps.get_model("student", "Attendance")
+    ArchivedAttendance = apps.get_model("student", "ArchivedAttendance")
+    duplicates = (
+        Attendance.objects.values("student_id", "date")
+        .annotate(latest=Max("pk"), marks=Count("pk"))
+        .filter(marks__gt=1)
+        .order_by()
+    )
+    for row in list(duplicates):
+        older = Attendance.objects.filter(
+            student_id=row["student_id"], date=row["date"]
+        ).exclude(pk=row["latest"])
+        ArchivedAttendance.objects.bulk_create(
+            ArchivedAttendance(
+                attendance_id=mark.pk,
+                student_id=mark.student_id,
+                term_id=mark.term_id,
+                date=mark.date,
+                status=mark.status,
+            )
+            for mark in older
+        )
+        older.delete()
+
+
+def restore_duplicate_marks(apps, schema_editor):
+    """
+    Put the archived marks back in Attendance under their original ids.
+    """
+    Attendance = apps.get_model("student", "Attendance")
+    ArchivedAttendance = apps.get_model("student", "ArchivedAttendance")
+    Attendance.objects.bulk_create(
+        (
+            Attendance(
+                pk=mark.attendance_id,
+                student_id=mark.student_id,
+                term_id=mark.term_id,
+                date=mark.date,
+                status=mark.status,
+            )
+            for mark in ArchivedAttendance.objects.order_by("pk").iterator()
+        ),
+        batch_size=1000,
+    )
+    ArchivedAttendance.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0005_ledger"),
+        ("student", "0005_exams_and_term_results"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TermAttendance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("marks", models.BinaryField(default=bytes)),
+                ("days_present", models.PositiveSmallIntegerField(default=0)),
+                ("days_absent", models.PositiveSmallIntegerField(default=0)),
+                ("days_excused", models.PositiveSmallIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "term attendance",
+            },
+        ),
+        migrations.AddField(
+            model_name="attendance",
+            name="term",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The term the date falls in.",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="attendance_records",
+                to="schools.term",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ArchivedAttendance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "attendance_id",
+                    models.BigIntegerField(
+                        help_text="The id the mark had in Attendance."
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("Present", "Present"),
+                            ("Absent", "Absent"),
+                            ("Excused", "Excused"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_attendance",
+                        to="student.student",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_attendance",
+                        to="schools.term",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "archived attendance",
+            },
+        ),
+        migrations.RunPython(archive_duplicate_marks, restore_duplicate_marks),
+        migrations.AlterUniqueTogether(
+            name="attendance",
+            unique_together={("student", "date")},
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(fields=["date"], name="student_att_date_1ee40f_idx"),
+        ),
+        migrations.AddField(
+            model_name="termattendance",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="term_attendance",
+                to="student.student",
+            ),
+        ),
+        migrations.AddField(
+            model_name="termattendance",
+            name="term",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="student_attendance",
+                to="schools.term",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="termattendance",
+            unique_together={("student", "term")},
+        ),
+    ]
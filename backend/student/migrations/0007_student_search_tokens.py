@@ -0,0 +1,121 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:02
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A copy of the tokenizer in backend.student.search as it was when this
+# migration was written, so later changes to it do not change this migration.
+SEARCH_INDEX_BATCH_SIZE = 1000
+MAX_TOKEN_LENGTH = 32
+MIN_VARIANT_LENGTH = 4
+NAME, VARIANT, REG_NUM, NIN = "name", "variant", "reg_num", "nin"
+
+
+def normalize(text):
+    text = (
+        unicodedata.normalize("NFKD", text or "")
+        .encode("ascii", "ignore")
+        .decode()
+        .lower()
+    )
+    return [token[:MAX_TOKEN_LENGTH] for token in re.findall(r"[a-z0-9]+", text)]
+
+
+def deletions(token):
+    return {token[:i] + token[i + 1 :] for i in range(len(token))}
+
+
+def student_tokens(student):
+    tokens = set()
+    names = normalize(f"{student.first_name} {student.middle_name} {student.last_name}")
+    for token in set(names):
+        tokens.add((NAME, token))
+        if len(token) >= MIN_VARIANT_LENGTH:
+            tokens.update((VARIANT, variant) for variant in deletions(token))
+    if student.reg_num:
+        tokens.add((REG_NUM, student.reg_num))
+    if student.nin_number:
+        tokens.add((NIN, student.nin_number))
+    return tokens
+
+
+def index_existing_students(apps, schema_editor):
+    Student = apps.get_model("student", "Student")
+    StudentSearchToken = apps.get_model("student", "StudentSearchToken")
+    tokens = []
+    for student in Student.objects.order_by().iterator(
+        chunk_size=SEARCH_INDEX_BATCH_SIZE
+    ):
+        tokens.extend(
+            StudentSearchToken(student_id=student.pk, field=field, token=token)
+            for field, token in sorted(student_tokens(student))
+        )
+        if len(tokens) >= SEARCH_INDEX_BATCH_SIZE:
+            StudentSearchToken.objects.bulk_create(tokens)
+            tokens = []
+    StudentSearchToken.objects.bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0006_calendarevent_closes_school"),
+        ("student", "0006_term_attendance"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudentSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[
+                            ("name", "Name"),
+                            ("variant", "Name variant"),
+                            ("reg_num", "Registration number"),
+                            ("nin", "NIN"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                ("token", models.CharField(max_length=32)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                fields=["last_name", "first_name", "id"],
+                name="student_stu_last_na_a752aa_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentsearchtoken",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="search_tokens",
+                to="student.student",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentsearchtoken",
+            index=models.Index(
+                fields=["field", "token", "student"],
+                name="student_stu_field_ee716e_idx",
+            ),
+        ),
+        migrations.RunPython(index_existing_students, migrations.RunPython.noop),
+    ]
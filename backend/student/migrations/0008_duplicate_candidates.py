@@ -0,0 +1,96 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0006_calendarevent_closes_school"),
+        ("student", "0007_student_search_tokens"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "score",
+                    models.FloatField(
+                        help_text="Similarity of the two records, from 0 to 1."
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("Pending", "Pending review"),
+                            ("Duplicate", "Same student"),
+                            ("Distinct", "Different students"),
+                        ],
+                        default="Pending",
+                        max_length=10,
+                    ),
+                ),
+                ("reviewed_at", models.DateTimeField(blank=True, null=True)),
+                ("found_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                fields=["date_of_birth"], name="student_stu_date_of_27b196_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="other",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="student.student",
+            ),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="reviewed_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="student",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="duplicate_candidates",
+                to="student.student",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="duplicatecandidate",
+            index=models.Index(
+                fields=["status", "-score"], name="student_dup_status_c67459_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="duplicatecandidate",
+            unique_together={("student", "other")},
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0007_school_updated_at_index"),
+        ("student", "0008_duplicate_candidates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                fields=["updated_at", "id"], name="student_stu_updated_724efc_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,10 @@
 from .student import Student
 from .guardian import Guardian
 from .academic_info import AcademicInfo, EnrollmentRecord
-from .attendance import Attendance
\ No newline at end of file
+from .attendance import ArchivedAttendance, Attendance, TermAttendance
+from .reg_num import RegNumSequence
+from .rollover import RolloverCheckpoint
+from .exam import ExamMetadata, ExaminationRecord
+from .result import TermResult
+from .search import StudentSearchToken
+from .duplicate import DuplicateCandidate
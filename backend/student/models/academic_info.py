@@ -117,6 +117,9 @@ class EnrollmentRecord(models.Model):
     
     class Meta:
         unique_together = ('student', 'academic_session')
+        indexes = [
+            models.Index(fields=['school', 'academic_session']),
+        ]
 
     def __str__(self):
         return f"Enrollment: {self.student.full_name} ({self.enrollment_mode})"
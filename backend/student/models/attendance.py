@@ -2,9 +2,15 @@ from django.db import models
 
 from .student import Student
 
+ATTENDANCE_STATUSES = [('Present', 'Present'), ('Absent', 'Absent'), ('Excused', 'Excused')]
+
+
 class Attendance(models.Model):
     """
     Tracks attendance for each student by subject and date.
+
+    This is the row store for recent days: `rollup_attendance` (see
+    backend.student.attendance) folds older rows into TermAttendance.
     """
     student = models.ForeignKey(
         Student,
@@ -12,14 +18,73 @@ class Attendance(models.Model):
         related_name="attendance_records",
         help_text="The student this attendance record is associated with."
     )
+    term = models.ForeignKey(
+        'schools.Term',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_records',
+        help_text="The term the date falls in."
+    )
     date = models.DateField(help_text="Date of attendance.")
     status = models.CharField(
         max_length=20,
-        choices=[('Present', 'Present'), ('Absent', 'Absent'), ('Excused', 'Excused')],
+        choices=ATTENDANCE_STATUSES,
         default='Present',
         help_text="Attendance status for the student."
     )
 
+    class Meta:
+        unique_together = ('student', 'date')
+        indexes = [models.Index(fields=['date'])]
+
+    def __str__(self):
+        return f"Attendance: {self.student.full_name} ({self.date}) - {self.status}"
+
+
+class ArchivedAttendance(models.Model):
+    """
+    Attendance marks set aside when marks became unique per student and day.
+
+    Migration 0006 keeps the latest mark of each day in Attendance and moves
+    the others here, with their original id, so no history is lost and the
+    migration can be reversed.
+    """
+    attendance_id = models.BigIntegerField(help_text="The id the mark had in Attendance.")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='archived_attendance')
+    term = models.ForeignKey(
+        'schools.Term', on_delete=models.CASCADE, null=True, blank=True, related_name='archived_attendance',
+    )
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=ATTENDANCE_STATUSES)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'archived attendance'
+
     def __str__(self):
-        return f"Attendance: {self.student.get_full_name()} ({self.date}) - {self.status}"
+        return f"Archived attendance: {self.student_id} ({self.date}) - {self.status}"
+
 
+class TermAttendance(models.Model):
+    """
+    A student's attendance for a whole term in one row.
+
+    `marks` holds one byte per calendar day from the term's start date: 0 for
+    no mark, else the 1-based index of the status in ATTENDANCE_STATUSES. The
+    counts are kept alongside so attendance rates are plain column sums.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='term_attendance')
+    term = models.ForeignKey('schools.Term', on_delete=models.CASCADE, related_name='student_attendance')
+    marks = models.BinaryField(default=bytes)
+    days_present = models.PositiveSmallIntegerField(default=0)
+    days_absent = models.PositiveSmallIntegerField(default=0)
+    days_excused = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'term')
+        verbose_name_plural = 'term attendance'
+
+    def __str__(self):
+        return f"Attendance of {self.student_id} for term {self.term_id}"
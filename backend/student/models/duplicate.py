@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import models
+
+from .student import Student
+
+
+class DuplicateCandidate(models.Model):
+    """
+    A pair of students that may be the same person, found by
+    `manage.py find_duplicate_students` (see backend.student.duplicates) and
+    waiting for someone to review it. `student` always has the lower primary
+    key, so a pair is stored once.
+    """
+    PENDING = 'Pending'
+    DUPLICATE = 'Duplicate'
+    DISTINCT = 'Distinct'
+    STATUS_CHOICES = [(PENDING, 'Pending review'), (DUPLICATE, 'Same student'), (DISTINCT, 'Different students')]
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='duplicate_candidates')
+    other = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Similarity of the two records, from 0 to 1.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    found_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('student', 'other')
+        indexes = [models.Index(fields=['status', '-score'])]
+
+    def __str__(self):
+        return f"{self.student_id} / {self.other_id} ({self.score:.2f}, {self.status})"
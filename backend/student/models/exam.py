@@ -1,6 +1,6 @@
 from django.db import models
-from backend.schools.models import AcademicSession, SubjectRepository
-from students.models import Student
+from backend.schools.models import AcademicSession, SubjectRepository, Term
+from .student import Student
 
 class ExamMetadata(models.Model):
     """
@@ -25,6 +25,14 @@ class ExamMetadata(models.Model):
         related_name="exams",
         help_text="The academic session this exam is part of."
     )
+    term = models.ForeignKey(
+        Term,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="exams",
+        help_text="The term this exam counts towards; empty for session-wide exams."
+    )
     exam_date = models.DateField(help_text="The date the exam is conducted.")
     subject = models.ForeignKey(
         SubjectRepository,
@@ -44,7 +52,7 @@ class ExamMetadata(models.Model):
     )
 
     class Meta:
-        unique_together = ('exam_type', 'academic_session', 'subject')
+        unique_together = ('exam_type', 'academic_session', 'term', 'subject')
         ordering = ['exam_date']
 
     def __str__(self):
@@ -62,6 +70,12 @@ class ExaminationRecord(models.Model):
         related_name="examination_records",
         help_text="The student this examination record is associated with."
     )
+    exam = models.ForeignKey(
+        ExamMetadata,
+        on_delete=models.CASCADE,
+        related_name="records",
+        help_text="The exam or continuous assessment this score is for."
+    )
     subject = models.ForeignKey(
         'schools.SubjectRepository',
         on_delete=models.CASCADE,
@@ -71,9 +85,12 @@ class ExaminationRecord(models.Model):
     
     # include CONTINUOUS ASSESSMENT SCORE
     score = models.DecimalField(max_digits=5, decimal_places=2, help_text="Score achieved in the exam.")
-    grade = models.CharField(max_length=2, help_text="Grade achieved in the examination.")
+    grade = models.CharField(max_length=2, blank=True, help_text="Grade achieved in the examination.")
     teacher_remarks = models.TextField(blank=True, help_text="Additional comments about the exam.")
 
+    class Meta:
+        unique_together = ('student', 'exam')
+
     def __str__(self):
         return f"Exam: {self.student.full_name} ({self.subject.subject_name})"
 
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class RegNumSequence(models.Model):
+    """
+    Counter behind student registration numbers. Blocks of numbers are reserved
+    by advancing `last_value` under a row lock (see backend.student.reg_num).
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_value = models.BigIntegerField(default=0, help_text="Last registration number body handed out.")
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
@@ -0,0 +1,47 @@
+from django.db import models
+
+from .student import Student
+
+
+class TermResult(models.Model):
+    """
+    A student's computed results for a term (see backend.student.results).
+
+    `subjects` holds one compact row per subject:
+    [subject id, CA score, exam score, total, percentage, grade, subject position,
+    class average].
+    Report cards and flows read this table instead of recomputing results.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='term_results')
+    term = models.ForeignKey('schools.Term', on_delete=models.CASCADE, related_name='student_results')
+    level_class = models.ForeignKey(
+        'schools.LevelClasses',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='term_results',
+        help_text="The class section the results were computed for."
+    )
+    subjects = models.JSONField(default=list)
+    total_score = models.DecimalField(max_digits=8, decimal_places=2, help_text="Sum of the subject totals.")
+    average = models.DecimalField(max_digits=5, decimal_places=2, help_text="Weighted average percentage.")
+    grade = models.CharField(max_length=2, blank=True)
+    position = models.PositiveIntegerField(help_text="Position in the class section; tied students share it.")
+    class_size = models.PositiveIntegerField()
+    cumulative_average = models.DecimalField(
+        max_digits=5, decimal_places=2, help_text="Average of the session's term averages up to this term."
+    )
+    computed_at = models.DateTimeField(auto_now=True)
+
+    SUBJECT_FIELDS = ('subject', 'ca_score', 'exam_score', 'total', 'percentage', 'grade', 'position', 'class_average')
+
+    class Meta:
+        unique_together = ('student', 'term')
+
+    def __str__(self):
+        return f"{self.student} - {self.term}: {self.average}%"
+
+    def subject_rows(self):
+        """
+        The subject rows as dicts, for templates.
+        """
+        return [dict(zip(self.SUBJECT_FIELDS, row)) for row in self.subjects]
@@ -0,0 +1,40 @@
+from django.db import models
+
+
+class RolloverCheckpoint(models.Model):
+    """
+    Progress of moving students from one academic session to the next
+    (see backend.student.rollover). Schools are processed in primary key
+    order, so a stopped rollover resumes after `last_school`.
+    """
+    from_session = models.ForeignKey(
+        'schools.AcademicSession',
+        on_delete=models.CASCADE,
+        related_name="rollovers_from",
+        help_text="The session students are moved out of."
+    )
+    to_session = models.ForeignKey(
+        'schools.AcademicSession',
+        on_delete=models.CASCADE,
+        related_name="rollovers_to",
+        help_text="The session students are moved into."
+    )
+    last_school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="The last school whose students were rolled over."
+    )
+    schools_processed = models.PositiveIntegerField(default=0)
+    counts = models.JSONField(default=dict, help_text="Number of students per outcome.")
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('from_session', 'to_session')
+
+    def __str__(self):
+        return f"Rollover {self.from_session} -> {self.to_session} ({self.schools_processed} schools)"
@@ -0,0 +1,39 @@
+from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .student import Student
+
+
+class StudentSearchToken(models.Model):
+    """
+    One searchable token of a student: a normalized name token, a one-letter
+    deletion variant of one (for typo-tolerant matching), the registration
+    number or the NIN. Maintained by backend.student.search; never edited by hand.
+    """
+    NAME = 'name'
+    VARIANT = 'variant'
+    REG_NUM = 'reg_num'
+    NIN = 'nin'
+    FIELD_CHOICES = [(NAME, 'Name'), (VARIANT, 'Name variant'), (REG_NUM, 'Registration number'), (NIN, 'NIN')]
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='search_tokens')
+    field = models.CharField(max_length=8, choices=FIELD_CHOICES)
+    token = models.CharField(max_length=32)
+
+    class Meta:
+        indexes = [models.Index(fields=['field', 'token', 'student'])]
+
+    def __str__(self):
+        return f"{self.field}: {self.token}"
+
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal description: Rebuilds the search tokens of a student whenever the student is saved.
+    """
+    if raw:
+        return
+    from backend.student.search import index_students
+    index_students([instance], created=created)
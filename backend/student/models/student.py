@@ -20,6 +20,15 @@ def alphabet_space_hyphen_validator(value):
     if not re.match(r'^[a-zA-Z\s-]+$', value):
         raise ValidationError('This field can only contain alphabets, spaces, and hyphens.')
 
+def validate_date_of_birth(dob):
+    """
+    Raises a ValidationError if the date of birth is less than 4 years before today's date.
+    """
+    today = date.today()
+    min_allowed_dob = today.replace(year=today.year - 4)
+    if dob > min_allowed_dob:
+        raise ValidationError("Student must be at least 4 years old.")
+
 def validate_image(image):
     # Check file size
     max_size = 1 * 1024 * 1024  # 1 MB
@@ -27,6 +36,14 @@ def validate_image(image):
         raise ValidationError(f"Image file too large ( > {max_size} bytes )")
     return image
 
+class NullableImageField(models.ImageField):
+    """
+    An ImageField that stores NULL instead of an empty path, so `unique`
+    only applies to students who actually have a file.
+    """
+    def get_prep_value(self, value):
+        return super().get_prep_value(value) or None
+
 class Student(models.Model):
     GENDER_CHOICES = [
         ('M', 'Male'),
@@ -109,7 +126,7 @@ class Student(models.Model):
     )
     address = models.TextField(blank=True, null=True, help_text="Home address of the student.")
 
-    passport_photograph = models.ImageField(
+    passport_photograph = NullableImageField(
         upload_to='students/passport/%Y/%m/%d/',
         unique=True,
         blank=True,
@@ -139,6 +156,11 @@ class Student(models.Model):
         verbose_name_plural = 'Students'
         ordering = ['last_name', 'first_name']
         unique_together = (('first_name', 'last_name', 'date_of_birth', 'state_of_origin', 'place_of_birth'),)
+        indexes = [
+            models.Index(fields=['last_name', 'first_name', 'id']),
+            models.Index(fields=['date_of_birth']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -157,10 +179,8 @@ class Student(models.Model):
         return age
 
     def generate_unique_reg_num(self):
-        while True:
-            reg_num = str(uuid.uuid4().int)[:11]  # Get first 11 characters of UUID
-            if not Student.objects.filter(reg_num=reg_num).exists():
-                return reg_num
+        from backend.student.reg_num import allocate_reg_nums
+        return allocate_reg_nums(1)[0]
 
     def clean(self):
         """
@@ -173,10 +193,7 @@ class Student(models.Model):
         if not dob:
             return  # No need to validate if dob is not provided
 
-        today = date.today()
-        min_allowed_dob = today.replace(year=today.year - 4)
-        if dob > min_allowed_dob:
-            raise ValidationError("Student must be at least 4 years old.")
+        validate_date_of_birth(dob)
 
     def save(self, *args, **kwargs):
         # Check if a new passport_photograph file is uploaded and update its name
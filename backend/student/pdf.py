@@ -0,0 +1,81 @@
+"""
+HTML to PDF conversion with WeasyPrint.
+
+This module runs inside the rendering worker processes, so it imports no
+models: workers only receive rendered HTML and the local directories that
+static and media URLs resolve to. Remote resources (such as the CDN
+stylesheet of print_base.html) are skipped rather than fetched once per page.
+"""
+import io
+import mimetypes
+import os
+from urllib.parse import unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BASE_URL = 'http://samses.local/'
+
+# (URL prefix, [directories]) pairs, set in each worker by init_worker.
+url_roots = []
+
+
+def engine():
+    try:
+        import weasyprint
+    except ImportError:
+        raise ImproperlyConfigured("Rendering PDFs requires WeasyPrint (pip install weasyprint).")
+    except OSError as error:
+        # WeasyPrint is installed but its system libraries (Pango) are not.
+        raise ImproperlyConfigured(f"WeasyPrint cannot load its system libraries: {error}")
+    return weasyprint
+
+
+def init_worker(roots):
+    url_roots[:] = roots
+
+
+def local_path(url):
+    parts = urlsplit(url)
+    if f'{parts.scheme}://{parts.netloc}/' != BASE_URL:
+        return None
+    path = unquote(parts.path)
+    for prefix, directories in url_roots:
+        if path.startswith(prefix):
+            for directory in directories:
+                candidate = os.path.join(directory, path[len(prefix):])
+                if os.path.isfile(candidate):
+                    return candidate
+    return None
+
+
+def fetch_local(url):
+    path = local_path(url)
+    if path is None:
+        raise ValueError(f"Not fetching {url} while rendering PDFs.")
+    with open(path, 'rb') as file:
+        return {'string': file.read(), 'mime_type': mimetypes.guess_type(path)[0]}
+
+
+def html_to_pdf(html):
+    """
+    The PDF bytes of one rendered HTML document.
+    """
+    return engine().HTML(string=html, base_url=BASE_URL, url_fetcher=fetch_local).write_pdf()
+
+
+def merger():
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise ImproperlyConfigured("Merging PDFs requires pypdf (pip install pypdf).")
+    return PdfWriter
+
+
+def merge_pdfs(documents, output):
+    """
+    Write PDF byte strings into the seekable `output` as one document, in order.
+    """
+    writer = merger()()
+    for document in documents:
+        writer.append(io.BytesIO(document))
+    writer.write(output)
@@ -0,0 +1,162 @@
+"""
+Batch printing of admission letters and report cards.
+
+A batch reads everything its documents need in a fixed number of queries,
+renders the templates in this process (cheap) and converts the HTML to PDF
+(expensive) here or, with PDF_RENDER_WORKERS above 1, in a pool of worker
+processes. Finished documents are
+streamed back in order, either as a ZIP of one PDF per student or as a single
+merged PDF.
+"""
+import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from backend.schools.models import SubjectRepository
+from backend.student import pdf
+from backend.student.models import EnrollmentRecord, TermResult
+
+PDF_CHUNK_SIZE = 8
+BATCH_FORMATS = ('zip', 'pdf')
+
+
+def admission_letter_context(enrollment):
+    return {'enrollment': enrollment, 'school': enrollment.school, 'student': enrollment.student}
+
+
+def report_card_context(result, subject_names):
+    """
+    `subject_names` maps the result's subject ids to SubjectRepository rows.
+    """
+    subjects = result.subject_rows()
+    for row in subjects:
+        row['subject'] = subject_names.get(row['subject'])
+    return {
+        'result': result, 'student': result.student, 'subjects': subjects,
+        'school': result.level_class.school if result.level_class else result.student.school,
+    }
+
+
+def document_name(student, kind):
+    return f"{(student.reg_num or str(student.pk)).replace('/', '-')}-{kind}.pdf"
+
+
+def admission_letters(school, academic_session, level_class=None):
+    """
+    (filename, html) of the admission letter of every active enrollment, in one query.
+    """
+    enrollments = EnrollmentRecord.objects.filter(
+        school=school, academic_session=academic_session, is_active=True,
+    ).select_related(
+        'student', 'school', 'academic_session', 'program_level__program_level_template',
+    ).order_by('program_level_id', 'student__last_name', 'student__first_name')
+    if level_class is not None:
+        enrollments = enrollments.filter(program_level=level_class)
+    return [
+        (
+            document_name(enrollment.student, 'admission-letter'),
+            render_to_string('student/printable/admission_letter.html', admission_letter_context(enrollment)),
+        )
+        for enrollment in enrollments
+    ]
+
+
+def report_cards(school, term, level_class=None):
+    """
+    (filename, html) of the report card of every stored result, in two queries.
+    """
+    results = TermResult.objects.filter(term=term, level_class__school=school).select_related(
+        'student', 'term__academic_session', 'level_class__school', 'level_class__program_level_template',
+    ).order_by('level_class_id', 'position', 'student__last_name')
+    if level_class is not None:
+        results = results.filter(level_class=level_class)
+    results = list(results)
+    subject_names = SubjectRepository.objects.in_bulk(
+        {row[0] for result in results for row in result.subjects}
+    )
+    return [
+        (
+            document_name(result.student, 'report-card'),
+            render_to_string('student/printable/report_card.html', report_card_context(result, subject_names)),
+        )
+        for result in results
+    ]
+
+
+def url_roots():
+    static_dirs = [str(path) for path in settings.STATICFILES_DIRS]
+    if getattr(settings, 'STATIC_ROOT', None):
+        static_dirs.insert(0, str(settings.STATIC_ROOT))
+    return [(settings.MEDIA_URL, [str(settings.MEDIA_ROOT)]), (settings.STATIC_URL, static_dirs)]
+
+
+def render_pdfs(documents, workers=None):
+    """
+    Yield (filename, PDF bytes) for `documents`, in order, converting them in
+    `workers` processes (default PDF_RENDER_WORKERS, else 1: in this process).
+    """
+    workers = workers or getattr(settings, 'PDF_RENDER_WORKERS', None) or 1
+    names = [name for name, _ in documents]
+    htmls = [html for _, html in documents]
+    if workers == 1:
+        pdf.init_worker(url_roots())
+        yield from zip(names, map(pdf.html_to_pdf, htmls))
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=pdf.init_worker, initargs=(url_roots(),)) as pool:
+        yield from zip(names, pool.map(pdf.html_to_pdf, htmls, chunksize=PDF_CHUNK_SIZE))
+
+
+class StreamBuffer:
+    """
+    A write-only file that hands its contents over on `drain`, so a ZIP can
+    be streamed while it is written.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(rendered):
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, document in rendered:
+            archive.writestr(name, document)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def stream_merged(rendered):
+    output = io.BytesIO()
+    pdf.merge_pdfs((document for _, document in rendered), output)
+    yield output.getvalue()
+
+
+def stream_batch(documents, output_format='zip', workers=None):
+    """
+    Byte chunks of the rendered `documents` as a ZIP or one merged PDF.
+
+    The PDF engine (and pypdf for merging) is checked before anything is
+    rendered, so a missing dependency fails before the response starts.
+    """
+    if output_format not in BATCH_FORMATS:
+        raise ValueError(f"Unknown batch format {output_format!r}; use one of {BATCH_FORMATS}.")
+    pdf.engine()
+    if output_format == 'pdf':
+        pdf.merger()
+    rendered = render_pdfs(documents, workers)
+    return stream_zip(rendered) if output_format == 'zip' else stream_merged(rendered)
@@ -0,0 +1,93 @@
+"""
+Student registration numbers.
+
+A registration number is an 11 digit string: a 10 digit body taken from
+RegNumSequence followed by its Luhn check digit. Numbers are handed out in
+blocks, so registering any number of students costs one reservation.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from backend.student.algorithms import is_luhn_valid, luhn_check_digits
+
+REG_NUM_LENGTH = 11
+REG_NUM_BODY_LENGTH = REG_NUM_LENGTH - 1
+REG_NUM_SEQUENCE = 'reg_num'
+# Bodies start at 10 digits so every number has the same width.
+REG_NUM_FIRST_BODY = 10 ** (REG_NUM_BODY_LENGTH - 1)
+REG_NUM_LOOKUP_BATCH_SIZE = 5000
+
+
+def is_reg_num_shaped(value):
+    """
+    Whether `value` has the shape of a registration number: 11 ASCII digits.
+
+    Numbers issued before the sequence existed were random and carry no check
+    digit, so code looking up existing students checks the shape only.
+    """
+    return isinstance(value, str) and len(value) == REG_NUM_LENGTH and value.isascii() and value.isdigit()
+
+
+def is_valid_reg_num(value):
+    """
+    Whether `value` has the shape and check digit of a newly issued registration number. No queries.
+    """
+    return is_reg_num_shaped(value) and is_luhn_valid(value)
+
+
+def validate_reg_num(value):
+    if not is_valid_reg_num(value):
+        raise ValidationError("%(value)s is not a valid registration number.", params={'value': value})
+
+
+def reserve_reg_num_bodies(count):
+    """
+    Reserve `count` consecutive bodies and return them as a range.
+    The sequence row stays locked until the surrounding transaction ends.
+    """
+    from backend.student.models import RegNumSequence
+
+    with transaction.atomic():
+        sequence, _ = RegNumSequence.objects.select_for_update().get_or_create(
+            name=REG_NUM_SEQUENCE, defaults={'last_value': REG_NUM_FIRST_BODY - 1}
+        )
+        RegNumSequence.objects.filter(pk=sequence.pk).update(last_value=F('last_value') + count)
+    return range(sequence.last_value + 1, sequence.last_value + count + 1)
+
+
+def format_reg_nums(bodies):
+    check_digits = luhn_check_digits(bodies, REG_NUM_BODY_LENGTH)
+    return [f'{body}{check_digit}' for body, check_digit in zip(bodies, check_digits.tolist())]
+
+
+def allocate_reg_nums(count):
+    """
+    Return `count` unused registration numbers.
+
+    Numbers issued before the sequence existed were random, so each block is
+    checked against the students table once and any clash is replaced.
+    """
+    from backend.student.models import Student
+
+    reg_nums = []
+    while len(reg_nums) < count:
+        block = format_reg_nums(reserve_reg_num_bodies(count - len(reg_nums)))
+        taken = set()
+        for start in range(0, len(block), REG_NUM_LOOKUP_BATCH_SIZE):
+            taken.update(Student.objects.filter(
+                reg_num__in=block[start:start + REG_NUM_LOOKUP_BATCH_SIZE]
+            ).values_list('reg_num', flat=True))
+        reg_nums.extend(reg_num for reg_num in block if reg_num not in taken)
+    return reg_nums
+
+
+def assign_reg_nums(students):
+    """
+    Give every student without a registration number one, from a single block.
+    """
+    pending = [student for student in students if not student.reg_num]
+    if pending:
+        for student, reg_num in zip(pending, allocate_reg_nums(len(pending))):
+            student.reg_num = reg_num
+    return students
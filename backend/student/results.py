@@ -0,0 +1,219 @@
+"""
+Term results.
+
+ResultsPipeline reads every CA and exam score of a class section for a term in
+one query, lays them out as (student x subject) arrays and computes in
+vectorized passes:
+
+* each subject's CA and exam totals, its percentage of the subject's maximum
+  score, its grade on the subject's grading scale and the subject position;
+* each student's total, weightage-weighted average, overall grade and position;
+* the class average of every subject;
+* the cumulative session average, from the results already stored for the
+  session's earlier terms.
+
+Positions use competition ranking: tied students share a position and the
+next one is skipped (1, 2, 2, 4). The outcome is saved as one TermResult row
+per student, which report cards and flows read.
+"""
+from collections import Counter
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from backend.schools.grading import GradingEngine, UNGRADED
+from backend.student.models import ExaminationRecord, TermResult
+
+CA_EXAM_TYPES = ('continuous_assessment', 'midterm')
+FINAL_EXAM_TYPES = ('final',)
+RESULT_UPDATE_FIELDS = (
+    'level_class', 'subjects', 'total_score', 'average', 'grade', 'position', 'class_size',
+    'cumulative_average', 'computed_at',
+)
+
+
+def competition_rank(values):
+    """
+    1-based ranks of a float array, highest first, ties sharing a rank. NaN gets 0.
+    """
+    ranks = np.zeros(len(values), dtype=int)
+    valid = ~np.isnan(values)
+    ordered = np.sort(-values[valid])
+    ranks[valid] = np.searchsorted(ordered, -values[valid], side='left') + 1
+    return ranks
+
+
+def to_decimal(value):
+    return Decimal(f'{value:.2f}') if not np.isnan(value) else None
+
+
+class ResultsPipeline:
+    """
+    Computes and stores the term results of one LevelClasses section.
+
+    `engine` (a GradingEngine) can be shared between sections. Overall grades
+    use `scale`, by default the grading scale most of the section's subjects use.
+    """
+
+    def __init__(self, level_class, term, engine=None, scale=None):
+        self.level_class = level_class
+        self.term = term
+        self.engine = engine or GradingEngine()
+        self.scale = scale
+
+    def records(self):
+        """
+        (student id, subject id, is CA, score, max score) of the section's scores for the term.
+        """
+        return list(
+            ExaminationRecord.objects.filter(
+                student__enrollment_record__program_level=self.level_class,
+                student__enrollment_record__is_active=True,
+                exam__term=self.term,
+                exam__exam_type__in=CA_EXAM_TYPES + FINAL_EXAM_TYPES,
+            ).values_list('student_id', 'subject_id', 'exam__exam_type', 'score', 'exam__max_score')
+        )
+
+    def compute(self, records):
+        """
+        Columns of results for `records`, without queries.
+        """
+        student_ids, subject_ids, exam_types, scores, max_scores = (
+            zip(*records) if records else ((), (), (), (), ())
+        )
+        students, student_index = np.unique(np.array(student_ids, dtype=object), return_inverse=True)
+        subjects, subject_index = np.unique(np.array(subject_ids, dtype=int), return_inverse=True)
+        shape = (len(students), len(subjects))
+        scores = np.array(scores, dtype=float)
+        is_ca = np.isin(np.array(exam_types, dtype=object), CA_EXAM_TYPES)
+
+        ca, exam, maximum = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        cells = (student_index, subject_index)
+        np.add.at(ca, cells, np.where(is_ca, scores, 0))
+        np.add.at(exam, cells, np.where(is_ca, 0, scores))
+        np.add.at(maximum, cells, np.array(max_scores, dtype=float))
+        taken = np.zeros(shape, dtype=bool)
+        taken[cells] = True
+
+        total = np.where(taken, ca + exam, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentage = np.where(taken & (maximum > 0), total / maximum * 100, np.nan).round(2)
+
+        flat_subjects = np.broadcast_to(subjects, shape).ravel()
+        graded = self.engine.grade_subjects({'subject': flat_subjects, 'score': percentage.ravel()})
+        grades = graded['grade'].reshape(shape)
+        weights = graded['weight'].reshape(shape)
+        subject_positions = np.column_stack([competition_rank(percentage[:, j]) for j in range(len(subjects))]) \
+            if len(subjects) else np.zeros(shape, dtype=int)
+
+        counted = np.where(np.isnan(percentage), 0.0, weights)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = (np.nansum(percentage * counted, axis=1) / counted.sum(axis=1)).round(2)
+            class_averages = np.nanmean(np.where(taken, percentage, np.nan), axis=0).round(2) \
+                if len(students) else np.full(len(subjects), np.nan)
+
+        scale = self.scale
+        if scale is None and len(subjects):
+            scales = Counter(self.engine.subject_scale.get(subject) for subject in subjects.tolist())
+            scales.pop(None, None)
+            scale = scales.most_common(1)[0][0] if scales else self.engine.default_scale
+        overall_grades = self.engine.grade(average, scale) if scale is not None else \
+            np.full(len(students), UNGRADED, dtype=object)
+
+        return {
+            'student': students,
+            'subject': subjects,
+            'ca_score': np.where(taken, ca, np.nan),
+            'exam_score': np.where(taken, exam, np.nan),
+            'total': total,
+            'percentage': percentage,
+            'subject_grade': grades,
+            'subject_position': subject_positions,
+            'class_average': class_averages,
+            'total_score': np.nansum(total, axis=1),
+            'average': average,
+            'grade': overall_grades,
+            'position': competition_rank(average),
+        }
+
+    def cumulative_averages(self, students, averages):
+        """
+        Average of each student's term averages in the session, up to this term.
+        Terms without an average (no scored subject) are left out; NaN when a
+        student has none.
+        """
+        earlier = TermResult.objects.filter(
+            student__in=students.tolist(),
+            term__academic_session_id=self.term.academic_session_id,
+            term__start_date__lt=self.term.start_date,
+        ).values_list('student_id', 'average', 'subjects')
+        sums = dict.fromkeys(students.tolist(), 0.0)
+        counts = dict.fromkeys(students.tolist(), 0)
+        for student_id, average, subjects in earlier:
+            # Such terms are stored with an average of 0 and no subject percentage.
+            if average or any(row[4] is not None for row in subjects):
+                sums[student_id] += float(average)
+                counts[student_id] += 1
+        earlier_sum = np.array([sums[student] for student in students.tolist()], dtype=float)
+        earlier_count = np.array([counts[student] for student in students.tolist()], dtype=float)
+        counted = ~np.isnan(averages)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return ((earlier_sum + np.where(counted, averages, 0.0)) / (earlier_count + counted)).round(2)
+
+    def term_results(self, results):
+        results['cumulative_average'] = self.cumulative_averages(results['student'], results['average'])
+        subjects = results['subject'].tolist()
+        class_size = len(results['student'])
+        term_results = []
+        for i, student_id in enumerate(results['student'].tolist()):
+            rows = [
+                [
+                    subject,
+                    float(results['ca_score'][i, j]),
+                    float(results['exam_score'][i, j]),
+                    float(results['total'][i, j]),
+                    None if np.isnan(results['percentage'][i, j]) else float(results['percentage'][i, j]),
+                    results['subject_grade'][i, j],
+                    int(results['subject_position'][i, j]),
+                    float(results['class_average'][j]),
+                ]
+                for j, subject in enumerate(subjects)
+                if not np.isnan(results['total'][i, j])
+            ]
+            term_results.append(TermResult(
+                student_id=student_id,
+                term=self.term,
+                level_class=self.level_class,
+                subjects=rows,
+                total_score=to_decimal(results['total_score'][i]),
+                average=to_decimal(results['average'][i]) or Decimal('0'),
+                grade=results['grade'][i],
+                position=int(results['position'][i]),
+                class_size=class_size,
+                cumulative_average=to_decimal(results['cumulative_average'][i]) or Decimal('0'),
+            ))
+        return term_results
+
+    def run(self):
+        """
+        Compute, save and return the section's TermResults.
+        """
+        with transaction.atomic():
+            results = self.compute(self.records())
+            term_results = self.term_results(results)
+            # Students who no longer have scores in this section.
+            TermResult.objects.filter(term=self.term, level_class=self.level_class).exclude(
+                student__in=results['student'].tolist()
+            ).delete()
+            TermResult.objects.bulk_create(
+                term_results,
+                update_conflicts=True,
+                unique_fields=['student', 'term'],
+                update_fields=RESULT_UPDATE_FIELDS,
+            )
+        return term_results
+
+
+def compute_term_results(level_class, term, **options):
+    return ResultsPipeline(level_class, term, **options).run()
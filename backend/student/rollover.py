@@ -0,0 +1,206 @@
+"""
+End-of-session rollover.
+
+Every active enrollment of the closing session is moved according to the
+student's AcademicInfo.progression_status (Promoted when unset):
+
+- Promoted: to the next level of the same program, or to the first level of
+  the next program when the school offers it; graduated after the last level.
+- Repeating: to the same level in the new session.
+- Graduated, Withdrawn, Transferred: the enrollment is closed.
+
+The new class section keeps the student's stream and section name where the
+school has such a class. Students whose school has no class for their new
+level are left in place and counted as unplaced.
+
+Each school is one transaction. Students going to the same class are moved
+with one UPDATE, so a school costs a handful of queries whatever its size.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from backend.schools.models import LevelClasses, ProgramLevelTemplate, School, Stream
+from backend.student.models import AcademicInfo, EnrollmentRecord, RolloverCheckpoint
+
+ROLLOVER_UPDATE_BATCH_SIZE = 1000
+CLOSING_STATUSES = {'Graduated': 'graduated', 'Withdrawn': 'withdrawn', 'Transferred': 'transferred'}
+
+
+@dataclass
+class RolloverResult:
+    schools: int = 0
+    counts: Counter = field(default_factory=Counter)
+
+
+class SessionRollover:
+
+    def __init__(self, from_session, to_session, dry_run=False, restart=False):
+        self.from_session = from_session
+        self.to_session = to_session
+        self.dry_run = dry_run
+        self.restart = restart
+        self.levels = {template.pk: template for template in ProgramLevelTemplate.objects.progression()}
+        self.next_levels = self.level_successors(list(self.levels.values()))
+        self.streams = {
+            (template_id, name): pk for pk, template_id, name in
+            Stream.objects.values_list('pk', 'program_level_template_id', 'name')
+        }
+
+    def level_successors(self, progression):
+        """
+        Map each level to (next level in its program, first level of the next program).
+        """
+        successors = {}
+        for index, template in enumerate(progression):
+            following = progression[index + 1] if index + 1 < len(progression) else None
+            if following is not None and following.program == template.program:
+                successors[template.pk] = (following, None)
+            else:
+                successors[template.pk] = (None, following)
+        return successors
+
+    def next_level(self, template_id, school_programs):
+        same_program, next_program = self.next_levels[template_id]
+        if same_program is not None:
+            return same_program
+        if next_program is not None and ('all' in school_programs or next_program.program in school_programs):
+            return next_program
+        return None
+
+    def checkpoint(self):
+        """
+        The checkpoint to resume from. A completed rollover starts a new pass,
+        which picks up students left unplaced by the previous one.
+        """
+        checkpoint, _ = RolloverCheckpoint.objects.get_or_create(
+            from_session=self.from_session, to_session=self.to_session,
+        )
+        if self.restart:
+            checkpoint.schools_processed = 0
+            checkpoint.counts = {}
+        if self.restart or checkpoint.completed_at:
+            checkpoint.last_school = None
+            checkpoint.completed_at = None
+            checkpoint.save()
+        return checkpoint
+
+    def schools(self, after=None):
+        enrolled = EnrollmentRecord.objects.filter(academic_session=self.from_session, is_active=True)
+        schools = School.objects.filter(pk__in=enrolled.values('school_id')).order_by('pk')
+        if after is not None:
+            schools = schools.filter(pk__gt=after)
+        return schools.values_list('pk', 'program')
+
+    def pick_class(self, classes, section_name, stream_name):
+        """
+        The class of the new level that best matches the student's stream and section.
+        """
+        if not classes:
+            return None
+        return min(classes, key=lambda level_class: (
+            bool(stream_name) and level_class[2] != stream_name,
+            level_class[1] != section_name,
+            level_class[0],
+        ))
+
+    def plan_school(self, school_id, school_program):
+        """
+        Work out where every student of a school goes. Returns the outcome
+        counts and the updates as {update values: [enrollment pks]}.
+        """
+        school_programs = school_program.split('+')
+        enrollments = EnrollmentRecord.objects.filter(
+            school_id=school_id, academic_session=self.from_session, is_active=True,
+        ).values_list(
+            'pk', 'student_id', 'program_level__program_level_template_id',
+            'program_level__class_section_name', 'stream__name',
+        )
+        statuses = dict(AcademicInfo.objects.filter(
+            Q(academic_session=self.from_session) | Q(academic_session__isnull=True),
+            student__enrollment_record__school_id=school_id,
+            student__enrollment_record__academic_session=self.from_session,
+        ).order_by('created_at', 'pk').values_list('student_id', 'progression_status'))
+        classes = defaultdict(list)
+        for pk, template_id, section_name, stream_name, stream_id in LevelClasses.objects.filter(
+            school_id=school_id
+        ).values_list('pk', 'program_level_template_id', 'class_section_name', 'stream__name', 'stream_id'):
+            classes[template_id].append((pk, section_name, stream_name, stream_id))
+
+        counts, updates = Counter(), defaultdict(list)
+        for pk, student_id, template_id, section_name, stream_name in enrollments:
+            status = statuses.get(student_id) or 'Promoted'
+            if status in CLOSING_STATUSES:
+                counts[CLOSING_STATUSES[status]] += 1
+                updates[(('is_active', False),)].append(pk)
+                continue
+            if template_id is None:
+                counts['unplaced'] += 1
+                continue
+            if status == 'Repeating':
+                target = self.levels[template_id]
+            else:
+                target = self.next_level(template_id, school_programs)
+                if target is None:
+                    counts['graduated'] += 1
+                    updates[(('is_active', False),)].append(pk)
+                    continue
+            level_class = self.pick_class(classes[target.pk], section_name, stream_name)
+            if level_class is None:
+                counts['unplaced'] += 1
+                continue
+            stream_id = level_class[3] or self.streams.get((target.pk, stream_name))
+            counts['repeating' if status == 'Repeating' else 'promoted'] += 1
+            updates[(
+                ('program_level_id', level_class[0]),
+                ('program', target.program),
+                ('stream_id', stream_id),
+            )].append(pk)
+        return counts, updates
+
+    def apply(self, updates):
+        today = date.today()
+        for values, pks in updates.items():
+            values = dict(values)
+            if 'program_level_id' in values:
+                values.update(academic_session=self.to_session, enrollment_date=today)
+            for start in range(0, len(pks), ROLLOVER_UPDATE_BATCH_SIZE):
+                EnrollmentRecord.objects.filter(pk__in=pks[start:start + ROLLOVER_UPDATE_BATCH_SIZE]).update(**values)
+
+    def run(self, progress=None):
+        """
+        Roll every school over, or only count the outcomes when dry_run is set.
+        `progress` is called with (school id, counts) after each school.
+        """
+        result = RolloverResult()
+        checkpoint = None if self.dry_run else self.checkpoint()
+        after = checkpoint.last_school_id if checkpoint is not None else None
+
+        for school_id, school_program in list(self.schools(after)):
+            if self.dry_run:
+                counts, _ = self.plan_school(school_id, school_program)
+            else:
+                with transaction.atomic():
+                    counts, updates = self.plan_school(school_id, school_program)
+                    self.apply(updates)
+                    checkpoint.last_school_id = school_id
+                    checkpoint.schools_processed += 1
+                    checkpoint.counts = dict(Counter(checkpoint.counts) + counts)
+                    checkpoint.save(update_fields=['last_school', 'schools_processed', 'counts', 'updated_at'])
+            result.schools += 1
+            result.counts.update(counts)
+            if progress is not None:
+                progress(school_id, counts)
+
+        if checkpoint is not None:
+            checkpoint.completed_at = now()
+            checkpoint.save(update_fields=['completed_at', 'updated_at'])
+        return result
+
+
+def rollover_session(from_session, to_session, dry_run=False, restart=False, progress=None):
+    return SessionRollover(from_session, to_session, dry_run=dry_run, restart=restart).run(progress)
@@ -0,0 +1,263 @@
+"""
+Student search.
+
+Every student has rows in StudentSearchToken: their normalized name tokens
+(lowercase ASCII letters and digits), the one-letter deletions of every name
+token of MIN_VARIANT_LENGTH or more, their registration number and their NIN.
+Saving a student rebuilds their rows (see the post_save receiver); bulk
+inserts call `index_students` themselves and `manage.py rebuild_search_index`
+rebuilds everything.
+
+Queries only read ranges of the (field, token, student) index, so their cost
+depends on the size of a page, not on the number of students:
+
+* `prefix_search` matches the longest query token as a prefix, with a range
+  (token >= "ami" and token < "amj") that every backend can answer from the
+  index, and requires every other query token to prefix-match a token of the
+  same student. Results come in (token, student) order with a keyset cursor.
+* `fuzzy_search` looks the longest query token and its one-letter deletions
+  up among the name tokens and their stored deletions (the symmetric delete
+  scheme), which finds every name within one insertion, deletion,
+  substitution or adjacent transposition; candidates are then checked
+  against all query tokens. Results come in student id order.
+
+A student whose tokens share a prefix can appear on two prefix pages.
+"""
+import base64
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, UUIDField
+
+from backend.student.models import Student, StudentSearchToken
+
+SEARCH_PAGE_SIZE = 25
+SEARCH_INDEX_BATCH_SIZE = 1000
+MAX_TOKEN_LENGTH = StudentSearchToken._meta.get_field('token').max_length
+MIN_VARIANT_LENGTH = 4
+FUZZY_SCAN_BATCHES = 5
+NAME_FIELDS = (StudentSearchToken.NAME,)
+NUMBER_FIELDS = (StudentSearchToken.REG_NUM, StudentSearchToken.NIN)
+
+
+@dataclass
+class SearchPage:
+    students: list
+    next_cursor: str = None
+
+
+def normalize(text):
+    """
+    Lowercase ASCII letter and digit tokens of `text`, accents removed.
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    return [token[:MAX_TOKEN_LENGTH] for token in re.findall(r'[a-z0-9]+', text)]
+
+
+def deletions(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def edit_distance(a, b):
+    """
+    Levenshtein distance counting an adjacent transposition as one edit.
+    """
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def prefix_end(prefix):
+    """
+    The smallest string above every string starting with `prefix`, or None.
+    """
+    stripped = prefix.rstrip('z9')
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+
+def name_tokens(student):
+    return set(normalize(f"{student.first_name} {student.middle_name} {student.last_name}"))
+
+
+def student_tokens(student):
+    tokens = set()
+    for token in name_tokens(student):
+        tokens.add((StudentSearchToken.NAME, token))
+        if len(token) >= MIN_VARIANT_LENGTH:
+            tokens.update((StudentSearchToken.VARIANT, variant) for variant in deletions(token))
+    if student.reg_num:
+        tokens.add((StudentSearchToken.REG_NUM, student.reg_num))
+    if student.nin_number:
+        tokens.add((StudentSearchToken.NIN, student.nin_number))
+    return tokens
+
+
+def index_students(students, batch_size=SEARCH_INDEX_BATCH_SIZE, created=False):
+    """
+    Replace the search tokens of `students`; `created` skips removing the old
+    ones of students that were just inserted.
+    """
+    with transaction.atomic(savepoint=False):
+        if not created:
+            StudentSearchToken.objects.filter(student__in=[student.pk for student in students]).delete()
+        StudentSearchToken.objects.bulk_create(
+            [
+                StudentSearchToken(student_id=student.pk, field=field, token=token)
+                for student in students
+                for field, token in sorted(student_tokens(student))
+            ],
+            batch_size=batch_size,
+        )
+
+
+def rebuild_index(batch_size=SEARCH_INDEX_BATCH_SIZE):
+    """
+    Reindex every student, `batch_size` at a time. Returns the number of students.
+    """
+    count = 0
+    batch = []
+    students = Student.objects.order_by().only('pk', 'first_name', 'middle_name', 'last_name', 'reg_num', 'nin_number')
+    for student in students.iterator(chunk_size=batch_size):
+        batch.append(student)
+        if len(batch) == batch_size:
+            index_students(batch, batch_size)
+            count += len(batch)
+            batch = []
+    if batch:
+        index_students(batch, batch_size)
+        count += len(batch)
+    return count
+
+
+def encode_cursor(*parts):
+    return base64.urlsafe_b64encode('|'.join(str(part) for part in parts).encode()).decode()
+
+
+def decode_cursor(cursor, parts):
+    """
+    The `parts` values of a cursor, or None if it is missing or malformed. The
+    last part is always a student id and comes back as a UUID.
+    """
+    if not cursor:
+        return None
+    try:
+        values = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    except (ValueError, UnicodeError):
+        return None
+    if len(values) != parts:
+        return None
+    try:
+        values[-1] = UUIDField().to_python(values[-1])
+    except ValidationError:
+        return None
+    return values
+
+
+def token_range(prefix, fields):
+    condition = Q(field__in=fields, token__gte=prefix)
+    end = prefix_end(prefix)
+    return condition & Q(token__lt=end) if end else condition
+
+
+def students_in_order(ids):
+    students = Student.objects.select_related('school').in_bulk(ids)
+    return [students[student_id] for student_id in ids if student_id in students]
+
+
+def prefix_search(query, cursor=None, limit=SEARCH_PAGE_SIZE):
+    """
+    Students with a token starting with every token of `query`.
+    """
+    tokens = normalize(query)
+    if not tokens:
+        return SearchPage([])
+    tokens.sort(key=len, reverse=True)
+    fields = lambda token: NUMBER_FIELDS if token.isdigit() else NAME_FIELDS
+
+    rows = StudentSearchToken.objects.filter(token_range(tokens[0], fields(tokens[0])))
+    for other in tokens[1:]:
+        rows = rows.filter(Exists(
+            StudentSearchToken.objects.filter(token_range(other, fields(other)), student=OuterRef('student'))
+        ))
+    after = decode_cursor(cursor, 2)
+    if after:
+        rows = rows.filter(Q(token__gt=after[0]) | Q(token=after[0], student_id__gt=after[1]))
+
+    rows = list(rows.order_by('token', 'student_id').values_list('token', 'student_id')[:limit])
+    next_cursor = encode_cursor(*rows[-1]) if len(rows) == limit else None
+    return SearchPage(students_in_order(list(dict.fromkeys(student_id for _, student_id in rows))), next_cursor)
+
+
+def matches(query_tokens, tokens):
+    """
+    Whether every query token is within one edit of, or a prefix of, one of `tokens`.
+    """
+    return all(
+        any(token.startswith(query_token) or edit_distance(query_token, token) <= 1 for token in tokens)
+        for query_token in query_tokens
+    )
+
+
+def fuzzy_search(query, cursor=None, limit=SEARCH_PAGE_SIZE):
+    """
+    Students whose names match `query` allowing one typo per token.
+    """
+    tokens = normalize(query)
+    if not tokens:
+        return SearchPage([])
+    drive = max(tokens, key=len)
+    keys = {drive} | (deletions(drive) if len(drive) >= MIN_VARIANT_LENGTH else set())
+    candidates = StudentSearchToken.objects.filter(
+        field__in=(StudentSearchToken.NAME, StudentSearchToken.VARIANT), token__in=keys,
+    )
+
+    after = decode_cursor(cursor, 1)
+    after = after[0] if after else None
+    found = []
+    for _ in range(FUZZY_SCAN_BATCHES):
+        batch = candidates.filter(student_id__gt=after) if after else candidates
+        ids = list(batch.order_by('student_id').values_list('student_id', flat=True).distinct()[:limit * 2])
+        for student in students_in_order(ids):
+            after = student.pk
+            if matches(tokens, name_tokens(student)):
+                found.append(student)
+                if len(found) == limit:
+                    return SearchPage(found, encode_cursor(student.pk))
+        if len(ids) < limit * 2:
+            return SearchPage(found)
+        after = ids[-1]
+    # Too few matches among the candidates scanned; let the caller continue.
+    return SearchPage(found, encode_cursor(after))
+
+
+def browse(cursor=None, limit=SEARCH_PAGE_SIZE):
+    """
+    All students in name order, a page at a time.
+    """
+    students = Student.objects.select_related('school').order_by('last_name', 'first_name', 'pk')
+    after = decode_cursor(cursor, 3)
+    if after:
+        last_name, first_name, pk = after
+        students = students.filter(
+            Q(last_name__gt=last_name)
+            | Q(last_name=last_name, first_name__gt=first_name)
+            | Q(last_name=last_name, first_name=first_name, pk__gt=pk)
+        )
+    students = list(students[:limit])
+    next_cursor = None
+    if len(students) == limit:
+        last = students[-1]
+        next_cursor = encode_cursor(last.last_name, last.first_name, last.pk)
+    return SearchPage(students, next_cursor)
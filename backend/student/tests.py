@@ -1,4 +1,47 @@
+from datetime import date
+from decimal import Decimal
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import zipfile
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+import numpy as np
+import openpyxl
+
+from backend.flows.builder import FlowBuilder
+from backend.schools.models import (
+    School, AcademicSession, ProgramLevelTemplate, LevelClasses, Stream, Term, SubjectRepository, GradingScale,
+    GradeBoundary, SubjectGradingConfiguration,
+)
+from backend.schools.session_resolver import academic_session_resolver
+from backend.student.algorithms import generate_luhn_check_digit, is_luhn_valid, luhn_check_digits
+from backend.student.enrollment import enroll_many
+from backend.student.models import (
+    Student, EnrollmentRecord, AcademicInfo, RolloverCheckpoint, ExamMetadata, ExaminationRecord, TermResult,
+    Attendance, TermAttendance, StudentSearchToken, DuplicateCandidate,
+)
+from backend.student.rollover import rollover_session
+from backend.student.importer import StudentImporter, import_students, read_csv_rows
+from backend.student.reg_num import allocate_reg_nums, assign_reg_nums, is_reg_num_shaped, is_valid_reg_num, validate_reg_num
+from backend.student import pdf
+from backend.student.attendance import (
+    attendance_rates, attendance_totals, class_attendance_rates, rollup_attendance, student_attendance,
+    submit_register,
+)
+from backend.student.printing import admission_letters, render_pdfs, report_cards, stream_batch, stream_zip
+from backend.student.results import ResultsPipeline, compute_term_results
+from backend.student.duplicates import BLOCK_WINDOW, block_pairs, find_duplicates, score_pairs, soundex
+from backend.student.search import browse, edit_distance, fuzzy_search, prefix_end, prefix_search, rebuild_index
 
 # Create your tests here.
 """
@@ -79,4 +122,905 @@ Here are 50 different document types used in primary and secondary schools:
 
 This list provides a comprehensive overview of the diverse range of documents used in primary and secondary schools. The specific documents used may vary depending on the school's size, type, and location. 
 
-"""
\ No newline at end of file
+"""
+
+
+class LuhnTest(TestCase):
+
+    def test_vectorized_check_digits_match_scalar(self):
+        numbers = [random.randrange(10 ** 9, 10 ** 10) for _ in range(500)] + [0, 7992739871]
+        self.assertEqual(
+            luhn_check_digits(numbers, 10).tolist(),
+            [generate_luhn_check_digit(number) for number in numbers],
+        )
+
+    def test_known_numbers(self):
+        self.assertEqual(generate_luhn_check_digit(7992739871), 3)
+        self.assertTrue(is_luhn_valid('79927398713'))
+        self.assertFalse(is_luhn_valid('79927398710'))
+
+
+class RegNumAllocationTest(TestCase):
+
+    def create_student(self, index, **fields):
+        return Student.objects.create(
+            first_name='Amina', last_name=f'Test{"abcdefghij"[index]}', date_of_birth=date(2012, 1, 1),
+            gender='F', country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North',
+            passport_photograph=f'students/passport/test{index}.jpg', **fields,
+        )
+
+    def test_block_is_reserved_in_fixed_queries(self):
+        """
+        Test that a large block costs one reservation and one lookup per lookup batch.
+        """
+        # Transaction, lock, update, release; then two existence lookups.
+        with self.assertNumQueries(6):
+            reg_nums = allocate_reg_nums(6000)
+        self.assertEqual(len(set(reg_nums)), 6000)
+        self.assertTrue(all(is_valid_reg_num(reg_num) for reg_num in reg_nums))
+        self.assertTrue(set(reg_nums).isdisjoint(allocate_reg_nums(10)))
+
+    def test_taken_numbers_are_skipped(self):
+        """
+        Test that a number issued before the sequence existed is never handed out again.
+        """
+        clash = allocate_reg_nums(1)[0]
+        next_reg_num = f'{int(clash[:-1]) + 1}'
+        next_reg_num += str(generate_luhn_check_digit(next_reg_num))
+        self.create_student(0, reg_num=next_reg_num)
+        self.assertNotIn(next_reg_num, allocate_reg_nums(3))
+
+    def test_students_get_valid_reg_nums(self):
+        student = self.create_student(0)
+        self.assertTrue(is_valid_reg_num(student.reg_num))
+        students = assign_reg_nums([Student(), Student(reg_num='kept')])
+        self.assertTrue(is_valid_reg_num(students[0].reg_num))
+        self.assertEqual(students[1].reg_num, 'kept')
+
+    def test_validate_reg_num(self):
+        validate_reg_num('79927398713')
+        for value in ('79927398710', '7992739871', '7992739871a', None):
+            with self.assertRaises(ValidationError):
+                validate_reg_num(value)
+
+    def test_lookup_view(self):
+        student = self.create_student(0)
+        response = self.client.get(reverse('student:lookup', args=[student.reg_num]))
+        self.assertRedirects(response, reverse('student:details', args=[student.pk]), fetch_redirect_response=False)
+        # Numbers issued before the sequence existed have no check digit.
+        legacy = self.create_student(1, reg_num='12345678901')
+        self.assertFalse(is_valid_reg_num(legacy.reg_num))
+        response = self.client.get(reverse('student:lookup', args=[legacy.reg_num]))
+        self.assertRedirects(response, reverse('student:details', args=[legacy.pk]), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('student:lookup', args=['12345678902'])).status_code, 404)
+        for reg_num in ('1234567890', '1234567890a', '١٢٣٤٥٦٧٨٩٠١'):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('student:lookup', args=[reg_num]))
+            self.assertEqual(response.status_code, 404)
+        self.assertFalse(is_reg_num_shaped(None))
+
+
+IMPORT_HEADER = 'first_name,last_name,middle_name,date_of_birth,gender,country_of_birth,state_of_origin,place_of_birth\n'
+
+
+def import_row(last_name, date_of_birth='2012-01-01', gender='F', first_name='Amina'):
+    return f'{first_name},{last_name},,{date_of_birth},{gender},Nigeria,Plateau,Jos North\n'
+
+
+class StudentImportTest(TestCase):
+
+    def run_import(self, content, **kwargs):
+        report = io.StringIO()
+        result = import_students(io.BytesIO(content.encode()), 'students.csv', error_report=report, **kwargs)
+        return result, list(csv.reader(io.StringIO(report.getvalue())))
+
+    def test_valid_rows_are_created(self):
+        school = School.objects.create(
+            name='Test Public School', school_type='public', program='jss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        content = IMPORT_HEADER + ''.join(import_row(f'Test{letter}') for letter in 'abcde')
+        result, report = self.run_import(content, school=school)
+        self.assertEqual((result.created, result.failed), (5, 0))
+        self.assertEqual(report, [['row', 'field', 'error']])
+        students = Student.objects.filter(school=school)
+        self.assertEqual(students.count(), 5)
+        self.assertTrue(all(is_valid_reg_num(student.reg_num) for student in students))
+        self.assertFalse(students.exclude(passport_photograph=None).exists())
+
+    def test_invalid_rows_are_reported(self):
+        content = IMPORT_HEADER + (
+            import_row('Testa')
+            + import_row('Test1')                       # Digits in a name.
+            + import_row('Testb', date_of_birth='2099-01-01')
+            + import_row('Testc', gender='X')
+            + import_row('Testd', gender='female')      # Labels are accepted.
+            + import_row('TESTA')                       # Duplicate key within the file.
+        )
+        result, report = self.run_import(content)
+        self.assertEqual((result.created, result.failed), (2, 4))
+        self.assertEqual([row[:2] for row in report[1:]], [
+            ['3', 'last_name'], ['4', 'date_of_birth'], ['5', 'gender'], ['7', '__all__'],
+        ])
+        self.assertIn('Student must be at least 4 years old.', report[2][2])
+        self.assertEqual(Student.objects.get(last_name='Testd').gender, 'F')
+
+    def test_existing_students_are_reported(self):
+        self.run_import(IMPORT_HEADER + import_row('Testa'))
+        result, report = self.run_import(IMPORT_HEADER + import_row('Testa') + import_row('Testb'))
+        self.assertEqual((result.created, result.failed), (1, 1))
+        self.assertEqual(report[1], ['2', '__all__', 'A student with these details already exists.'])
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.run_import('first_name,last_name\nAmina,Testa\n')
+
+    def test_xlsx_rows_are_read(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        for line in (IMPORT_HEADER + import_row('Testa') + import_row('Test1')).splitlines():
+            sheet.append(line.split(','))
+        sheet.append([None] * 8)                        # Blank rows are skipped.
+        content = io.BytesIO()
+        workbook.save(content)
+        content.seek(0)
+        result = import_students(content, 'students.xlsx', error_report=io.StringIO())
+        self.assertEqual((result.created, result.failed), (1, 1))
+        self.assertTrue(Student.objects.filter(last_name='Testa').exists())
+
+    def test_chunk_uses_fixed_queries(self):
+        """
+        Test that a chunk costs the same queries whatever its size.
+        """
+        content = IMPORT_HEADER + ''.join(import_row(f'Test{a}{b}') for a in 'abcd' for b in 'abcdefghij')
+        importer = StudentImporter(chunk_size=40)
+        # Existing keys, reg_num reservation (4) and lookup, and the inserts in a savepoint (5: SQLite's
+        # parameter limit splits the search tokens in two).
+        with self.assertNumQueries(11):
+            result = importer.run(read_csv_rows(io.BytesIO(content.encode())))
+        self.assertEqual(result.created, 40)
+
+    def test_command_writes_error_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'students.csv')
+            with open(path, 'w') as file:
+                file.write(IMPORT_HEADER + import_row('Testa') + import_row('Test1'))
+            out = io.StringIO()
+            call_command('import_students', path, chunk_size=1, stdout=out)
+            self.assertIn('Imported 1 of 2 rows', out.getvalue())
+            with open(f'{path}.errors.csv') as report:
+                self.assertEqual(len(report.readlines()), 2)
+
+    def test_upload_view(self):
+        upload = SimpleUploadedFile('students.csv', (IMPORT_HEADER + import_row('Testa') + import_row('Test1')).encode())
+        self.assertEqual(self.client.post(reverse('student:import'), {'file': upload}).status_code, 302)
+        self.assertEqual(self.client.get(reverse('student:import_report')).status_code, 302)
+
+        upload.seek(0)
+        self.client.force_login(User.objects.create_user(username='clerk', password='password'))
+        self.assertEqual(self.client.get(reverse('student:import_report')).status_code, 404)
+        response = self.client.post(reverse('student:import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 1)
+        self.assertTrue(Student.objects.filter(last_name='Testa').exists())
+
+        response = self.client.get(response.context['report_url'])
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        report = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertEqual((report[0], report[1][0]), (['row', 'field', 'error'], '3'))
+
+        self.client.force_login(User.objects.create_user(username='other', password='password'))
+        self.assertEqual(self.client.get(reverse('student:import_report')).status_code, 404)
+
+
+class EnrollmentServiceTest(TestCase):
+
+    def setUp(self):
+        academic_session_resolver.invalidate()
+        self.school = School.objects.create(
+            name='Test Public School', school_type='public', program='sss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        self.session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        self.template = ProgramLevelTemplate.objects.create(program='sss', level='SSS 1')
+        self.stream = Stream.objects.create(program_level_template=self.template, name='science')
+        self.level_class = LevelClasses.objects.create(
+            school=self.school, program_level_template=self.template, class_section_name='A',
+        )
+        self.students = [
+            Student.objects.create(
+                first_name='Amina', last_name=f'Test{"abcdefghij"[i]}', date_of_birth=date(2008, 1, 1),
+                gender='F', country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North',
+            )
+            for i in range(10)
+        ]
+
+    def test_enroll_many_in_fixed_queries(self):
+        """
+        Test that a class list is enrolled with the same queries whatever its size.
+        """
+        enroll_many(self.students[:2], self.school, self.level_class, self.stream)
+        level_class = LevelClasses.objects.select_related('program_level_template').get(pk=self.level_class.pk)
+        # Savepoint, existing records, insert, update, student update, release.
+        with self.assertNumQueries(6):
+            result = enroll_many(self.students, self.school, level_class, self.stream)
+        self.assertEqual((len(result.created), len(result.updated)), (8, 2))
+
+        records = EnrollmentRecord.objects.filter(student__in=self.students)
+        self.assertEqual(records.count(), 10)
+        self.assertFalse(records.exclude(academic_session=self.session, program='sss', stream=self.stream).exists())
+        self.assertEqual(Student.objects.filter(school=self.school).count(), 10)
+
+    def test_enrolled_students_are_moved(self):
+        """
+        Test that enrolling an already enrolled student moves their single record.
+        """
+        enroll_many(self.students[:1], self.school, self.level_class)
+        section_b = LevelClasses.objects.create(
+            school=self.school, program_level_template=self.template, class_section_name='B',
+        )
+        result = enroll_many(self.students[:1], self.school, section_b)
+        self.assertEqual(len(result.updated), 1)
+        self.assertEqual(EnrollmentRecord.objects.get(student=self.students[0]).program_level, section_b)
+
+    def test_invalid_enrollments_are_rejected(self):
+        other_school = School.objects.create(
+            name='Other Public School', school_type='public', program='sss',
+            lga='Test LGA', ward='Test Ward', street_address='456 Test Street',
+        )
+        with self.assertRaises(ValidationError):
+            enroll_many(self.students, other_school, self.level_class)
+        other_stream = Stream.objects.create(
+            program_level_template=ProgramLevelTemplate.objects.create(program='sss', level='SSS 2'), name='arts',
+        )
+        with self.assertRaises(ValidationError):
+            enroll_many(self.students, self.school, self.level_class, other_stream)
+        self.assertFalse(EnrollmentRecord.objects.exists())
+
+    def test_bulk_enrollment_view(self):
+        url = reverse('student:bulk_enrollment', args=[self.level_class.pk])
+        self.assertEqual(self.client.post(url, {'reg_nums': self.students[0].reg_num}).status_code, 302)
+        self.assertFalse(EnrollmentRecord.objects.exists())
+        self.client.force_login(User.objects.create_user(username='clerk', password='password'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        reg_nums = '\n'.join(student.reg_num for student in self.students)
+        response = self.client.post(url, {'reg_nums': reg_nums, 'enrollment_mode': '1', 'stream': self.stream.pk})
+        self.assertRedirects(response, reverse('schools:details', args=[self.school.pk]), fetch_redirect_response=False)
+        self.assertEqual(EnrollmentRecord.objects.filter(program_level=self.level_class).count(), 10)
+
+        response = self.client.post(url, {'reg_nums': '1234567890 1234567890a', 'enrollment_mode': '1'})
+        self.assertFormError(
+            response.context['form'], 'reg_nums', 'Invalid registration numbers: 1234567890, 1234567890a.'
+        )
+        response = self.client.post(url, {'reg_nums': '12345678901', 'enrollment_mode': '1'})
+        self.assertFormError(response.context['form'], 'reg_nums', 'No students with registration numbers: 12345678901.')
+
+        # Numbers issued before the sequence existed have no check digit.
+        Student.objects.filter(pk=self.students[0].pk).update(reg_num='12345678901')
+        response = self.client.post(url, {'reg_nums': '12345678901', 'enrollment_mode': '1', 'stream': self.stream.pk})
+        self.assertRedirects(response, reverse('schools:details', args=[self.school.pk]), fetch_redirect_response=False)
+
+
+class SessionRolloverTest(TestCase):
+
+    def setUp(self):
+        academic_session_resolver.invalidate()
+        self.old_session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        self.new_session = AcademicSession.objects.create(
+            session_name='2025/2026', start_date=date(2025, 9, 1), end_date=date(2026, 7, 31), status='upcoming',
+        )
+        self.levels = {
+            level: ProgramLevelTemplate.objects.create(program=program, level=level)
+            for program, level in (('sss', 'SSS 1'), ('jss', 'JSS 3'), ('jss', 'JSS 1'), ('jss', 'JSS 2'))
+        }
+        self.science = Stream.objects.create(program_level_template=self.levels['SSS 1'], name='science')
+        self.combined = self.create_school('Combined School', 'jss+sss')
+        self.junior = self.create_school('Junior School', 'jss')
+        self.classes = {
+            (school, level, section): LevelClasses.objects.create(
+                school=school, program_level_template=self.levels[level], class_section_name=section,
+            )
+            for school in (self.combined, self.junior)
+            for level in ('JSS 1', 'JSS 2', 'JSS 3')
+            for section in ('A', 'B')
+        }
+        self.classes[(self.combined, 'SSS 1', 'A')] = LevelClasses.objects.create(
+            school=self.combined, program_level_template=self.levels['SSS 1'], class_section_name='A',
+            stream=self.science,
+        )
+        self.student_count = 0
+
+    def create_school(self, name, program):
+        return School.objects.create(
+            name=name, school_type='public', program=program,
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+
+    def enroll(self, school, level, section='A', status=None):
+        student = Student.objects.create(
+            first_name='Amina', last_name=f'Test{"abcdefghij"[self.student_count]}', date_of_birth=date(2010, 1, 1),
+            gender='F', country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North',
+            school=school,
+        )
+        self.student_count += 1
+        EnrollmentRecord.objects.create(
+            student=student, school=school, program='jss', academic_session=self.old_session,
+            program_level=self.classes[(school, level, section)],
+        )
+        if status:
+            AcademicInfo.objects.create(student=student, academic_session=self.old_session, progression_status=status)
+        return student
+
+    def enrollment(self, student):
+        return EnrollmentRecord.objects.select_related('program_level__program_level_template').get(student=student)
+
+    def test_progression_order(self):
+        self.assertEqual(
+            [template.level for template in ProgramLevelTemplate.objects.progression()],
+            ['JSS 1', 'JSS 2', 'JSS 3', 'SSS 1'],
+        )
+
+    def test_rollover_applies_progression_status(self):
+        promoted = self.enroll(self.combined, 'JSS 1', section='B')
+        repeating = self.enroll(self.combined, 'JSS 1', status='Repeating')
+        to_senior = self.enroll(self.combined, 'JSS 3')
+        withdrawn = self.enroll(self.combined, 'JSS 2', status='Withdrawn')
+        graduated = self.enroll(self.junior, 'JSS 3')
+
+        result = rollover_session(self.old_session, self.new_session)
+        self.assertEqual(result.schools, 2)
+        self.assertEqual(dict(result.counts), {'promoted': 2, 'repeating': 1, 'withdrawn': 1, 'graduated': 1})
+
+        record = self.enrollment(promoted)
+        self.assertEqual((record.program_level, record.academic_session), (self.classes[(self.combined, 'JSS 2', 'B')], self.new_session))
+        self.assertEqual(self.enrollment(repeating).program_level, self.classes[(self.combined, 'JSS 1', 'A')])
+        record = self.enrollment(to_senior)
+        self.assertEqual((record.program, record.stream), ('sss', self.science))
+        self.assertEqual(record.program_level, self.classes[(self.combined, 'SSS 1', 'A')])
+        self.assertFalse(self.enrollment(withdrawn).is_active)
+        self.assertFalse(self.enrollment(graduated).is_active)
+
+        checkpoint = RolloverCheckpoint.objects.get(from_session=self.old_session, to_session=self.new_session)
+        self.assertIsNotNone(checkpoint.completed_at)
+        self.assertEqual(checkpoint.schools_processed, 2)
+
+    def test_dry_run_changes_nothing(self):
+        student = self.enroll(self.combined, 'JSS 1')
+        out = io.StringIO()
+        call_command('rollover_session', self.old_session.pk, self.new_session.pk, dry_run=True, stdout=out)
+        self.assertIn('promoted: 1', out.getvalue())
+        self.assertEqual(self.enrollment(student).academic_session, self.old_session)
+        self.assertFalse(RolloverCheckpoint.objects.exists())
+
+    def test_rollover_resumes_after_checkpoint(self):
+        """
+        Test that schools up to the checkpoint are not processed again.
+        """
+        students = {school: self.enroll(school, 'JSS 1') for school in (self.combined, self.junior)}
+        first, second = sorted(students, key=lambda school: school.pk)
+        RolloverCheckpoint.objects.create(from_session=self.old_session, to_session=self.new_session, last_school=first)
+
+        result = rollover_session(self.old_session, self.new_session)
+        self.assertEqual(result.schools, 1)
+        self.assertEqual(self.enrollment(students[first]).academic_session, self.old_session)
+        self.assertEqual(self.enrollment(students[second]).academic_session, self.new_session)
+
+    def test_school_queries_are_fixed(self):
+        for section in ('A', 'B'):
+            for level in ('JSS 1', 'JSS 2'):
+                self.enroll(self.combined, level, section=section)
+        # Levels, streams, checkpoint creation (4) and schools; per school a savepoint,
+        # enrollments, statuses, classes, one update per destination class (4),
+        # checkpoint and release; then completing the checkpoint.
+        with self.assertNumQueries(7 + 10 + 1):
+            rollover_session(self.old_session, self.new_session)
+
+
+class ResultsFixtureMixin:
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School', school_type='public', program='jss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        self.session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        self.first_term = Term.objects.create(
+            academic_session=self.session, term_name=1, start_date=date(2024, 9, 9), end_date=date(2024, 12, 13),
+        )
+        self.term = Term.objects.create(
+            academic_session=self.session, term_name=2, start_date=date(2025, 1, 6), end_date=date(2025, 4, 4),
+        )
+        template = ProgramLevelTemplate.objects.create(program='jss', level='JSS 1')
+        self.level_class = LevelClasses.objects.create(
+            school=self.school, program_level_template=template, class_section_name='A',
+        )
+        scale = GradingScale.objects.create(scale_name='WAEC')
+        for grade, lower, upper in (('A', 70, 100), ('B', 60, 69), ('C', 50, 59), ('F', 0, 49)):
+            GradeBoundary.objects.create(grading_scale=scale, grade=grade, lower_bound=lower, upper_bound=upper)
+        self.maths = SubjectRepository.objects.create(subject_name='Mathematics')
+        self.english = SubjectRepository.objects.create(subject_name='English')
+        SubjectGradingConfiguration.objects.create(subject=self.maths, grading_scale=scale, weightage=200)
+        SubjectGradingConfiguration.objects.create(subject=self.english, grading_scale=scale, weightage=100)
+        self.exams = {
+            (subject, exam_type): ExamMetadata.objects.create(
+                exam_type=exam_type, academic_session=self.session, term=self.term, subject=subject,
+                exam_date=date(2025, 3, 20), max_score=max_score,
+            )
+            for subject in (self.maths, self.english)
+            for exam_type, max_score in (('continuous_assessment', 40), ('final', 60))
+        }
+        # (Maths CA, Maths exam, English CA, English exam)
+        scores = [(30, 50, 20, 40), (35, 45, 20, 40), (20, 30, 30, 50), (10, None, None, None)]
+        self.students = [self.enroll(name, row) for name, row in zip('abcd', scores)]
+
+    def enroll(self, name, scores):
+        student = Student.objects.create(
+            first_name='Amina', last_name=f'Test{name}', date_of_birth=date(2012, 1, 1), gender='F',
+            country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North', school=self.school,
+        )
+        EnrollmentRecord.objects.create(
+            student=student, school=self.school, program='jss', academic_session=self.session,
+            program_level=self.level_class,
+        )
+        keys = [
+            (self.maths, 'continuous_assessment'), (self.maths, 'final'),
+            (self.english, 'continuous_assessment'), (self.english, 'final'),
+        ]
+        for (subject, exam_type), score in zip(keys, scores):
+            if score is not None:
+                ExaminationRecord.objects.create(
+                    student=student, exam=self.exams[(subject, exam_type)], subject=subject, score=score,
+                )
+        return student
+
+
+class ResultsPipelineTest(ResultsFixtureMixin, TestCase):
+
+    def test_totals_averages_and_tied_positions(self):
+        TermResult.objects.create(
+            student=self.students[0], term=self.first_term, level_class=self.level_class, total_score=0,
+            average=Decimal('63.33'), position=1, class_size=4, cumulative_average=Decimal('63.33'),
+        )
+        compute_term_results(self.level_class, self.term)
+
+        results = {
+            result.student_id: result
+            for result in TermResult.objects.filter(term=self.term)
+        }
+        summary = [
+            (results[student.pk].average, results[student.pk].grade, results[student.pk].position)
+            for student in self.students
+        ]
+        self.assertEqual(summary, [
+            (Decimal('73.33'), 'A', 1), (Decimal('73.33'), 'A', 1), (Decimal('60.00'), 'B', 3), (Decimal('25.00'), 'F', 4),
+        ])
+        first = results[self.students[0].pk]
+        self.assertEqual(first.cumulative_average, Decimal('68.33'))
+        self.assertEqual(first.total_score, Decimal('140.00'))
+        self.assertEqual(first.class_size, 4)
+        maths = first.subject_rows()[0]
+        self.assertEqual(maths, {
+            'subject': self.maths.pk, 'ca_score': 30.0, 'exam_score': 50.0, 'total': 80.0, 'percentage': 80.0,
+            'grade': 'A', 'position': 1, 'class_average': 58.75,
+        })
+        last = results[self.students[3].pk]
+        self.assertEqual(last.subject_rows()[0]['percentage'], 25.0)
+        self.assertEqual(len(last.subjects), 1)
+
+    def test_cumulative_average_skips_terms_without_an_average(self):
+        """
+        Test that terms without an average, this one or earlier ones, do not
+        count as zeros, and that only terms starting earlier are included.
+        """
+        later_term = Term.objects.create(
+            academic_session=self.session, term_name=3, start_date=date(2025, 4, 28), end_date=date(2025, 7, 25),
+        )
+        first, second = self.students[:2]
+        for student, term, average, subjects in (
+            (first, self.first_term, '63.33', [[self.maths.pk, 20, 30, 50, 50.0, 'C', 1, 50.0]]),
+            (first, later_term, '10.00', [[self.maths.pk, 5, 5, 10, 10.0, 'F', 1, 10.0]]),
+            (second, self.first_term, '0', []),
+        ):
+            TermResult.objects.create(
+                student=student, term=term, level_class=self.level_class, subjects=subjects, total_score=0,
+                average=Decimal(average), position=1, class_size=4, cumulative_average=Decimal(average),
+            )
+        pipeline = ResultsPipeline(self.level_class, self.term)
+        students = np.array([first.pk, second.pk, self.students[2].pk], dtype=object)
+        self.assertEqual(
+            pipeline.cumulative_averages(students, np.array([np.nan, 73.33, np.nan])).tolist()[:2], [63.33, 73.33],
+        )
+        self.assertTrue(np.isnan(pipeline.cumulative_averages(students, np.array([np.nan] * 3))[2]))
+
+    def test_recompute_in_fixed_queries(self):
+        """
+        Test that a section's results are recomputed in place with a fixed number of queries.
+        """
+        compute_term_results(self.level_class, self.term)
+        ExaminationRecord.objects.filter(
+            student=self.students[3], exam=self.exams[(self.maths, 'continuous_assessment')]
+        ).update(score=40)
+        with self.assertNumQueries(8):
+            compute_term_results(self.level_class, self.term)
+        self.assertEqual(TermResult.objects.filter(term=self.term).count(), 4)
+        self.assertEqual(TermResult.objects.get(student=self.students[3], term=self.term).average, Decimal('100.00'))
+
+    def test_flows_and_report_card_read_results(self):
+        call_command('compute_results', self.term.pk, stdout=io.StringIO())
+        cohort = {row[0]: row for row in FlowBuilder(self.level_class, self.term).cohort()}
+        self.assertEqual(cohort[self.students[2].pk][3:], (Decimal('130.00'), Decimal('60.00'), 'B', 3))
+
+        url = reverse('student:report_card', args=[self.students[0].pk, self.term.pk])
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user(username='teacher', password='password'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Mathematics')
+        self.assertContains(response, '1 of 4')
+
+
+try:
+    import weasyprint
+    import pypdf
+except (ImportError, OSError):
+    # OSError: WeasyPrint is installed without its system libraries.
+    weasyprint = pypdf = None
+
+
+class BatchPrintingTest(ResultsFixtureMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        compute_term_results(self.level_class, self.term)
+
+    def test_documents_in_fixed_queries(self):
+        with self.assertNumQueries(1):
+            letters = admission_letters(self.school, self.session)
+        with self.assertNumQueries(2):
+            cards = report_cards(self.school, self.term, self.level_class)
+        self.assertEqual(len(letters), 4)
+        self.assertEqual(len(cards), 4)
+        name, html = cards[0]
+        self.assertTrue(name.endswith('-report-card.pdf'))
+        self.assertIn('Mathematics', html)
+        self.assertIn('Congratulations', letters[0][1])
+
+    def test_stream_zip_in_order(self):
+        documents = [('b.pdf', '<p>b</p>'), ('a.pdf', '<p>a</p>')]
+        with mock.patch.object(pdf, 'html_to_pdf', lambda html: html.encode()):
+            archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_zip(render_pdfs(documents, workers=1)))))
+        self.assertEqual(archive.namelist(), ['b.pdf', 'a.pdf'])
+        self.assertEqual(archive.read('a.pdf'), b'<p>a</p>')
+
+    def test_renders_in_process_by_default(self):
+        with mock.patch.object(pdf, 'html_to_pdf', lambda html: html.encode()), \
+                mock.patch('backend.student.printing.ProcessPoolExecutor') as pool:
+            self.assertEqual(list(render_pdfs([('a.pdf', '<p>a</p>')])), [('a.pdf', b'<p>a</p>')])
+        pool.assert_not_called()
+
+    @skipUnless(weasyprint and pypdf, "WeasyPrint and pypdf are not installed")
+    def test_real_render(self):
+        """
+        Test that report cards render with WeasyPrint and merge into one PDF.
+        """
+        cards = report_cards(self.school, self.term, self.level_class)
+        merged = b''.join(stream_batch(cards, 'pdf', workers=1))
+        self.assertTrue(merged.startswith(b'%PDF'))
+        self.assertGreaterEqual(len(pypdf.PdfReader(io.BytesIO(merged)).pages), len(cards))
+
+    def test_batch_views_require_login(self):
+        urls = [
+            reverse('student:batch_report_cards', args=[self.school.pk, self.term.pk]),
+            reverse('student:batch_admission_letters', args=[self.school.pk, self.session.pk]),
+        ]
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_missing_engine_fails_before_streaming(self):
+        self.client.force_login(User.objects.create_user(username='teacher', password='password'))
+        with mock.patch.dict(sys.modules, {'weasyprint': None}):
+            with self.assertRaises(ImproperlyConfigured):
+                stream_batch([], 'zip')
+            response = self.client.get(
+                reverse('student:batch_report_cards', args=[self.school.pk, self.term.pk]), {'format': 'pdf'}
+            )
+        self.assertEqual(response.status_code, 503)
+
+    def test_local_urls_only(self):
+        pdf.init_worker([('/media/', [os.path.dirname(__file__)])])
+        self.assertEqual(pdf.local_path(pdf.BASE_URL + 'media/tests.py'), os.path.join(os.path.dirname(__file__), 'tests.py'))
+        self.assertIsNone(pdf.local_path('https://cdn.jsdelivr.net/npm/bootstrap.min.css'))
+        self.assertIsNone(pdf.local_path(pdf.BASE_URL + 'media/missing.css'))
+
+
+class AttendanceTest(TestCase):
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School', school_type='public', program='jss',
+            lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+        )
+        self.session = AcademicSession.objects.create(
+            session_name='2024/2025', start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), status='ongoing',
+        )
+        self.term = Term.objects.create(
+            academic_session=self.session, term_name=1, start_date=date(2024, 9, 9), end_date=date(2024, 12, 13),
+        )
+        template = ProgramLevelTemplate.objects.create(program='jss', level='JSS 1')
+        self.level_class = LevelClasses.objects.create(
+            school=self.school, program_level_template=template, class_section_name='A',
+        )
+        self.students = []
+        for name in 'abc':
+            student = Student.objects.create(
+                first_name='Musa', last_name=f'Test{name}', date_of_birth=date(2012, 1, 1), gender='M',
+                country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North', school=self.school,
+            )
+            EnrollmentRecord.objects.create(
+                student=student, school=self.school, program='jss', academic_session=self.session,
+                program_level=self.level_class,
+            )
+            self.students.append(student)
+        self.today = date(2024, 10, 15)
+
+    def register(self, day, statuses=None):
+        return submit_register(self.level_class, day, statuses, today=self.today)
+
+    def test_recent_days_go_to_the_row_store(self):
+        a, b, c = self.students
+        self.assertEqual(self.register(date(2024, 10, 14), {a.pk: 'Absent'}), 3)
+        # Resubmitting the day corrects it in place.
+        self.register(date(2024, 10, 14), {a.pk: 'Excused'})
+        self.assertEqual(Attendance.objects.count(), 3)
+        self.assertEqual(Attendance.objects.get(student=a).status, 'Excused')
+        self.assertFalse(TermAttendance.objects.exists())
+
+    def test_old_days_go_straight_to_the_term_bitmap(self):
+        a, b, c = self.students
+        self.register(date(2024, 9, 9), {a.pk: 'Absent'})
+        self.register(date(2024, 9, 10))
+        self.assertFalse(Attendance.objects.exists())
+        stored = TermAttendance.objects.get(student=a)
+        self.assertEqual((stored.days_present, stored.days_absent, stored.days_excused), (1, 1, 0))
+        self.assertEqual(len(bytes(stored.marks)), 96)
+
+    def test_rollup_keeps_rates_and_history(self):
+        a, b, c = self.students
+        self.register(date(2024, 9, 16), {a.pk: 'Absent', b.pk: 'Excused'})
+        self.register(date(2024, 10, 7), {a.pk: 'Absent'})
+        self.register(date(2024, 10, 14), {c.pk: 'Absent'})
+        # A mark from before rows carried their term.
+        Attendance.objects.create(student=b, date=date(2024, 10, 8), status='Absent')
+        self.register(date(2024, 10, 9))
+
+        before = attendance_totals(self.term)
+        self.assertEqual(Attendance.objects.count(), 10)
+        self.assertEqual(rollup_attendance(date(2024, 10, 12), batch_size=4), 7)
+        self.assertEqual(list(Attendance.objects.values_list('date', flat=True).distinct()), [date(2024, 10, 14)])
+        # The legacy row is counted once it has been folded into its term.
+        before[b.pk]['Absent'] += 1
+        with self.assertNumQueries(2):
+            after = attendance_totals(self.term)
+        self.assertEqual(after, before)
+
+        rates = class_attendance_rates(self.level_class, self.term)
+        self.assertEqual(rates[a.pk], 50.0)
+        self.assertEqual(rates[b.pk], 75.0)
+        self.assertEqual(attendance_rates(self.term, [c.pk]), {c.pk: 75.0})
+        self.assertEqual(student_attendance(a, self.term), [
+            (date(2024, 9, 16), 'Absent'), (date(2024, 10, 7), 'Absent'), (date(2024, 10, 9), 'Present'),
+            (date(2024, 10, 14), 'Present'),
+        ])
+
+    def test_register_validation(self):
+        with self.assertRaises(ValidationError):
+            self.register(date(2024, 12, 20))
+        # A Saturday.
+        with self.assertRaises(ValidationError):
+            self.register(date(2024, 10, 12))
+        with self.assertRaises(ValidationError):
+            self.register(date(2024, 10, 14), {self.students[0].pk: 'Late'})
+
+    def test_register_view(self):
+        a = self.students[0]
+        url = reverse('student:attendance_register', args=[self.level_class.pk])
+        self.assertEqual(self.client.post(url, {'date': '2024-10-14', 'absent': [a.pk]}).status_code, 302)
+        self.assertFalse(Attendance.objects.exists())
+        self.client.force_login(User.objects.create_user(username='teacher', password='password'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'date': '2024-10-14', 'absent': [a.pk]})
+        self.assertRedirects(response, reverse('schools:details', args=[self.school.pk]), fetch_redirect_response=False)
+        self.assertEqual(attendance_totals(self.term)[a.pk]['Absent'], 1)
+
+
+class StudentSearchTest(TestCase):
+
+    def setUp(self):
+        names = [
+            ('Amina', 'Bello'), ('Aminu', 'Bello'), ('Amos', 'Danjuma'), ('Chinedu', 'Okafor'),
+            ('Chinedu', 'Okoro'), ('Fatima', 'Abubakar'), ('Ngozi', 'Okafor'),
+        ]
+        self.students = {}
+        for index, (first_name, last_name) in enumerate(names):
+            self.students[(first_name, last_name)] = Student.objects.create(
+                first_name=first_name, last_name=last_name, date_of_birth=date(2012, 1, 1), gender='F',
+                country_of_birth='Nigeria', state_of_origin='Plateau', place_of_birth='Jos North',
+                passport_photograph=f'students/passport/search{index}.jpg', nin_number=f'1234567890{index}',
+            )
+
+    def names(self, page):
+        return sorted(student.full_name for student in page.students)
+
+    def test_prefix_end(self):
+        self.assertEqual(prefix_end('ami'), 'amj')
+        self.assertEqual(prefix_end('azz'), 'b')
+        self.assertEqual(prefix_end('129'), '13')
+        self.assertIsNone(prefix_end('zz'))
+        self.assertEqual(edit_distance('amina', 'anima'), 2)
+        self.assertEqual(edit_distance('amina', 'aimna'), 1)
+
+    def test_prefix_search(self):
+        self.assertEqual(self.names(prefix_search('ami')), ['Bello Amina', 'Bello Aminu'])
+        self.assertEqual(self.names(prefix_search('oka chi')), ['Okafor Chinedu'])
+        self.assertEqual(self.names(prefix_search('OKAFOR')), ['Okafor Chinedu', 'Okafor Ngozi'])
+        self.assertEqual(prefix_search('zz').students, [])
+        self.assertEqual(prefix_search('  ').students, [])
+
+        fatima = self.students[('Fatima', 'Abubakar')]
+        self.assertEqual(prefix_search(fatima.reg_num).students, [fatima])
+        self.assertEqual(prefix_search('12345678905').students, [fatima])
+        self.assertEqual(prefix_search(f'{fatima.reg_num[:6]} fat').students, [fatima])
+
+    def test_keyset_pages(self):
+        seen = []
+        page = prefix_search('o', limit=2)
+        while True:
+            seen.extend(student.pk for student in page.students)
+            if not page.next_cursor:
+                break
+            with self.assertNumQueries(2):
+                page = prefix_search('o', cursor=page.next_cursor, limit=2)
+        okafor, okoro = self.students[('Chinedu', 'Okafor')], self.students[('Chinedu', 'Okoro')]
+        self.assertEqual(set(seen), {okafor.pk, okoro.pk, self.students[('Ngozi', 'Okafor')].pk})
+
+        browsed, page = [], browse(limit=3)
+        while True:
+            browsed.extend(page.students)
+            if not page.next_cursor:
+                break
+            page = browse(page.next_cursor, limit=3)
+        self.assertEqual(browsed, list(Student.objects.order_by('last_name', 'first_name', 'pk')))
+
+    def test_fuzzy_search(self):
+        self.assertEqual(self.names(fuzzy_search('Chinedo Okafr')), ['Okafor Chinedu'])
+        self.assertEqual(self.names(fuzzy_search('Fatma')), ['Abubakar Fatima'])
+        self.assertEqual(self.names(fuzzy_search('Aimna')), ['Bello Amina'])
+        self.assertEqual(fuzzy_search('Zainab').students, [])
+
+        page = fuzzy_search('Bello', limit=1)
+        self.assertEqual(len(page.students), 1)
+        rest = fuzzy_search('Bello', cursor=page.next_cursor, limit=1)
+        self.assertEqual(len(rest.students), 1)
+        self.assertNotEqual(page.students, rest.students)
+
+    def test_index_follows_changes(self):
+        ngozi = self.students[('Ngozi', 'Okafor')]
+        ngozi.last_name = 'Eze'
+        ngozi.save()
+        self.assertEqual(self.names(prefix_search('okafor')), ['Okafor Chinedu'])
+        self.assertEqual(prefix_search('eze').students, [ngozi])
+
+        StudentSearchToken.objects.all().delete()
+        self.assertEqual(rebuild_index(batch_size=3), len(self.students))
+        self.assertEqual(prefix_search('eze').students, [ngozi])
+
+        ngozi.delete()
+        self.assertFalse(StudentSearchToken.objects.filter(student_id=ngozi.pk).exists())
+
+    def test_imported_students_are_indexed(self):
+        import_students(io.BytesIO((IMPORT_HEADER + import_row('Testa')).encode()), 'students.csv')
+        self.assertEqual(self.names(prefix_search('testa')), [Student.objects.get(last_name="Testa").full_name])
+
+    def test_list_view(self):
+        response = self.client.get(reverse('student:list'), {'q': 'okafor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['students']), 2)
+        response = self.client.get(reverse('student:list'), {'q': 'okafr', 'fuzzy': '1'})
+        self.assertEqual(len(response.context['students']), 2)
+        self.assertEqual(len(self.client.get(reverse('student:list')).context['students']), len(self.students))
+
+    def test_malformed_cursor_reads_first_page(self):
+        """
+        Test that a cursor that decodes but holds no student id starts from the beginning.
+        """
+        self.assertEqual(self.client.get(reverse('student:list'), {'cursor': 'YXxifGM='}).status_code, 200)
+        response = self.client.get(reverse('student:list'), {'q': 'okafr', 'fuzzy': '1', 'cursor': 'YQ=='})
+        self.assertEqual(len(response.context['students']), 2)
+        self.assertEqual(self.names(prefix_search('ami', cursor='YXxi')), ['Bello Amina', 'Bello Aminu'])
+
+
+class DuplicateDetectionTest(TestCase):
+
+    def create_student(self, index, first_name, last_name, date_of_birth=date(2012, 3, 4), **fields):
+        fields = {
+            'gender': 'F', 'country_of_birth': 'Nigeria', 'state_of_origin': 'Plateau', 'place_of_birth': 'Jos North',
+            **fields,
+        }
+        return Student.objects.create(
+            first_name=first_name, last_name=last_name, date_of_birth=date_of_birth,
+            passport_photograph=f'students/passport/duplicate{index}.jpg', **fields,
+        )
+
+    def test_soundex(self):
+        self.assertEqual(soundex('Okafor'), 'O216')
+        self.assertEqual(soundex('Robert'), soundex('Rupert'))
+        self.assertEqual(soundex('Ashcraft'), 'A261')
+        self.assertEqual(soundex('Ngozi'), soundex('Ngozie'))
+        self.assertEqual(soundex(''), '')
+
+    def test_blocks_are_bounded(self):
+        records = [(index, 'Amina', '', 'Bello', 'F', 'Plateau', 'Jos') for index in range(500)]
+        pairs = block_pairs(records)
+        # Two oversized blocks paired within a window, not all 124,750 pairs.
+        self.assertLessEqual(len(pairs), 2 * 500 * BLOCK_WINDOW)
+        self.assertTrue(all(i < j for i, j in pairs))
+
+    def test_scores(self):
+        records = [
+            (1, 'Chinedu', '', 'Okafor', 'M', 'Enugu', 'Nsukka'),
+            (2, 'Chinedu', '', 'Okafor', 'M', 'Enugu', 'Nsukka'),
+            (3, 'Okafor', '', 'Chinedu', 'M', 'Enugu', 'Nsukka'),
+            (4, 'Chinedu', '', 'Okafo', 'M', 'Enugu', 'Nsuka'),
+            (5, 'Chinedu', '', 'Okafor', 'F', 'Lagos', 'Ikeja'),
+            (6, 'Fatima', '', 'Abubakar', 'F', 'Kano', 'Kano'),
+        ]
+        scores = score_pairs(records, [(0, 1), (0, 2), (0, 3), (0, 4), (0, 5)]).tolist()
+        self.assertAlmostEqual(scores[0], 1.0, places=4)
+        self.assertAlmostEqual(scores[1], 1.0, places=4)
+        self.assertGreater(scores[2], 0.85)
+        self.assertLess(scores[3], 0.85)
+        self.assertLess(scores[4], 0.3)
+
+    def test_find_duplicates_queues_pairs(self):
+        original = self.create_student(0, 'Ngozi', 'Okafor')
+        variant = self.create_student(1, 'Ngozie', 'Okafor', middle_name='')
+        swapped = self.create_student(2, 'Okafor', 'Ngozi')
+        self.create_student(3, 'Fatima', 'Abubakar')
+        self.create_student(4, 'Ngozi', 'Okafor', date_of_birth=date(2012, 3, 5))
+
+        self.assertEqual(find_duplicates(workers=1), (3, 3))
+        pairs = {frozenset((candidate.student_id, candidate.other_id)) for candidate in DuplicateCandidate.objects.all()}
+        self.assertEqual(pairs, {
+            frozenset((original.pk, variant.pk)), frozenset((original.pk, swapped.pk)),
+            frozenset((variant.pk, swapped.pk)),
+        })
+        self.assertTrue(all(candidate.student_id < candidate.other_id for candidate in DuplicateCandidate.objects.all()))
+
+        DuplicateCandidate.objects.update(status=DuplicateCandidate.DISTINCT)
+        self.assertEqual(find_duplicates(workers=1), (3, 0))
+        self.assertFalse(DuplicateCandidate.objects.filter(status=DuplicateCandidate.PENDING).exists())
+
+    def test_command_and_review(self):
+        a = self.create_student(0, 'Amina', 'Bello')
+        b = self.create_student(1, 'Aminah', 'Bello')
+        out = io.StringIO()
+        call_command('find_duplicate_students', '--workers', '2', stdout=out)
+        self.assertIn('1 newly queued', out.getvalue())
+
+        user = User.objects.create_user('reviewer', password='secret')
+        self.client.force_login(user)
+        url = reverse('student:duplicates')
+        response = self.client.get(url)
+        self.assertContains(response, b.full_name)
+        candidate = DuplicateCandidate.objects.get()
+        response = self.client.post(url, {'candidate': candidate.pk, 'status': DuplicateCandidate.DUPLICATE})
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        candidate.refresh_from_db()
+        self.assertEqual((candidate.status, candidate.reviewed_by), (DuplicateCandidate.DUPLICATE, user))
+        self.assertEqual(candidate.student_id, min(a.pk, b.pk))
@@ -8,9 +8,13 @@ app_name = 'student'
 urlpatterns = [
     path('', student.StudentListView.as_view(), name='list'),
     path('create/', student.StudentCreateView.as_view(), name='create'),
+    path('import/', student.StudentImportView.as_view(), name='import'),
+    path('import/errors.csv', student.StudentImportReportView.as_view(), name='import_report'),
     path('<uuid:pk>/update/', student.StudentUpdateView.as_view(), name='update'),
     path('<uuid:pk>/delete/', student.StudentDeleteView.as_view(), name='delete'),
     path('<uuid:pk>/details/', student.StudentDetailView.as_view(), name='details'),
+    path('reg-num/<str:reg_num>/', student.StudentRegNumLookupView.as_view(), name='lookup'),
+    path('duplicates/', student.DuplicateReviewView.as_view(), name='duplicates'),
 
     path('guardian/<uuid:student_id>/create/', guardian.AddGuardianView.as_view(), name='guardian_create'),
     path('guardian/<int:guardian_id>/edit/', guardian.UpdateGuardianView.as_view(), name='guardian_update'),
@@ -21,10 +25,15 @@ urlpatterns = [
     path('<uuid:student_id>/<uuid:school_id>/<str:program>/set-program-level/', academic.set_program_level_stream_view, name='set_program_level'),
     path('<uuid:student_id>/<uuid:school_id>/<int:program_level_id>/finalize-enrollment/', academic.enrollment_final_view, name='enrollment_final_no_stream'),
     path('<uuid:student_id>/<uuid:school_id>/<int:program_level_id>/<int:stream_id>/finalize-enrollment/', academic.enrollment_final_view, name='enrollment_final'),
+    path('enroll/<int:level_class_id>/', academic.bulk_enrollment_view, name='bulk_enrollment'),
+    path('attendance/<int:level_class_id>/', academic.attendance_register_view, name='attendance_register'),
 
     path('enrollment/<int:pk>/update/', academic.EnrollmentUpdateView.as_view(), name='enrollment_update'),
     path('enrollment/<int:pk>/delete/', academic.EnrollmentDeleteView.as_view(), name='enrollment_delete'),
 
     path('admission-letter/<int:enrollment_id>/', academic.viewAdmissionLetter, name='admission_letter'),
+    path('report-card/<uuid:student_id>/<int:term_id>/', academic.report_card_view, name='report_card'),
+    path('print/admission-letters/<uuid:school_id>/<int:session_id>/', academic.batch_admission_letters_view, name='batch_admission_letters'),
+    path('print/report-cards/<uuid:school_id>/<int:term_id>/', academic.batch_report_cards_view, name='batch_report_cards'),
 
 ]
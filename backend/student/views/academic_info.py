@@ -1,9 +1,19 @@
+from datetime import date
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib import messages
-from backend.student.forms import SelectSchoolForm, SetProgramForm, SetProgramLevelStreamForm, EnrollmentFinalForm
-from backend.schools.models import School, LevelClasses, Stream
-from backend.student.models import EnrollmentRecord, Student
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.http import HttpResponse, StreamingHttpResponse
+from backend.student.forms import SelectSchoolForm, SetProgramForm, SetProgramLevelStreamForm, EnrollmentFinalForm, BulkEnrollmentForm, AttendanceRegisterForm
+from backend.schools.models import School, LevelClasses, Stream, SubjectRepository, AcademicSession, Term
+from backend.student.attendance import submit_register
+from backend.student.enrollment import enroll_many
+from backend.student.printing import (
+    BATCH_FORMATS, admission_letter_context, admission_letters, report_card_context, report_cards, stream_batch,
+)
+from backend.student.models import EnrollmentRecord, Student, TermResult
 
 def select_school_view(request, student_id):
     """
@@ -81,20 +91,18 @@ def enrollment_final_view(request, student_id, school_id, program_level_id, stre
     if request.method == 'POST':
         form = EnrollmentFinalForm(request.POST)
         if form.is_valid():
-            enrollment = form.save(commit=False)
-            enrollment.student = student
-            enrollment.school = school
-            
-            student.school = school
-            student.save()
-
-            enrollment.program_level = program_level
-            enrollment.program = program_level.program_level_template.program
-            enrollment.stream = stream
-            enrollment.academic_session = school.get_academic_session()
-            enrollment.save()
-            messages.success(request, "Enrollment information set successfully for this student.")
-            return redirect('student:details', pk=student.pk)
+            try:
+                enroll_many(
+                    [student], school, program_level, stream,
+                    enrollment_mode=form.cleaned_data['enrollment_mode'],
+                    generate_admission_info=form.cleaned_data['generate_admission_info'],
+                    is_active=form.cleaned_data['is_active'],
+                )
+            except ValidationError as error:
+                form.add_error(None, error)
+            else:
+                messages.success(request, "Enrollment information set successfully for this student.")
+                return redirect('student:details', pk=student.pk)
     else:
         form = EnrollmentFinalForm()
 
@@ -102,6 +110,69 @@ def enrollment_final_view(request, student_id, school_id, program_level_id, stre
         'form': form, 'student': student, 'school': school, 'program_level': program_level, 'stream': stream
     })
 
+@login_required
+def bulk_enrollment_view(request, level_class_id):
+    """
+    Enroll a whole class list into a class section at once.
+    """
+    level_class = get_object_or_404(
+        LevelClasses.objects.select_related('school', 'program_level_template', 'stream'), pk=level_class_id
+    )
+    school = level_class.school
+
+    if request.method == 'POST':
+        form = BulkEnrollmentForm(request.POST, level_class=level_class)
+        if form.is_valid():
+            try:
+                result = enroll_many(
+                    form.cleaned_data['reg_nums'], school, level_class, form.cleaned_data['stream'],
+                    enrollment_mode=form.cleaned_data['enrollment_mode'],
+                    generate_admission_info=form.cleaned_data['generate_admission_info'],
+                )
+            except ValidationError as error:
+                form.add_error(None, error)
+            else:
+                messages.success(
+                    request,
+                    f"{len(result.created)} students enrolled and {len(result.updated)} enrollments updated for {level_class}."
+                )
+                return redirect('schools:details', pk=school.pk)
+    else:
+        form = BulkEnrollmentForm(level_class=level_class)
+
+    return render(request, 'student/enrollment_forms/bulk_enrollment.html', {
+        'form': form, 'school': school, 'level_class': level_class
+    })
+
+
+@login_required
+def attendance_register_view(request, level_class_id):
+    """
+    Mark the daily register of a class section in one submission.
+    """
+    level_class = get_object_or_404(
+        LevelClasses.objects.select_related('school', 'program_level_template'), pk=level_class_id
+    )
+    school = level_class.school
+
+    if request.method == 'POST':
+        form = AttendanceRegisterForm(request.POST, level_class=level_class)
+        if form.is_valid():
+            try:
+                count = submit_register(level_class, form.cleaned_data['date'], form.statuses())
+            except ValidationError as error:
+                form.add_error(None, error)
+            else:
+                messages.success(request, f"Attendance of {count} students recorded for {form.cleaned_data['date']}.")
+                return redirect('schools:details', pk=school.pk)
+    else:
+        form = AttendanceRegisterForm(level_class=level_class, initial={'date': date.today()})
+
+    return render(request, 'student/enrollment_forms/attendance_register.html', {
+        'form': form, 'school': school, 'level_class': level_class
+    })
+
+
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views import View
@@ -161,5 +232,65 @@ def viewAdmissionLetter(request, enrollment_id):
 
     except EnrollmentRecord.DoesNotExist:
         return HttpResponse("Enrollment not found.", status=404)
-    context = {'enrollment': enrollment, 'school': enrollment.school, 'student': enrollment.student}
-    return render(request, 'student/printable/admission_letter.html', context)
+    return render(request, 'student/printable/admission_letter.html', admission_letter_context(enrollment))
+
+
+@login_required
+def report_card_view(request, student_id, term_id):
+    """
+    Printable report card, read from the student's stored TermResult.
+    """
+    result = get_object_or_404(
+        TermResult.objects.select_related(
+            'student', 'term__academic_session', 'level_class__school', 'level_class__program_level_template',
+        ),
+        student_id=student_id, term_id=term_id,
+    )
+    names = SubjectRepository.objects.in_bulk([row[0] for row in result.subjects])
+    return render(request, 'student/printable/report_card.html', report_card_context(result, names))
+
+
+def batch_response(request, documents, filename):
+    """
+    Stream `documents` as a ZIP (?format=zip, the default) or one merged PDF (?format=pdf).
+    """
+    output_format = request.GET.get('format', 'zip')
+    if output_format not in BATCH_FORMATS:
+        return HttpResponse(f"Unknown format {output_format!r}.", status=400)
+    try:
+        chunks = stream_batch(documents, output_format)
+    except ImproperlyConfigured as e:
+        return HttpResponse(str(e), status=503)
+    content_type = 'application/zip' if output_format == 'zip' else 'application/pdf'
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output_format}"'
+    return response
+
+
+def batch_level_class(request, school):
+    level_class_id = request.GET.get('level_class')
+    if not level_class_id:
+        return None
+    return get_object_or_404(LevelClasses, pk=level_class_id, school=school)
+
+
+@login_required
+def batch_admission_letters_view(request, school_id, session_id):
+    """
+    Admission letters of a school's enrollments for a session, optionally for one ?level_class.
+    """
+    school = get_object_or_404(School, pk=school_id)
+    academic_session = get_object_or_404(AcademicSession, pk=session_id)
+    documents = admission_letters(school, academic_session, batch_level_class(request, school))
+    return batch_response(request, documents, f"admission-letters-{academic_session.pk}")
+
+
+@login_required
+def batch_report_cards_view(request, school_id, term_id):
+    """
+    Report cards of a school's stored results for a term, optionally for one ?level_class.
+    """
+    school = get_object_or_404(School, pk=school_id)
+    term = get_object_or_404(Term, pk=term_id)
+    documents = report_cards(school, term, batch_level_class(request, school))
+    return batch_response(request, documents, f"report-cards-{term.pk}")
@@ -1,24 +1,68 @@
+import io
+
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.views import View
 from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import DetailView
 
 
-from backend.student.forms import StudentForm
-from backend.student.models import Student
+from backend.student import search
+from backend.student.forms import StudentForm, StudentImportForm
+from backend.student.importer import import_students
+from backend.student.duplicates import review
+from backend.student.models import DuplicateCandidate, Student
+from backend.student.reg_num import is_reg_num_shaped
 
 class StudentListView(View):
     """
-    Displays a list of all students.
+    Displays students a page at a time, in name order or matching a search
+    by name, registration number or NIN (`q`); `fuzzy` tolerates typos.
     """
     template_name = "student/student_list.html"
 
     def get(self, request):
-        students = Student.objects.all()
-        context = {"students": students,}
+        query = request.GET.get('q', '').strip()
+        fuzzy = bool(request.GET.get('fuzzy'))
+        cursor = request.GET.get('cursor')
+        if not query:
+            page = search.browse(cursor)
+        elif fuzzy:
+            page = search.fuzzy_search(query, cursor)
+        else:
+            page = search.prefix_search(query, cursor)
+        context = {"students": page.students, "query": query, "fuzzy": fuzzy, "next_cursor": page.next_cursor}
         return render(request, self.template_name, context)
 
+class DuplicateReviewView(LoginRequiredMixin, View):
+    """
+    Lists the pending duplicate candidates, most similar first, and records
+    the reviewer's decision on one.
+    """
+    template_name = "student/duplicate_review.html"
+    page_size = 50
+
+    def get(self, request):
+        candidates = DuplicateCandidate.objects.filter(status=DuplicateCandidate.PENDING).select_related(
+            'student__school', 'other__school'
+        ).order_by('-score', 'pk')[:self.page_size]
+        context = {"candidates": candidates, "pending": DuplicateCandidate.objects.filter(status=DuplicateCandidate.PENDING).count()}
+        return render(request, self.template_name, context)
+
+    def post(self, request):
+        candidate = get_object_or_404(DuplicateCandidate, pk=request.POST.get('candidate'))
+        status = request.POST.get('status')
+        if status not in (DuplicateCandidate.DUPLICATE, DuplicateCandidate.DISTINCT):
+            messages.error(request, "Choose whether the two records are the same student.")
+        else:
+            review(candidate, status, request.user)
+            messages.success(request, f"Marked {candidate.student} and {candidate.other}: {candidate.get_status_display().lower()}.")
+        return redirect('student:duplicates')
+
+
 class StudentDetailView(DetailView):
     model = Student
     template_name = "student/student_details.html"
@@ -30,6 +74,21 @@ class StudentDetailView(DetailView):
         return render(request, self.template_name, context)
 
 
+class StudentRegNumLookupView(View):
+    """
+    Redirects to a student's details by registration number.
+    Numbers that are not 11 digits are rejected without querying the database;
+    the check digit is not required, since numbers issued before the sequence
+    existed have none.
+    """
+
+    def get(self, request, reg_num):
+        if not is_reg_num_shaped(reg_num):
+            raise Http404("Invalid registration number.")
+        student = get_object_or_404(Student.objects.only('pk'), reg_num=reg_num)
+        return redirect('student:details', pk=student.pk)
+
+
 from django.db.models import Q
 from backend.schools.models import SubjectRepository
 def get_student_subjects(student):
@@ -110,3 +169,55 @@ class StudentDeleteView(View):
         student.delete()
         messages.success(request, "Student record deleted successfully.")
         return redirect(self.success_url)
+
+
+IMPORT_REPORT_SESSION_KEY = 'student_import_report'
+
+
+class StudentImportView(LoginRequiredMixin, View):
+    """
+    Imports students in bulk from an uploaded CSV or XLSX file.
+    Rejected rows are listed, and the error report of the latest import is
+    kept in the user's session for StudentImportReportView to download.
+    """
+    template_name = "student/import.html"
+
+    def get(self, request):
+        return render(request, self.template_name, {"form": StudentImportForm()})
+
+    def post(self, request):
+        form = StudentImportForm(request.POST, request.FILES)
+        context = {"form": form}
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            error_report = io.StringIO()
+            try:
+                result = import_students(
+                    upload.file, upload.name, school=form.cleaned_data['school'], error_report=error_report,
+                )
+            except ValidationError as error:
+                form.add_error('file', error)
+                return render(request, self.template_name, context)
+
+            if result.failed:
+                request.session[IMPORT_REPORT_SESSION_KEY] = error_report.getvalue()
+                context["report_url"] = reverse('student:import_report')
+            if result.created:
+                messages.success(request, f"{result.created} students imported successfully.")
+            context["result"] = result
+        return render(request, self.template_name, context)
+
+
+class StudentImportReportView(LoginRequiredMixin, View):
+    """
+    Downloads the error report of the user's latest import. The report names
+    students, so it is only served to the session that ran the import.
+    """
+
+    def get(self, request):
+        report = request.session.get(IMPORT_REPORT_SESSION_KEY)
+        if report is None:
+            raise Http404("No import error report.")
+        response = HttpResponse(report, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="students.errors.csv"'
+        return response
@@ -0,0 +1,93 @@
+import os
+import socket
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from backend.query_budget import QueryBudgetMiddleware, query_stats, sql_shape
+from backend.schools.models import School
+
+
+class QueryBudgetTest(TestCase):
+
+    def setUp(self):
+        query_stats.reset()
+        for letter in 'abcd':
+            School.objects.create(
+                name=f'Test School {letter}', school_type='public', program='jss',
+                lga='Test LGA', ward='Test Ward', street_address='123 Test Street',
+            )
+
+    def run_view(self, view, path='/schools/'):
+        request = RequestFactory().get(path)
+        request.resolver_match = resolve(path)
+        return QueryBudgetMiddleware(view)(request)
+
+    def per_row_view(self, request):
+        # One query per school: the N+1 pattern.
+        for pk in School.objects.values_list('pk', flat=True):
+            School.objects.filter(pk=pk).values_list('name', flat=True).first()
+        return HttpResponse('ok')
+
+    def test_sql_shape(self):
+        self.assertEqual(
+            sql_shape('SELECT  "a" FROM "t"\n WHERE "id" IN (%s, %s, %s) AND "b" = %s'),
+            'SELECT "a" FROM "t" WHERE "id" IN (...) AND "b" = %s',
+        )
+        self.assertEqual(sql_shape('SELECT 1 WHERE x IN (%s)'), 'SELECT 1 WHERE x IN (...)')
+
+    @override_settings(QUERY_BUDGETS={'default': {'repeats': 2}})
+    def test_repeated_queries_are_reported(self):
+        with self.assertLogs('samses', 'WARNING') as logs:
+            self.run_view(self.per_row_view)
+        record = logs.records[0]
+        self.assertIn('N+1', record.getMessage())
+        details = record.query_budget
+        self.assertEqual((details['url_name'], details['queries']), ('schools:list', 5))
+        self.assertEqual(details['repeated'][0]['count'], 4)
+        self.assertIn('LIMIT', details['repeated'][0]['sql'])
+
+        stats = query_stats.snapshot()['schools:list']
+        self.assertEqual((stats['requests'], stats['queries'], stats['n_plus_one'], stats['over_budget']), (1, 5, 1, 1))
+
+    @override_settings(QUERY_BUDGETS={'default': {'repeats': 2}, 'schools:list': {'repeats': 10, 'queries': 5}})
+    def test_budgets_by_url_name(self):
+        with self.assertNoLogs('samses', 'WARNING'):
+            self.run_view(self.per_row_view)
+        def twice(request):
+            self.per_row_view(request)
+            return self.per_row_view(request)
+
+        with self.assertLogs('samses', 'WARNING') as logs:
+            self.run_view(twice)
+        self.assertEqual(logs.records[0].query_budget['queries'], 10)
+        self.assertEqual(query_stats.snapshot()['schools:list']['max_queries'], 10)
+
+    @override_settings(QUERY_BUDGETS={'default': {'queries': 2}})
+    def test_streamed_queries_are_counted(self):
+        def rows():
+            for pk in School.objects.values_list('pk', flat=True):
+                yield School.objects.values_list('name', flat=True).get(pk=pk)
+
+        def view(request):
+            return StreamingHttpResponse(rows())
+
+        response = self.run_view(view)
+        self.assertEqual(query_stats.snapshot(), {})
+        with self.assertLogs('samses', 'WARNING'):
+            b''.join(response.streaming_content)
+        self.assertEqual(query_stats.snapshot()['schools:list']['requests'], 1)
+
+    def test_stats_view(self):
+        url = reverse('query_stats')
+        self.client.force_login(User.objects.create_user('staff', password='secret', is_staff=True))
+        self.client.get(reverse('schools:list'))
+        body = self.client.get(url).json()
+        self.assertEqual(body['stats']['schools:list']['requests'], 1)
+        self.assertEqual(body['worker'], f'{socket.gethostname()}:{os.getpid()}')
+        self.assertEqual(body['since'], query_stats.since)
+
+        self.client.force_login(User.objects.create_user('teacher', password='secret'))
+        self.assertEqual(self.client.get(url).status_code, 302)
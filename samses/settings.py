@@ -40,6 +40,28 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Set REDIS_URL (e.g. redis://localhost:6379/1) to share the cache between
+# processes, so cache invalidations reach every worker at once. Without it each
+# process has its own local-memory cache, and cached data (academic sessions,
+# school calendars, suspensions) expires on a short timeout instead.
+
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
@@ -64,11 +86,13 @@ INSTALLED_APPS = [
     'django_extensions',
     'backend.schools.apps.SchoolsConfig',
     'backend.student.apps.StudentConfig',
+    'backend.flows.apps.FlowsConfig',
 ]
 
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'backend.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,6 +102,15 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# Queries, database time (seconds) and runs of one SQL shape allowed per request, by URL name.
+QUERY_BUDGETS = {
+    'default': {'queries': 50, 'db_time': 0.5, 'repeats': 10},
+}
+
+# Processes converting HTML to PDF in a batch print. Every print request starts
+# its own pool inside a web worker, so more than one multiplies quickly.
+PDF_RENDER_WORKERS = 1
+
 ROOT_URLCONF = 'samses.urls'
 
 TEMPLATES = [
@@ -5,7 +5,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from debug_toolbar.toolbar import debug_toolbar_urls
 
-from backend.samses_views import home_view, dashboard
+from backend.samses_views import home_view, dashboard, query_stats_view
 
 urlpatterns = [
     
@@ -15,9 +15,11 @@ urlpatterns = [
 
     path('schools/', include('backend.schools.urls', namespace='schools')),
     path('student/', include('backend.student.urls', namespace='student')),
+    path('api/', include('backend.api.urls', namespace='api')),
     path('social-auth/', include('social_django.urls', namespace='social')),
     path('', home_view),
     path('/dashboard', dashboard, name="dashboard"),
+    path('query-stats/', query_stats_view, name="query_stats"),
     # path('accounts/', include('django.contrib.auth.urls')),
 
 ] + debug_toolbar_urls()